@@ -0,0 +1,1328 @@
+# analyzer.py
+import os
+import re
+import time
+import codecs
+import hashlib
+import mmap
+from array import array
+from bisect import bisect_right
+from collections import deque
+
+import isolamento
+from isolamento import FalhaExtracao
+
+# PyPDF2 (e zipfile/ElementTree, para DOCX) são importados só na primeira
+# leitura de cada tipo de arquivo, fora do caminho de inicialização da interface
+
+# Namespaces do WordprocessingML
+_W = '{http://schemas.openxmlformats.org/wordprocessingml/2006/main}'
+_MC = '{http://schemas.openxmlformats.org/markup-compatibility/2006}'
+
+
+class MatchResult:
+    """Contagens e posições (no texto normalizado) de cada termo encontrado"""
+
+    def __init__(self, texto_vazio=False, counts=None, terms=()):
+        self.counts = counts if counts is not None else {}
+        self.offsets = {}
+        self.texto_vazio = texto_vazio
+        # Termos buscados (inclusive os não encontrados, com contagem zero)
+        self.terms = frozenset(terms)
+
+    def sem_posicoes(self):
+        """Cópia só com as contagens, leve para enviar entre processos"""
+        return MatchResult(self.texto_vazio, dict(self.counts), self.terms)
+
+    def count(self, term):
+        return self.counts.get(term, 0)
+
+    def found(self, term):
+        if not term:
+            # Mesmo comportamento de re.search(r'\b\b', texto)
+            return not self.texto_vazio
+        return term in self.counts
+
+    def positions(self, term):
+        return self.offsets.get(term, [])
+
+    def keyword_count(self, palavra):
+        """Conta uma palavra-chave; frases valem o maior número entre as variações"""
+        return max((self.count(t) for t in KeywordMatcher.keyword_terms(palavra)), default=0)
+
+    def keyword_found(self, palavra):
+        return any(t in self.counts for t in KeywordMatcher.keyword_terms(palavra))
+
+
+class KeywordMatcher:
+    """Autômato Aho-Corasick sobre tokens do texto normalizado.
+
+    Todos os termos (nomes de produtos e palavras-chave, incluindo as variações
+    de frases) são buscados em uma única passada pelo texto. Como o texto
+    normalizado só contém tokens \\w separados por um espaço, um casamento
+    \\b...\\b equivale a uma sequência contígua de tokens inteiros.
+    """
+
+    TERMO_VALIDO = re.compile(r'\w+(?: \w+)*')
+    # Com poucos termos, buscar cada um com str.find é mais rápido que o autômato
+    LIMITE_BUSCA_DIRETA = 16
+
+    def __init__(self, terms=()):
+        self.terms = {}
+        self._automato = None
+        for term in terms:
+            self.add_term(term)
+
+    @staticmethod
+    def keyword_terms(palavra):
+        """Variações buscadas para uma palavra-chave (frase exata e sem espaços)"""
+        palavra = palavra.strip()
+        if not palavra:
+            return []
+        if ' ' in palavra:
+            # A variação "\s+" do padrão antigo era escapada por re.escape e nunca casava
+            return [palavra, palavra.replace(' ', '')]
+        return [palavra]
+
+    def add_term(self, term):
+        """Adiciona um termo já normalizado; termos que não podem casar são ignorados"""
+        if term in self.terms:
+            return
+        if not self.TERMO_VALIDO.fullmatch(term):
+            return
+        self.terms[term] = tuple(term.split(' '))
+        self._automato = None
+
+    def add_keyword(self, palavra):
+        for term in self.keyword_terms(palavra):
+            self.add_term(term)
+
+    def compile(self):
+        """Compila o autômato agora (em vez de na primeira busca)"""
+        if self._automato is None:
+            self._build()
+        return self
+
+    def _build(self):
+        goto = [{}]
+        saidas = [[]]
+        for term, tokens in self.terms.items():
+            node = 0
+            for token in tokens:
+                proximo = goto[node].get(token)
+                if proximo is None:
+                    proximo = len(goto)
+                    goto[node][token] = proximo
+                    goto.append({})
+                    saidas.append([])
+                node = proximo
+            saidas[node].append((term, len(tokens)))
+
+        falha = [0] * len(goto)
+        fila = list(goto[0].values())
+        for node in fila:
+            for token, filho in goto[node].items():
+                f = falha[node]
+                while f and token not in goto[f]:
+                    f = falha[f]
+                falha[filho] = goto[f].get(token, 0)
+                saidas[filho] = saidas[filho] + saidas[falha[filho]]
+                fila.append(filho)
+
+        vocabulario = set()
+        for tokens in self.terms.values():
+            vocabulario.update(tokens)
+        self._automato = (goto, falha, saidas, vocabulario)
+
+    def scan(self, text_normalized):
+        """Percorre o texto normalizado uma vez e devolve um MatchResult"""
+        if text_normalized and len(self.terms) <= self.LIMITE_BUSCA_DIRETA:
+            resultado = MatchResult(terms=self.terms)
+            return self._scan_direto(text_normalized, resultado)
+        busca = StreamingScan(self, posicoes=True)
+        busca.feed(text_normalized)
+        return busca.resultado
+
+    def stream(self, posicoes=False):
+        """Busca incremental, alimentada trecho a trecho (ver StreamingScan)"""
+        return StreamingScan(self, posicoes)
+
+    def _scan_direto(self, text_normalized, resultado):
+        """Busca termo a termo com str.find, com a mesma semântica do autômato"""
+        tamanho_texto = len(text_normalized)
+        for term in self.terms:
+            ocorrencias = []
+            pos = text_normalized.find(term)
+            while pos != -1:
+                fim = pos + len(term)
+                if (pos == 0 or text_normalized[pos - 1] == ' ') and \
+                        (fim == tamanho_texto or text_normalized[fim] == ' '):
+                    ocorrencias.append((pos, fim))
+                    pos = text_normalized.find(term, fim)
+                else:
+                    pos = text_normalized.find(term, pos + 1)
+            if ocorrencias:
+                resultado.counts[term] = len(ocorrencias)
+                resultado.offsets[term] = ocorrencias
+        return resultado
+
+
+class StreamingScan:
+    """Busca do KeywordMatcher alimentada em trechos (ex.: uma página por vez).
+
+    Os trechos já normalizados são tratados como se estivessem unidos por um
+    espaço. O estado do autômato e o início dos últimos tokens formam a janela
+    de sobreposição entre trechos, então uma frase que atravessa a quebra de
+    página é contada como no texto inteiro. Sem `posicoes` a memória usada não
+    depende do tamanho do documento.
+    """
+
+    def __init__(self, matcher, posicoes=False):
+        self._automato = matcher.compile()._automato
+        self.resultado = MatchResult(texto_vazio=True, terms=matcher.terms)
+        self.posicoes = posicoes
+        # Início dos últimos tokens, o suficiente para o termo mais longo
+        self._inicios = deque(maxlen=max((len(t) for t in matcher.terms.values()), default=1))
+        self._ultimo_fim = {}
+        self._node = 0
+        self._tokens = 0
+        self._pos = 0
+
+    def feed(self, text_normalized):
+        if not text_normalized:
+            return
+        self.resultado.texto_vazio = False
+        goto, falha, saidas, vocabulario = self._automato
+
+        counts = self.resultado.counts
+        offsets = self.resultado.offsets
+        posicoes = self.posicoes
+        ultimo_fim = self._ultimo_fim
+        inicios = self._inicios
+        node = self._node
+        pos = self._pos
+        i = self._tokens - 1
+        for i, token in enumerate(text_normalized.split(' '), self._tokens):
+            inicios.append(pos)
+            pos += len(token) + 1
+            if token not in vocabulario:
+                node = 0
+                continue
+            while node and token not in goto[node]:
+                node = falha[node]
+            node = goto[node].get(token, 0)
+            for term, tamanho in saidas[node]:
+                inicio = i - tamanho + 1
+                # re.findall não conta casamentos sobrepostos do mesmo termo
+                if inicio < ultimo_fim.get(term, 0):
+                    continue
+                ultimo_fim[term] = i + 1
+                counts[term] = counts.get(term, 0) + 1
+                if posicoes:
+                    offsets.setdefault(term, []).append((inicios[-tamanho], pos - 1))
+        self._node = node
+        self._tokens = i + 1
+        self._pos = pos
+
+    @property
+    def posicao(self):
+        """Posição, no texto normalizado unido, em que começa o próximo trecho"""
+        return self._pos
+
+
+class IndicePosicoes:
+    """Posições dos termos encontrados, por página, em arrays compactos
+
+    Cada ocorrência é o trio (página, início, fim), com início e fim no texto
+    normalizado da página (numeração a partir de 0). Os trios de todos os
+    termos ficam em um único array('i'); `termos` guarda, para cada termo, o
+    primeiro trio e o número de ocorrências.
+    """
+
+    def __init__(self, termos=None, valores=None):
+        self.termos = termos if termos is not None else {}
+        self.valores = valores if valores is not None else array('i')
+
+    @classmethod
+    def das_ocorrencias(cls, offsets, inicios_paginas):
+        """Índice a partir de MatchResult.offsets (posições no texto unido)
+
+        `inicios_paginas` é o início de cada página no texto normalizado
+        unido (NormalizedDocument.page_starts). Uma frase que atravessa a
+        quebra de página fica na página em que começa.
+        """
+        indice = cls()
+        valores = indice.valores
+        for term, ocorrencias in offsets.items():
+            indice.termos[term] = (len(valores) // 3, len(ocorrencias))
+            for inicio, fim in ocorrencias:
+                pagina = max(bisect_right(inicios_paginas, inicio) - 1, 0)
+                base = inicios_paginas[pagina] if inicios_paginas else 0
+                valores.extend((pagina, inicio - base, fim - base))
+        return indice
+
+    def __len__(self):
+        return len(self.valores) // 3
+
+    def ocorrencias(self, term):
+        """Lista de (página, início, fim) do termo, na ordem do documento"""
+        primeiro, quantidade = self.termos.get(term, (0, 0))
+        trios = self.valores[primeiro * 3:(primeiro + quantidade) * 3]
+        return list(zip(trios[0::3], trios[1::3], trios[2::3]))
+
+    def atualizar(self, outro):
+        """Acrescenta (ou substitui) os termos de outro índice
+
+        Se algum termo é substituído, o array é remontado sem os trios
+        antigos dele, que não ficam órfãos no que é gravado.
+        """
+        if any(term in self.termos for term in outro.termos):
+            mantidos = {term: posicao for term, posicao in self.termos.items() if term not in outro.termos}
+            valores = self.valores
+            self.termos, self.valores = {}, array('i')
+            self._acrescentar(mantidos, valores)
+        self._acrescentar(outro.termos, outro.valores)
+
+    def _acrescentar(self, termos, valores):
+        for term, (primeiro, quantidade) in termos.items():
+            self.termos[term] = (len(self.valores) // 3, quantidade)
+            self.valores.extend(valores[primeiro * 3:(primeiro + quantidade) * 3])
+
+    def to_bytes(self):
+        return self.valores.tobytes()
+
+    @classmethod
+    def from_bytes(cls, termos, dados):
+        valores = array('i')
+        valores.frombytes(dados)
+        return cls({term: tuple(posicao) for term, posicao in termos.items()}, valores)
+
+
+class NormalizedDocument:
+    """Documento normalizado uma única vez por análise.
+
+    `text` é idêntico a DocumentAnalyzer.normalize_text(original): os tokens \\w
+    do texto em minúsculas separados por um espaço. O mapa de posições (início
+    de cada token no texto normalizado e intervalo correspondente no original)
+    é montado só quando um trecho original é pedido, e permite devolver
+    trechos com a grafia e a pontuação originais.
+    """
+
+    TOKEN = re.compile(r'\w+')
+
+    def __init__(self, original, text=None):
+        self.original = original
+        self.text = DocumentAnalyzer.normalize_text(original) if text is None else text
+        self.norm_starts = None
+        # Início de cada página no texto normalizado (só com from_pages)
+        self.page_starts = None
+
+    @classmethod
+    def from_pages(cls, pages):
+        """Documento das páginas unidas por quebras de linha, normalizado página a página
+
+        O texto é o mesmo de normalize_text("\\n".join(pages)): as páginas
+        normalizadas não vazias separadas por um espaço. `page_starts` guarda
+        onde cada página começa (uma página vazia começa onde começa a seguinte).
+        """
+        normalizadas = []
+        page_starts = array('l')
+        pos = 0
+        for page in pages:
+            page_starts.append(pos)
+            text_normalized = DocumentAnalyzer.normalize_text(page)
+            if text_normalized:
+                normalizadas.append(text_normalized)
+                pos += len(text_normalized) + 1
+        documento = cls("\n".join(pages), " ".join(normalizadas))
+        documento.page_starts = page_starts
+        return documento
+
+    @classmethod
+    def from_normalized(cls, text_normalized):
+        """Documento a partir de um texto já normalizado (ex.: lido do índice FTS5)"""
+        return cls(text_normalized, text_normalized)
+
+    def __len__(self):
+        return len(self.text)
+
+    def _build_offsets(self):
+        lowered = self.original.lower()
+
+        # lower() pode mudar o tamanho de alguns caracteres (ex.: "İ")
+        self._lower_map = None
+        if len(lowered) != len(self.original):
+            self._lower_map = array('l')
+            for i, char in enumerate(self.original):
+                self._lower_map.extend([i] * len(char.lower()))
+            self._lower_map.append(len(self.original))
+
+        norm_starts = array('l')
+        self.lower_starts = array('l')
+        self.lower_ends = array('l')
+        pos = 0
+        for match in self.TOKEN.finditer(lowered):
+            norm_starts.append(pos)
+            self.lower_starts.append(match.start())
+            self.lower_ends.append(match.end())
+            pos += match.end() - match.start() + 1
+        self.norm_starts = norm_starts
+
+    def _from_lower(self, pos):
+        return self._lower_map[pos] if self._lower_map is not None else pos
+
+    def to_original(self, pos):
+        """Converte uma posição do texto normalizado para o texto original"""
+        if self.norm_starts is None:
+            self._build_offsets()
+        if not self.norm_starts:
+            return 0
+        i = max(bisect_right(self.norm_starts, pos) - 1, 0)
+        delta = pos - self.norm_starts[i]
+        if delta >= self.lower_ends[i] - self.lower_starts[i]:
+            return self._from_lower(self.lower_ends[i])
+        return self._from_lower(self.lower_starts[i] + delta)
+
+    def original_slice(self, start, end):
+        """Trecho original correspondente ao intervalo [start, end) normalizado"""
+        return self.original[self.to_original(start):self.to_original(end)]
+
+
+class CompiledProduct:
+    """Produto do catálogo com nome normalizado e listas de palavras já separadas"""
+
+    def __init__(self, produto):
+        self.produto = produto
+        self.id, self.nome, self.descricao, self.palavras_positivas, self.palavras_negativas, _ = produto
+        self.nome_normalized = DocumentAnalyzer.normalize_text(self.nome)
+        self.pos_list = DocumentAnalyzer.split_palavras(self.palavras_positivas)
+        self.neg_list = DocumentAnalyzer.split_palavras(self.palavras_negativas)
+
+    def terms(self):
+        """Termos que este produto precisa no autômato"""
+        terms = [self.nome_normalized]
+        for palavra in self.pos_list + self.neg_list:
+            terms.extend(KeywordMatcher.keyword_terms(palavra))
+        return terms
+
+
+class CompiledCatalog:
+    """Catálogo compilado uma vez e reaproveitado entre análises.
+
+    Guarda os produtos já processados e o autômato com todos os termos. As
+    alterações do cadastro são aplicadas produto a produto; o autômato só é
+    recompilado (na próxima busca) quando o conjunto de termos muda.
+    `versao` e `versoes` ({id: versão}) são as versões do catálogo e de cada
+    produto no banco (None se o catálogo não veio do banco), usadas para
+    reaproveitar análises memorizadas.
+    """
+
+    def __init__(self, produtos=(), versao=None, versoes=None):
+        self.produtos = {}
+        self._ordenados = None
+        self._term_refs = {}
+        self._matcher = None
+        self.versao = versao
+        self.versoes = dict(versoes or {})
+        for produto in produtos:
+            self.add(produto)
+
+    def __len__(self):
+        return len(self.produtos)
+
+    def __iter__(self):
+        if self._ordenados is None:
+            self._ordenados = sorted(self.produtos.values(), key=lambda p: (p.nome, p.id))
+        return iter(self._ordenados)
+
+    def add(self, produto):
+        compilado = CompiledProduct(produto)
+        antigo = self.produtos.get(compilado.id)
+        self.produtos[compilado.id] = compilado
+        self._ordenados = None
+        removidos = self._release(antigo.terms()) if antigo else set()
+        adicionados = self._retain(compilado.terms())
+        if removidos != adicionados:
+            self._matcher = None
+
+    def update(self, produto):
+        self.add(produto)
+
+    def remove(self, produto_id):
+        compilado = self.produtos.pop(produto_id, None)
+        if compilado is None:
+            return
+        self._ordenados = None
+        if self._release(compilado.terms()):
+            self._matcher = None
+
+    def _retain(self, terms):
+        """Incrementa as referências; devolve os termos que passaram a existir"""
+        novos = set()
+        for term in terms:
+            self._term_refs[term] = self._term_refs.get(term, 0) + 1
+            if self._term_refs[term] == 1:
+                novos.add(term)
+        return novos
+
+    def _release(self, terms):
+        """Decrementa as referências; devolve os termos que deixaram de existir"""
+        sem_uso = set()
+        for term in terms:
+            self._term_refs[term] -= 1
+            if not self._term_refs[term]:
+                del self._term_refs[term]
+                sem_uso.add(term)
+        return sem_uso
+
+    @property
+    def matcher(self):
+        if self._matcher is None:
+            self._matcher = KeywordMatcher(self._term_refs)
+        return self._matcher
+
+    def scan(self, text_normalized):
+        return self.matcher.scan(text_normalized)
+
+    def stream(self, posicoes=False):
+        return self.matcher.stream(posicoes)
+
+    def snapshot(self):
+        """Cópia imutável para uso em outra thread enquanto o cadastro é editado"""
+        copia = CompiledCatalog(versao=self.versao, versoes=self.versoes)
+        copia.produtos = dict(self.produtos)
+        copia._term_refs = dict(self._term_refs)
+        copia._matcher = self.matcher.compile()
+        return copia
+
+
+class AnaliseCancelada(Exception):
+    """Levantada para interromper uma análise cancelada pelo usuário"""
+
+
+class PaginasExtraidas(list):
+    """Páginas extraídas de um documento e a falha da extração, se houver
+
+    Com `falha` (isolamento.FalhaExtracao) a lista tem só as páginas
+    extraídas antes da interrupção, em ordem.
+    """
+
+    def __init__(self, pages=(), falha=None):
+        super().__init__(pages)
+        self.falha = falha
+
+
+class LeituraDocumento:
+    """Documento aberto para extração, com o número de páginas conhecido antes do texto
+
+    Permite escolher entre a extração completa (`extrair`) e a análise em
+    fluxo (`iterar`) sem abrir o arquivo duas vezes; só um dos dois é usado
+    por leitura. Com `db` e `arquivo_hash`, a extração completa grava o
+    cache de texto do arquivo. `pages` é o texto já lido do cache.
+    """
+
+    def __init__(self, filepath, db=None, arquivo_hash=None, pages=None):
+        self.filepath = filepath
+        self.db = db
+        self.arquivo_hash = arquivo_hash
+        self.pages = pages
+        # None: formato sem páginas ou número ainda desconhecido
+        self.total = len(pages) if pages is not None else None
+
+    @property
+    def streaming(self):
+        """Se o documento deve ser analisado em fluxo (PAGINAS_STREAMING páginas ou mais)"""
+        return (self.total or 0) >= DocumentAnalyzer.PAGINAS_STREAMING
+
+    def extrair(self, progress=None, workers=1):
+        """Extrai o documento inteiro (PaginasExtraidas)"""
+        if self.pages is not None:
+            if progress:
+                progress(len(self.pages), len(self.pages))
+            return PaginasExtraidas(self.pages)
+        pages = self._extrair(progress, workers)
+        # Extrações interrompidas não entram no cache do arquivo
+        if self.db is not None and self.arquivo_hash and pages.falha is None \
+                and any(page.strip() for page in pages):
+            self.db.salvar_texto_cache(self.arquivo_hash, DocumentAnalyzer.EXTRATOR_VERSAO, pages)
+        return pages
+
+    def _extrair(self, progress, workers):
+        return DocumentAnalyzer.extract_pages_from_file(self.filepath, progress)
+
+    def iterar(self, progress=None, extracao=None):
+        """Gera o texto página a página; a falha, se houver, fica em extracao['falha']"""
+        pages = self.pages if self.pages is not None else self._extrair(progress, 1)
+        if extracao is not None:
+            extracao['falha'] = getattr(pages, 'falha', None)
+        yield from pages
+
+    def encerrar(self):
+        pass
+
+
+class LeituraPdf(LeituraDocumento):
+    """PDF aberto em um processo isolado (ver isolamento)
+
+    O processo envia o número de páginas assim que lê a estrutura do PDF e
+    espera o pedido: as chaves do cache por página e/ou as páginas a
+    extrair. Se o PDF não puder ser aberto, `falha` é preenchida e `total`
+    fica None.
+    """
+
+    def __init__(self, filepath, db=None, arquivo_hash=None):
+        super().__init__(filepath, db, arquivo_hash)
+        self.falha = None
+        self.limite = DocumentAnalyzer.MEMORIA_LIMITE_EXTRACAO_MB
+        prazo = time.monotonic() + DocumentAnalyzer.TEMPO_LIMITE_EXTRACAO
+        self.processos = [isolamento.ProcessoIsolado(DocumentAnalyzer._pdf_worker, (filepath,), self.limite)]
+        self._mensagens = isolamento.mensagens(self.processos, prazo)
+        try:
+            self.total = self._proxima()[1]
+        except FalhaExtracao as e:
+            self.falha = e
+            self.encerrar()
+
+    def _proxima(self):
+        try:
+            return next(self._mensagens)[1]
+        except StopIteration:
+            raise FalhaExtracao(isolamento.LEITURA, "processo de extração terminou sem resposta")
+
+    def _extrair(self, progress, workers):
+        """Páginas do cache por página (com `db`) e as demais extraídas por até `workers` processos
+
+        Se a extração for interrompida, as páginas já extraídas entram no
+        cache por página e o resultado traz as anteriores à primeira que faltou.
+        """
+        if self.falha is not None:
+            return PaginasExtraidas(falha=self.falha)
+        pages = [None] * self.total
+        chaves, faltando, falha = None, [], None
+        extraidas = 0
+        try:
+            if self.db is not None:
+                self.processos[0].enviar(('chaves',))
+                chaves = self._proxima()[1]
+                em_cache = self.db.get_paginas_cache(set(chaves), DocumentAnalyzer.EXTRATOR_VERSAO)
+                pages = [em_cache.get(chave) for chave in chaves]
+            faltando = [i for i, page in enumerate(pages) if page is None]
+            faixas = DocumentAnalyzer._dividir_paginas(faltando, workers)
+            self.processos[0].enviar(('extrair', faixas[0], False))
+            self.processos.extend(
+                isolamento.ProcessoIsolado(DocumentAnalyzer._pdf_worker, (self.filepath, faixa), self.limite)
+                for faixa in faixas[1:]
+            )
+            for _, mensagem in self._mensagens:
+                _, i, texto = mensagem
+                pages[i] = texto
+                extraidas += 1
+                if progress:
+                    progress(extraidas, len(faltando))
+        except FalhaExtracao as e:
+            falha = e
+        finally:
+            self.encerrar()
+
+        if progress and not faltando and falha is None:
+            progress(len(pages), len(pages))
+        if chaves is not None and extraidas:
+            self.db.salvar_paginas_cache(DocumentAnalyzer.EXTRATOR_VERSAO,
+                                         {chaves[i]: pages[i] for i in faltando if pages[i] is not None})
+        if falha is None:
+            return PaginasExtraidas(pages)
+
+        completas = next((i for i, page in enumerate(pages) if page is None), len(pages))
+        falha.paginas, falha.total = completas, len(pages) or None
+        return PaginasExtraidas(pages[:completas], falha)
+
+    def iterar(self, progress=None, extracao=None):
+        """Gera as páginas na ordem, reabrindo o PDF a cada PAGINAS_POR_LEITOR páginas"""
+        falha = self.falha
+        extraidas = 0
+        if falha is None:
+            try:
+                self.processos[0].enviar(('extrair', list(range(self.total)), True))
+                for _, mensagem in self._mensagens:
+                    extraidas += 1
+                    if progress:
+                        progress(extraidas, self.total)
+                    yield mensagem[2]
+            except FalhaExtracao as e:
+                falha = e
+            finally:
+                self.encerrar()
+            if falha is not None:
+                falha.paginas, falha.total = extraidas, self.total or None
+        if extracao is not None:
+            extracao['falha'] = falha
+
+    def encerrar(self):
+        for processo in self.processos:
+            processo.encerrar()
+
+
+class DocumentAnalyzer:
+    # Incrementar quando a extração mudar, invalidando o cache de texto
+    # (2: DOCX com tabelas, cabeçalhos e rodapés; TXT em Windows-1252)
+    EXTRATOR_VERSAO = 2
+    # Número padrão de processos para extrair PDFs grandes
+    PROCESSOS_PADRAO = min(4, os.cpu_count() or 1)
+    # Abaixo deste número de páginas a extração é sempre serial
+    PAGINAS_MIN_PARALELO = 32
+    # Na extração em fluxo o PDF é reaberto a cada tantas páginas, liberando
+    # os objetos que o PyPDF2 guarda em cache
+    PAGINAS_POR_LEITOR = 64
+    # A partir deste número de páginas a interface analisa o PDF em fluxo
+    PAGINAS_STREAMING = 300
+    # Prazo (segundos) para extrair o texto de um documento e memória (MB) de
+    # cada processo de extração; além deles a extração é interrompida
+    TEMPO_LIMITE_EXTRACAO = 600
+    MEMORIA_LIMITE_EXTRACAO_MB = 2048
+
+    @staticmethod
+    def extract_text_from_file(filepath, progress=None, workers=1):
+        """Extrai texto de diferentes tipos de arquivos
+
+        `progress(pagina, total)` é chamado após cada página extraída.
+        """
+        pages = DocumentAnalyzer.extract_pages_from_file(filepath, progress, workers)
+        return "\n".join(pages)
+
+    @staticmethod
+    def file_hash(filepath):
+        """SHA-256 do conteúdo do arquivo"""
+        digest = hashlib.sha256()
+        with open(filepath, 'rb') as file:
+            for bloco in iter(lambda: file.read(1024 * 1024), b''):
+                digest.update(bloco)
+        return digest.hexdigest()
+
+    @staticmethod
+    def open_document(filepath, db=None, arquivo_hash=None):
+        """Abre o documento para extração (LeituraDocumento), uma única vez
+
+        Com `db`, o texto vem do cache quando o conteúdo já foi extraído e PDFs
+        usam o cache por página. O número de páginas (`total`) é conhecido
+        antes do texto, para escolher entre extração completa e fluxo. Quem
+        abre é responsável por `encerrar` se não usar `extrair` nem `iterar`.
+        """
+        if db is not None:
+            if arquivo_hash is None:
+                arquivo_hash = DocumentAnalyzer.file_hash(filepath)
+            pages = db.get_texto_cache(arquivo_hash, DocumentAnalyzer.EXTRATOR_VERSAO)
+            if pages is not None:
+                return LeituraDocumento(filepath, pages=pages)
+        if os.path.splitext(filepath)[1].lower() == '.pdf':
+            return LeituraPdf(filepath, db, arquivo_hash)
+        return LeituraDocumento(filepath, db, arquivo_hash)
+
+    @staticmethod
+    def extract_pages_cached(filepath, db, progress=None, workers=1, arquivo_hash=None):
+        """Como extract_pages_from_file, mas reaproveita o cache de texto do banco
+
+        Além do cache por arquivo, PDFs usam o cache por página: de uma nova
+        versão de um edital já analisado (ex.: retificação) só as páginas
+        alteradas são extraídas. `arquivo_hash` evita reler o arquivo quando
+        o chamador já calculou o file_hash.
+        """
+        leitura = DocumentAnalyzer.open_document(filepath, db, arquivo_hash)
+        return leitura.extrair(progress, workers)
+
+    @staticmethod
+    def extract_pages_from_file(filepath, progress=None, workers=1, db=None):
+        """Extrai o texto como uma lista (PaginasExtraidas) com uma entrada por página
+
+        PDFs são lidos em processos isolados, com prazo e limite de memória;
+        os com muitas páginas são divididos entre `workers` processos e, com
+        `db`, usam o cache de texto por página. DOCX é dividido nas quebras de
+        página explícitas; demais formatos retornam o documento inteiro como
+        uma única página. Erros de leitura não são levantados: ficam em
+        `falha`, com as páginas extraídas até ali.
+        """
+        ext = os.path.splitext(filepath)[1].lower()
+        
+        try:
+            if ext == '.pdf':
+                return LeituraPdf(filepath, db).extrair(progress, workers)
+            
+            elif ext in ['.doc', '.docx']:
+                pages = DocumentAnalyzer._extract_docx_pages(filepath)
+            
+            else:
+                # .txt, .rtf e demais extensões: texto plano
+                pages = [DocumentAnalyzer._extract_text_file(filepath)]
+        
+        except AnaliseCancelada:
+            raise
+        except MemoryError:
+            return PaginasExtraidas(falha=FalhaExtracao(isolamento.MEMORIA))
+        except Exception as e:
+            return PaginasExtraidas(falha=FalhaExtracao(isolamento.LEITURA, f"{type(e).__name__}: {e}"))
+        
+        if progress:
+            progress(1, 1)
+        return PaginasExtraidas(pages)
+
+    @staticmethod
+    def _extract_docx_pages(filepath):
+        """Texto do DOCX lido direto do XML, sem montar o modelo do python-docx
+
+        Inclui as tabelas (onde costumam estar as especificações dos itens);
+        o texto dos cabeçalhos vai no início da primeira página e o dos
+        rodapés no fim da última, uma vez cada.
+        """
+        import zipfile
+        with zipfile.ZipFile(filepath) as arquivo:
+            with arquivo.open('word/document.xml') as parte:
+                pages = DocumentAnalyzer._docx_part_pages(parte)
+            
+            nomes = sorted(arquivo.namelist(), key=lambda n: (len(n), n))
+            extras = {}
+            for tipo in ('header', 'footer'):
+                textos = []
+                for nome in nomes:
+                    if re.fullmatch(rf'word/{tipo}\d*\.xml', nome):
+                        with arquivo.open(nome) as parte:
+                            texto = "\n".join(DocumentAnalyzer._docx_part_pages(parte)).strip()
+                        # Primeira página, páginas pares e demais costumam repetir o texto
+                        if texto and texto not in textos:
+                            textos.append(texto)
+                extras[tipo] = "\n".join(textos)
+        
+        if extras['header']:
+            pages[0] = extras['header'] + "\n" + pages[0]
+        if extras['footer']:
+            pages[-1] = pages[-1] + extras['footer'] + "\n"
+        return pages
+
+    @staticmethod
+    def _docx_part_pages(parte):
+        """Páginas de texto de uma parte XML do DOCX, lida de forma incremental
+
+        Cada parágrafo termina em uma quebra de linha e cada célula de tabela
+        em uma tabulação; quebras de página explícitas iniciam uma nova página.
+        """
+        from xml.etree.ElementTree import iterparse
+        texto, paragrafo, tabulacao, quebra, retorno, celula = (
+            _W + nome for nome in ('t', 'p', 'tab', 'br', 'cr', 'tc'))
+        alternativa, substituto = _MC + 'Choice', _MC + 'Fallback'
+        tipo, valor = _W + 'type', _W + 'val'
+        
+        pages, partes = [], []
+        # Conteúdo alternativo (caixas de texto): o substituto repete o texto
+        # da primeira alternativa e é descartado ao terminar
+        marcas = []
+        for _, elem in iterparse(parte):
+            tag = elem.tag
+            if tag == texto:
+                if elem.text:
+                    partes.append(elem.text)
+            elif tag == paragrafo:
+                partes.append("\n")
+                elem.clear()
+            elif tag == celula:
+                partes.append("\t")
+                elem.clear()
+            elif tag == tabulacao:
+                # w:tab sem w:val é a tabulação do texto; com w:val, a definição de uma parada
+                if elem.get(valor) is None:
+                    partes.append("\t")
+            elif tag == quebra or tag == retorno:
+                if elem.get(tipo) == 'page':
+                    pages.append("".join(partes))
+                    partes = []
+                else:
+                    partes.append("\n")
+            elif tag == alternativa:
+                marcas.append((len(pages), len(partes)))
+            elif tag == substituto and marcas:
+                pagina, inicio = marcas.pop()
+                if pagina == len(pages):
+                    del partes[inicio:]
+                elem.clear()
+        pages.append("".join(partes))
+        return pages
+
+    @staticmethod
+    def _extract_text_file(filepath):
+        """Lê um arquivo de texto mapeado em memória, detectando a codificação
+
+        UTF-8 (com ou sem BOM) e UTF-16 com BOM; o que não for UTF-8 válido é
+        lido como Windows-1252, comum em editais gerados no Windows, ou como
+        Latin-1 se tiver bytes fora dessa tabela.
+        """
+        with open(filepath, 'rb') as file:
+            if os.fstat(file.fileno()).st_size == 0:
+                return ""
+            with mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as dados:
+                if dados[:3] == codecs.BOM_UTF8:
+                    codificacoes = ('utf-8-sig',)
+                elif dados[:2] in (codecs.BOM_UTF16_LE, codecs.BOM_UTF16_BE):
+                    codificacoes = ('utf-16',)
+                else:
+                    codificacoes = ('utf-8', 'cp1252', 'latin-1')
+                for codificacao in codificacoes[:-1]:
+                    try:
+                        text = str(dados, codificacao)
+                        break
+                    except UnicodeDecodeError:
+                        continue
+                else:
+                    text = str(dados, codificacoes[-1])
+        # Mesmas quebras de linha da leitura em modo texto
+        if "\r" in text:
+            text = text.replace("\r\n", "\n").replace("\r", "\n")
+        return text
+
+    @staticmethod
+    def _dividir_paginas(indices, workers):
+        """Faixas contíguas de `indices`, uma por processo de extração"""
+        if workers <= 1 or len(indices) < DocumentAnalyzer.PAGINAS_MIN_PARALELO:
+            return [indices]
+        tamanho = -(-len(indices) // workers)
+        return [indices[inicio:inicio + tamanho] for inicio in range(0, len(indices), tamanho)]
+
+    @staticmethod
+    def _pdf_worker(conn, filepath, indices=None, reabrir=False):
+        """Corpo do processo isolado de extração de um PDF
+
+        Sem `indices`, envia ('paginas', total) e atende os pedidos do
+        processo principal (ver LeituraPdf): ('chaves',), respondido com
+        ('chaves', chaves do cache por página), e ('extrair', indices, reabrir).
+        Cada página vai em uma mensagem ('pagina', i, texto). Com `reabrir` o
+        PDF é reaberto a cada PAGINAS_POR_LEITOR páginas, liberando o cache do PyPDF2.
+        """
+        import PyPDF2
+        with open(filepath, 'rb') as file:
+            pdf_reader = PyPDF2.PdfReader(file)
+            if indices is None:
+                conn.send(('paginas', len(pdf_reader.pages)))
+                pedido = conn.recv()
+                if pedido[0] == 'chaves':
+                    conn.send(('chaves', DocumentAnalyzer._pdf_page_keys(pdf_reader)))
+                    pedido = conn.recv()
+                _, indices, reabrir = pedido
+            for numero, i in enumerate(indices):
+                if reabrir and numero and not numero % DocumentAnalyzer.PAGINAS_POR_LEITOR:
+                    pdf_reader = PyPDF2.PdfReader(file)
+                conn.send(('pagina', i, pdf_reader.pages[i].extract_text()))
+
+    @staticmethod
+    def _pdf_page_keys(pdf_reader):
+        """Chave de cada página para o cache: hash do conteúdo e dos recursos
+
+        Cobre tudo o que o extract_text lê (fluxo de conteúdo, fontes e seus
+        mapas de caracteres, XObjects de formulário e a rotação), então páginas
+        com a mesma chave têm o mesmo texto. Objetos compartilhados entre
+        páginas (fontes) são resumidos uma única vez.
+        """
+        from PyPDF2.generic import ArrayObject, DictionaryObject, IndirectObject, StreamObject
+        resumos = {}
+        # isinstance nos tipos do PyPDF2 é lento: a classificação é feita uma vez por tipo
+        tipos = {}
+
+        def tipo(obj):
+            classe = type(obj)
+            if classe not in tipos:
+                for base in (IndirectObject, StreamObject, DictionaryObject, ArrayObject):
+                    if issubclass(classe, base):
+                        tipos[classe] = base
+                        break
+                else:
+                    tipos[classe] = None
+            return tipos[classe]
+
+        def resumir(obj):
+            base = tipo(obj)
+            if base is IndirectObject:
+                ref = (obj.idnum, obj.generation)
+                if ref not in resumos:
+                    resumos[ref] = b'ciclo'
+                    resumos[ref] = resumir(obj.get_object())
+                return resumos[ref]
+            digest = hashlib.blake2b(digest_size=16)
+            if base is DictionaryObject or base is StreamObject:
+                digest.update(b'<<')
+                for chave in sorted(obj):
+                    if chave != '/Parent':
+                        digest.update(chave.encode('utf-8') + resumir(obj[chave]))
+                # Imagens não têm texto: o conteúdo delas não entra na chave
+                if base is StreamObject and obj.get('/Subtype') != '/Image':
+                    digest.update(obj.get_data())
+            elif base is ArrayObject:
+                digest.update(b'[')
+                if any(tipo(item) is not None for item in obj):
+                    for item in obj:
+                        digest.update(resumir(item))
+                else:
+                    # Listas só de valores simples (ex.: larguras das fontes) de uma vez
+                    digest.update(repr(obj).encode('utf-8'))
+            else:
+                digest.update(repr(obj).encode('utf-8'))
+            return digest.digest()
+
+        chaves = []
+        for page in pdf_reader.pages:
+            digest = hashlib.blake2b(digest_size=16)
+            for chave in ('/Contents', '/Resources', '/Rotate'):
+                digest.update(chave.encode('utf-8') + resumir(page.get(chave)))
+            chaves.append(digest.hexdigest())
+        return chaves
+
+    @staticmethod
+    def count_pages(filepath):
+        """Número de páginas do PDF (1 para os demais formatos, 0 se não puder ser lido)
+
+        O PDF é aberto em um processo isolado, com os limites da extração.
+        Para analisar, prefira open_document: o mesmo processo informa o
+        número de páginas e extrai o texto.
+        """
+        if os.path.splitext(filepath)[1].lower() != '.pdf':
+            return 1
+        leitura = LeituraPdf(filepath)
+        leitura.encerrar()
+        return leitura.total or 0
+
+    @staticmethod
+    def extract_page(filepath, numero):
+        """Texto de uma única página (numeração a partir de 0), ou None se não puder ser lida"""
+        return DocumentAnalyzer.extract_selected_pages(filepath, [numero]).get(numero)
+
+    @staticmethod
+    def extract_selected_pages(filepath, numeros):
+        """Texto de algumas páginas (numeração a partir de 0): {número: texto}
+
+        Para exibir páginas sob demanda sem extrair o documento inteiro; o
+        PDF é lido (uma vez para todas as `numeros`) em um processo isolado,
+        com os limites da extração. Páginas que não puderam ser lidas ficam de
+        fora.
+        """
+        if os.path.splitext(filepath)[1].lower() != '.pdf':
+            pages = DocumentAnalyzer.extract_pages_from_file(filepath)
+            return {numero: pages[numero] for numero in numeros if 0 <= numero < len(pages)}
+        paginas = {}
+        processo = isolamento.ProcessoIsolado(DocumentAnalyzer._pdf_worker, (filepath, list(numeros)),
+                                              DocumentAnalyzer.MEMORIA_LIMITE_EXTRACAO_MB)
+        prazo = time.monotonic() + DocumentAnalyzer.TEMPO_LIMITE_EXTRACAO
+        try:
+            for _, mensagem in isolamento.mensagens([processo], prazo):
+                paginas[mensagem[1]] = mensagem[2]
+        except FalhaExtracao:
+            pass
+        finally:
+            processo.encerrar()
+        return paginas
+
+    @staticmethod
+    def iter_pages_from_file(filepath, progress=None, extracao=None):
+        """Gera o texto página a página, sem manter o documento inteiro em memória
+
+        Mesmo texto de extract_pages_from_file; formatos sem páginas geram uma
+        única página. Se a extração for interrompida, a geração termina nas
+        páginas já extraídas e, com `extracao` (dict), a falha fica em
+        extracao['falha'] (None se o documento foi lido inteiro).
+        """
+        return DocumentAnalyzer.open_document(filepath).iterar(progress, extracao)
+
+    @staticmethod
+    def normalize_text(text):
+        """Normaliza o texto para análise"""
+        # Converte para minúsculas
+        text = text.lower()
+        
+        # Remove caracteres especiais, mantendo letras, números, espaços e acentos
+        # Esta regex mantém letras (incluindo acentuadas), números e espaços
+        text = re.sub(r'[^\w\sáàâãéèêíìîóòôõúùûçÁÀÂÃÉÈÊÍÌÎÓÒÔÕÚÙÛÇ]', ' ', text)
+        
+        # Remove múltiplos espaços
+        text = re.sub(r'\s+', ' ', text)
+        
+        return text.strip()
+
+    @staticmethod
+    def normalize_document(text):
+        """Normaliza o documento uma única vez (aceita um NormalizedDocument pronto)"""
+        if isinstance(text, NormalizedDocument):
+            return text
+        return NormalizedDocument(text)
+
+    @staticmethod
+    def split_palavras(palavras):
+        """Converte a string de palavras separadas por vírgula em lista"""
+        return [p.strip().lower() for p in (palavras or '').split(',') if p.strip()]
+
+    @staticmethod
+    def count_occurrences(text, word_list, matches=None):
+        """Conta ocorrências das palavras (frases aceitam a variação sem espaços)"""
+        if matches is None:
+            matcher = KeywordMatcher()
+            for word in word_list:
+                matcher.add_keyword(word)
+            matches = matcher.scan(text)
+
+        return sum(matches.keyword_count(word) for word in word_list)
+
+    @staticmethod
+    def calculate_index(produto, text, palavras_positivas, palavras_negativas, matches=None):
+        """Calcula índice baseado nas palavras positivas e negativas"""
+        if isinstance(text, NormalizedDocument):
+            text = text.text
+        elif matches is None:
+            text = DocumentAnalyzer.normalize_text(text)
+        
+        # Converte strings de palavras para listas
+        pos_list = DocumentAnalyzer.split_palavras(palavras_positivas)
+        neg_list = DocumentAnalyzer.split_palavras(palavras_negativas)
+        
+        return DocumentAnalyzer.calculate_index_from_lists(text, pos_list, neg_list, matches)
+
+    @staticmethod
+    def calculate_index_from_lists(text, pos_list, neg_list, matches=None):
+        """Calcula o índice a partir das listas de palavras já separadas"""
+        # Conta ocorrências usando o método inteligente
+        pos_count = DocumentAnalyzer.count_occurrences(text, pos_list, matches)
+        neg_count = DocumentAnalyzer.count_occurrences(text, neg_list, matches)
+        
+        # Calcula índice
+        total_ocorrencias = pos_count + neg_count
+        if total_ocorrencias == 0:
+            return 0, 0, 0
+        
+        # Fórmula: (positivas - negativas) / total * 100
+        index = ((pos_count - neg_count) / total_ocorrencias) * 100
+        
+        # Garante que o índice não seja negativo
+        if index < 0:
+            index = 0
+        
+        return round(index, 2), pos_count, neg_count
+
+    @staticmethod
+    def iter_products_in_text(text, produtos, matches=None):
+        """Gera os resultados produto a produto, na ordem do catálogo
+
+        `text` pode ser o texto bruto ou um NormalizedDocument já pronto;
+        `produtos` pode ser a lista de linhas de Database.get_produtos() ou um
+        CompiledCatalog já compilado (Database.get_catalogo()). `matches` é o
+        resultado de `produtos.scan()`, quando o chamador já o tem.
+        """
+        documento = DocumentAnalyzer.normalize_document(text)
+        
+        if not isinstance(produtos, CompiledCatalog):
+            produtos = CompiledCatalog(produtos)
+        
+        # Uma única passada pelo texto para todos os nomes e palavras-chave
+        if matches is None:
+            matches = produtos.scan(documento.text)
+        
+        return DocumentAnalyzer.iter_products_from_matches(produtos, matches)
+
+    @staticmethod
+    def iter_products_from_matches(produtos, matches):
+        """Gera os resultados de um CompiledCatalog a partir das contagens já feitas"""
+        for produto in produtos:
+            # Verifica se o nome do produto aparece no texto (palavras inteiras)
+            if matches.found(produto.nome_normalized):
+                # As contagens vêm de `matches`; o texto não é mais necessário
+                index, pos_count, neg_count = DocumentAnalyzer.calculate_index_from_lists(
+                    None, produto.pos_list, produto.neg_list, matches
+                )
+                
+                # Adiciona informações detalhadas sobre as palavras encontradas
+                palavras_encontradas = DocumentAnalyzer.get_palavras_encontradas_from_lists(
+                    None, produto.pos_list, produto.neg_list, matches
+                )
+                
+                yield {
+                    'id': produto.id,
+                    'nome': produto.nome,
+                    'descricao': produto.descricao,
+                    'indice': index,
+                    'positivas_encontradas': pos_count,
+                    'negativas_encontradas': neg_count,
+                    'palavras_positivas': produto.palavras_positivas,
+                    'palavras_negativas': produto.palavras_negativas,
+                    'palavras_encontradas_lista': palavras_encontradas
+                }
+
+    @staticmethod
+    def analyze_pages(pages, produtos, tempos=None, impressao=None, posicoes=None, normalizadas=None):
+        """Análise em fluxo: normaliza e busca uma página por vez
+
+        `pages` pode ser um gerador (ex.: iter_pages_from_file); só a página
+        atual e o estado da busca ficam em memória. Os índices são os mesmos
+        da análise do texto inteiro. Retorna (resultados ordenados, matches,
+        número de páginas, número de caracteres), com `matches` só com as
+        contagens; os caracteres são os de "\n".join(pages). Se `tempos` for
+        um dict, recebe os segundos gastos em 'normalizacao' e 'busca'.
+        `impressao` (similaridade.ImpressaoDigital) recebe cada página
+        normalizada, para a detecção de quase duplicatas. `posicoes`
+        (IndicePosicoes) recebe as ocorrências de cada termo; a memória usada
+        passa a crescer com o número de ocorrências. `normalizadas` (lista)
+        recebe as páginas normalizadas não vazias: " ".join(normalizadas) é o
+        texto de NormalizedDocument.from_pages, para o índice FTS5.
+        """
+        if not isinstance(produtos, CompiledCatalog):
+            produtos = CompiledCatalog(produtos)
+        
+        busca = produtos.stream(posicoes=posicoes is not None)
+        inicios_paginas = array('l')
+        paginas = caracteres = 0
+        normalizacao = buscando = 0.0
+        for page in pages:
+            caracteres += len(page)
+            inicios_paginas.append(busca.posicao)
+            inicio = time.perf_counter()
+            text_normalized = DocumentAnalyzer.normalize_text(page)
+            if impressao is not None:
+                impressao.adicionar_pagina(text_normalized)
+            if normalizadas is not None and text_normalized:
+                normalizadas.append(text_normalized)
+            meio = time.perf_counter()
+            busca.feed(text_normalized)
+            normalizacao += meio - inicio
+            buscando += time.perf_counter() - meio
+            paginas += 1
+        
+        inicio = time.perf_counter()
+        matches = busca.resultado
+        if posicoes is not None:
+            posicoes.atualizar(IndicePosicoes.das_ocorrencias(matches.offsets, inicios_paginas))
+            matches = matches.sem_posicoes()
+        resultados = list(DocumentAnalyzer.iter_products_from_matches(produtos, matches))
+        resultados.sort(key=lambda x: x['indice'], reverse=True)
+        if tempos is not None:
+            tempos['normalizacao'] = normalizacao
+            tempos['busca'] = buscando + time.perf_counter() - inicio
+        # Mais as quebras de linha entre as páginas
+        return resultados, matches, paginas, caracteres + max(paginas - 1, 0)
+
+    @staticmethod
+    def find_products_in_text(text, produtos):
+        """Encontra produtos no texto e calcula seus índices"""
+        resultados = list(DocumentAnalyzer.iter_products_in_text(text, produtos))
+        
+        # Ordena por índice (maior primeiro)
+        resultados.sort(key=lambda x: x['indice'], reverse=True)
+        return resultados
+
+    @staticmethod
+    def find_products_memoized(arquivo_hash, produtos, db):
+        """Resultados de uma análise anterior do mesmo conteúdo, ou None
+
+        `produtos` é o CompiledCatalog da análise, com as versões do banco.
+        Se o catálogo mudou desde a análise memorizada, só os produtos com
+        versão posterior a ela são recalculados, a partir das contagens de
+        termos guardadas; termos que ainda não tinham sido buscados são
+        contados no texto do cache (sem ele, retorna None). Produtos removidos
+        saem dos resultados. Retorna (resultados ordenados, páginas, caracteres).
+        """
+        if produtos.versao is None:
+            return None
+        memo = db.get_memo_analise(arquivo_hash, DocumentAnalyzer.EXTRATOR_VERSAO)
+        # Memorizada com um catálogo mais novo que este: as versões não dizem o que mudou
+        if memo is None or memo['catalogo_versao'] > produtos.versao:
+            return None
+        if memo['catalogo_versao'] == produtos.versao:
+            return memo['resultados'], memo['paginas'], memo['caracteres']
+        
+        versao_memo = memo['catalogo_versao']
+        alterados = [p for p in produtos if produtos.versoes.get(p.id, 0) > versao_memo]
+        matches = memo['matches']
+        faltando = {term for produto in alterados for term in produto.terms()
+                    if term not in matches.terms and KeywordMatcher.TERMO_VALIDO.fullmatch(term)}
+        if faltando:
+            pages = db.get_texto_cache(arquivo_hash, DocumentAnalyzer.EXTRATOR_VERSAO)
+            if pages is None:
+                return None
+            documento = NormalizedDocument.from_pages(pages)
+            extras = KeywordMatcher(faltando).scan(documento.text)
+            matches.counts.update(extras.counts)
+            matches.terms = matches.terms | extras.terms
+            # As posições dos termos novos completam o índice do documento
+            db.adicionar_posicoes(arquivo_hash, DocumentAnalyzer.EXTRATOR_VERSAO,
+                                  IndicePosicoes.das_ocorrencias(extras.offsets, documento.page_starts))
+        
+        resultados = [r for r in memo['resultados']
+                      if r['id'] in produtos.produtos and produtos.versoes.get(r['id'], 0) <= versao_memo]
+        resultados += DocumentAnalyzer.iter_products_from_matches(
+            CompiledCatalog(produto.produto for produto in alterados), matches
+        )
+        # Mesma ordem de uma análise do zero: catálogo e, de forma estável, índice
+        ordem = {produto.id: i for i, produto in enumerate(produtos)}
+        resultados.sort(key=lambda x: ordem[x['id']])
+        resultados.sort(key=lambda x: x['indice'], reverse=True)
+        
+        db.salvar_memo_analise(arquivo_hash, DocumentAnalyzer.EXTRATOR_VERSAO, produtos.versao,
+                               resultados, matches, memo['paginas'], memo['caracteres'])
+        return resultados, memo['paginas'], memo['caracteres']
+
+    @staticmethod
+    def memoize_results(arquivo_hash, produtos, db, resultados, matches, paginas, caracteres):
+        """Guarda uma análise completa para find_products_memoized
+
+        Só para catálogos com versão e análises do documento inteiro (sem
+        falha na extração).
+        """
+        if produtos.versao is None or matches is None or matches.texto_vazio:
+            return
+        db.salvar_memo_analise(arquivo_hash, DocumentAnalyzer.EXTRATOR_VERSAO, produtos.versao,
+                               resultados, matches, paginas, caracteres)
+
+    @staticmethod
+    def get_palavras_encontradas(text, palavras_positivas, palavras_negativas, matches=None):
+        """Retorna lista das palavras específicas encontradas no texto"""
+        if isinstance(text, NormalizedDocument):
+            text = text.text
+        pos_list = DocumentAnalyzer.split_palavras(palavras_positivas)
+        neg_list = DocumentAnalyzer.split_palavras(palavras_negativas)
+        return DocumentAnalyzer.get_palavras_encontradas_from_lists(text, pos_list, neg_list, matches)
+
+    @staticmethod
+    def get_palavras_encontradas_from_lists(text, pos_list, neg_list, matches=None):
+        if matches is None:
+            matcher = KeywordMatcher()
+            for palavra in pos_list + neg_list:
+                matcher.add_keyword(palavra)
+            matches = matcher.scan(text)
+        
+        encontradas = [f"✓ {palavra}" for palavra in pos_list if matches.keyword_found(palavra)]
+        encontradas += [f"✗ {palavra}" for palavra in neg_list if matches.keyword_found(palavra)]
+        return encontradas
+
+    @staticmethod
+    def context_bounds(text_normalized, inicio, fim, context_words=10):
+        """Intervalo (normalizado) do contexto de uma ocorrência [inicio, fim)"""
+        return (max(0, inicio - (context_words * 10)),
+                min(len(text_normalized), fim + (context_words * 10)))
+
+    @staticmethod
+    def extract_product_context(text, product_name, context_words=10, matches=None):
+        """Extrai o contexto onde o produto é mencionado, com a grafia original"""
+        documento = DocumentAnalyzer.normalize_document(text)
+        text_normalized = documento.text
+        product_normalized = DocumentAnalyzer.normalize_text(product_name)
+        
+        # Encontra todas as ocorrências do produto
+        if matches is not None:
+            ocorrencias = matches.positions(product_normalized)
+        else:
+            pattern = r'\b' + re.escape(product_normalized) + r'\b'
+            ocorrencias = [m.span() for m in re.finditer(pattern, text_normalized)]
+        
+        contexts = []
+        for inicio, fim in ocorrencias[:3]:
+            start, end = DocumentAnalyzer.context_bounds(text_normalized, inicio, fim, context_words)
+            
+            # Recorta o trecho do texto original pelo mapa de posições
+            context = ' '.join(documento.original_slice(start, end).split())
+            # Adiciona reticências se cortou texto
+            if start > 0:
+                context = "..." + context
+            if end < len(text_normalized):
+                context = context + "..."
+            
+            contexts.append(context)
+        
+        return contexts  # Retorna até 3 contextos
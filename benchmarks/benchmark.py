@@ -0,0 +1,193 @@
+# benchmarks/benchmark.py
+"""Benchmark das etapas do DocumentAnalyzer (extração, normalização e busca)
+
+Uso (a partir da raiz do projeto):
+    python benchmarks/benchmark.py --saida resultado.json
+    python benchmarks/benchmark.py --paginas 10 100 --produtos 10 1000 --comparar anterior.json
+
+Cada etapa é medida `--repeticoes` vezes (vale o menor tempo) e, em uma
+passada separada com tracemalloc, tem o pico de memória registrado.
+"""
+import argparse
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+import tracemalloc
+from datetime import datetime
+
+RAIZ = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, RAIZ)
+
+from analyzer import DocumentAnalyzer  # noqa: E402
+from sintetico import edital_sintetico, gerar_catalogo  # noqa: E402
+
+
+EDITAL_REAL = os.path.join(RAIZ, 'documentos', 'PE+01-2025+-+EDITAL.pdf')
+PAGINAS_PADRAO = (10, 100, 1000)
+PRODUTOS_PADRAO = (10, 1000, 10000)
+FORMATO = 1
+
+
+def medir(funcao, repeticoes, memoria):
+    """Executa `funcao`; devolve (resultado, menor tempo, tempo médio, pico em KB)"""
+    tempos = []
+    for _ in range(repeticoes):
+        inicio = time.perf_counter()
+        resultado = funcao()
+        tempos.append(time.perf_counter() - inicio)
+
+    pico = None
+    if memoria:
+        tracemalloc.start()
+        funcao()
+        pico = tracemalloc.get_traced_memory()[1] // 1024
+        tracemalloc.stop()
+    return resultado, min(tempos), sum(tempos) / len(tempos), pico
+
+
+def registrar(resultados, documento, etapa, medicao, produtos=None, chamadas=1):
+    _, menor, media, pico = medicao
+    resultados.append({
+        'documento': documento['nome'],
+        'paginas': documento['paginas'],
+        'caracteres': documento['caracteres'],
+        'produtos': produtos,
+        'etapa': etapa,
+        'chamadas': chamadas,
+        'segundos': round(menor, 6),
+        'segundos_media': round(media, 6),
+        'pico_memoria_kb': pico,
+    })
+    descricao = f"{documento['nome']} ({documento['paginas']} pág.)"
+    if produtos is not None:
+        descricao += f", {produtos} produtos"
+    memoria = f"{pico:>9} KB" if pico is not None else ""
+    print(f"  {menor:10.4f} s {memoria}  {etapa:28} {descricao}", file=sys.stderr)
+
+
+def benchmark_documento(resultados, nome, caminho, catalogos, args):
+    memoria = not args.sem_memoria
+    documento = {'nome': nome, 'paginas': DocumentAnalyzer.count_pages(caminho), 'caracteres': None}
+
+    medicao = medir(lambda: DocumentAnalyzer.extract_text_from_file(caminho), args.repeticoes, memoria)
+    texto = medicao[0]
+    documento['caracteres'] = len(texto)
+    registrar(resultados, documento, 'extract_text_from_file', medicao)
+
+    medicao = medir(lambda: DocumentAnalyzer.normalize_text(texto), args.repeticoes, memoria)
+    texto_normalizado = medicao[0]
+    registrar(resultados, documento, 'normalize_text', medicao)
+
+    for quantidade, catalogo in catalogos:
+        medicao = medir(lambda: DocumentAnalyzer.find_products_in_text(texto, catalogo),
+                        args.repeticoes, memoria)
+        encontrados = medicao[0]
+        registrar(resultados, documento, 'find_products_in_text', medicao, quantidade)
+
+        # Chamadas avulsas (sem o MatchResult compartilhado), para uma amostra de produtos
+        amostra = encontrados[:args.amostra] or [
+            {'nome': p[1], 'palavras_positivas': p[3], 'palavras_negativas': p[4]}
+            for p in catalogo[:args.amostra]
+        ]
+
+        def palavras():
+            return [DocumentAnalyzer.get_palavras_encontradas(
+                texto_normalizado, r['palavras_positivas'], r['palavras_negativas']) for r in amostra]
+
+        def contexto():
+            return [DocumentAnalyzer.extract_product_context(texto, r['nome']) for r in amostra]
+
+        registrar(resultados, documento, 'get_palavras_encontradas',
+                  medir(palavras, args.repeticoes, memoria), quantidade, len(amostra))
+        registrar(resultados, documento, 'extract_product_context',
+                  medir(contexto, args.repeticoes, memoria), quantidade, len(amostra))
+
+
+def commit_atual():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=RAIZ,
+                              capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def comparar(atual, caminho_anterior):
+    """Mostra a razão entre os tempos desta execução e os de uma execução anterior"""
+    with open(caminho_anterior, encoding='utf-8') as arquivo:
+        anterior = json.load(arquivo)
+    chave = lambda r: (r['documento'], r['paginas'], r['produtos'], r['etapa'])  # noqa: E731
+    tempos_anteriores = {chave(r): r['segundos'] for r in anterior['resultados']}
+
+    print(f"Comparação com {caminho_anterior} ({anterior.get('commit')}):", file=sys.stderr)
+    for resultado in atual['resultados']:
+        antes = tempos_anteriores.get(chave(resultado))
+        if not antes:
+            continue
+        razao = resultado['segundos'] / antes
+        print(f"  {razao:6.2f}x  {resultado['etapa']:28} {resultado['documento']}, "
+              f"{resultado['produtos'] or '-'} produtos", file=sys.stderr)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--paginas', type=int, nargs='*', default=PAGINAS_PADRAO,
+                        help="tamanhos dos editais sintéticos (padrão: 10 100 1000)")
+    parser.add_argument('--produtos', type=int, nargs='*', default=PRODUTOS_PADRAO,
+                        help="tamanhos dos catálogos sintéticos (padrão: 10 1000 10000)")
+    parser.add_argument('--sem-edital-real', action='store_true',
+                        help=f"não inclui {os.path.relpath(EDITAL_REAL, RAIZ)}")
+    parser.add_argument('--repeticoes', type=int, default=3)
+    parser.add_argument('--amostra', type=int, default=20,
+                        help="produtos usados nas chamadas avulsas de palavras e contexto")
+    parser.add_argument('--sem-memoria', action='store_true',
+                        help="não mede o pico de memória (a passada com tracemalloc é lenta)")
+    parser.add_argument('--dados', default=os.path.join(tempfile.gettempdir(), 'analisa_licitacoes_bench'),
+                        help="pasta dos editais sintéticos gerados")
+    parser.add_argument('--saida', help="arquivo JSON de saída (padrão: saída padrão)")
+    parser.add_argument('--comparar', help="JSON de uma execução anterior para comparar")
+    args = parser.parse_args(argv)
+
+    os.makedirs(args.dados, exist_ok=True)
+    catalogos = [(quantidade, gerar_catalogo(quantidade)) for quantidade in args.produtos]
+
+    documentos = []
+    if not args.sem_edital_real and os.path.exists(EDITAL_REAL):
+        documentos.append((os.path.basename(EDITAL_REAL), EDITAL_REAL))
+    for paginas in args.paginas:
+        documentos.append((f"sintetico_{paginas}p", edital_sintetico(args.dados, paginas)))
+
+    resultados = []
+    inicio = time.perf_counter()
+    for nome, caminho in documentos:
+        benchmark_documento(resultados, nome, caminho, catalogos, args)
+
+    saida = {
+        'formato': FORMATO,
+        'data': datetime.now().isoformat(timespec='seconds'),
+        'commit': commit_atual(),
+        'python': platform.python_version(),
+        'plataforma': platform.platform(),
+        'cpus': os.cpu_count(),
+        'repeticoes': args.repeticoes,
+        'segundos_total': round(time.perf_counter() - inicio, 3),
+        'resultados': resultados,
+    }
+
+    texto = json.dumps(saida, ensure_ascii=False, indent=2)
+    if args.saida:
+        with open(args.saida, 'w', encoding='utf-8') as arquivo:
+            arquivo.write(texto + "\n")
+    else:
+        print(texto)
+
+    if args.comparar:
+        comparar(saida, args.comparar)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,125 @@
+# benchmarks/sintetico.py
+"""Editais (PDF) e catálogos de produtos sintéticos, gerados de forma determinística"""
+import os
+import random
+
+
+# Vocabulário de licitações; os catálogos usam as mesmas palavras, então parte
+# dos produtos aparece nos editais gerados
+VOCABULARIO = """
+aquisição registro preço pregão eletrônico edital licitação contratação empresa
+fornecimento material materiais equipamento equipamentos reagente reagentes insumo
+insumos laboratorial laboratoriais hospitalar hospitalares médico médicos cirúrgico
+odontológico veterinário limpeza higiene escritório papel papelaria cartucho toner
+impressora computador notebook monitor teclado mouse cabo rede switch roteador
+servidor software licença manutenção preventiva corretiva serviço serviços
+combustível gasolina diesel pneu pneus peça peças veículo veículos ambulância
+alimento alimentos merenda escolar gênero gêneros alimentícios carne frango arroz
+feijão leite café açúcar óleo água mineral gás cozinha copa descartável descartáveis
+luva luvas máscara seringa agulha cateter gaze algodão álcool sabonete detergente
+desinfetante vassoura rodo balde saco lixo cadeira mesa armário arquivo estante
+ar condicionado ventilador lâmpada led elétrico elétricos hidráulico construção
+cimento areia tijolo tinta pincel ferramenta ferramentas uniforme uniformes
+calçado bota capacete segurança proteção individual epi kit teste rápido exame
+análise clínica sangue urina glicose hemograma tubo coleta vácuo pipeta ponteira
+estufa microscópio centrífuga balança precisão termômetro oxímetro
+município prefeitura secretaria saúde educação obras administração departamento
+item itens lote lotes quantidade unidade caixa pacote frasco litro quilo metro
+prazo entrega dias úteis contados partir recebimento ordem nota fiscal pagamento
+proposta propostas lance lances valor estimado total global unitário menor
+habilitação jurídica fiscal trabalhista técnica econômica financeira documento
+documentos certidão negativa débitos declaração atestado capacidade
+conforme especificações anexo termo referência condições objeto presente
+""".split()
+
+# Palavras de ligação que tornam o texto parecido com o de um edital
+LIGACAO = "de da do das dos e a o para com em no na por que ao se".split()
+
+
+def gerar_catalogo(quantidade, seed=1):
+    """Linhas no formato de Database.get_produtos(), com palavras e frases misturadas"""
+    rnd = random.Random(seed)
+
+    def termo():
+        # Metade das palavras-chave são frases de 2 ou 3 palavras
+        return ' '.join(rnd.sample(VOCABULARIO, rnd.choice((1, 1, 2, 3))))
+
+    produtos = []
+    for produto_id in range(1, quantidade + 1):
+        nome = ' '.join(rnd.sample(VOCABULARIO, rnd.choice((1, 2, 2, 3))))
+        positivas = ', '.join(termo() for _ in range(rnd.randint(2, 6)))
+        negativas = ', '.join(termo() for _ in range(rnd.randint(0, 3)))
+        produtos.append((produto_id, nome, '', positivas, negativas, None))
+    return produtos
+
+
+def gerar_linhas(rnd, quantidade, largura=80):
+    linhas = []
+    for _ in range(quantidade):
+        palavras = []
+        tamanho = 0
+        while tamanho < largura:
+            palavra = rnd.choice(LIGACAO) if rnd.random() < 0.3 else rnd.choice(VOCABULARIO)
+            if rnd.random() < 0.05:
+                palavra = palavra.upper() + rnd.choice((',', '.', ';', ':'))
+            palavras.append(palavra)
+            tamanho += len(palavra) + 1
+        linhas.append(' '.join(palavras))
+    return linhas
+
+
+def _escapar(linha):
+    texto = linha.replace('\\', '\\\\').replace('(', '\\(').replace(')', '\\)')
+    return texto.encode('cp1252', errors='replace')
+
+
+def gerar_edital(caminho, paginas, seed=1, linhas_por_pagina=25):
+    """Grava um PDF com `paginas` páginas de texto (cerca de 2000 caracteres cada)
+
+    PDF mínimo escrito à mão (fonte Helvetica, WinAnsiEncoding), suficiente
+    para o PyPDF2 extrair o texto como de um edital real.
+    """
+    rnd = random.Random(seed)
+    objetos = [
+        b"<< /Type /Catalog /Pages 2 0 R >>",
+        None,  # Árvore de páginas, preenchida no final
+        b"<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica /Encoding /WinAnsiEncoding >>",
+    ]
+
+    kids = []
+    for numero in range(1, paginas + 1):
+        linhas = gerar_linhas(rnd, linhas_por_pagina)
+        conteudo = b"BT /F1 9 Tf 12 TL 40 800 Td\n"
+        conteudo += b"".join(b"(" + _escapar(linha) + b") Tj T*\n" for linha in linhas)
+        conteudo += f"(Página {numero} de {paginas}) Tj\nET".encode('cp1252')
+
+        objetos.append(b"<< /Length %d >>\nstream\n" % len(conteudo) + conteudo + b"\nendstream")
+        conteudo_id = len(objetos)
+        objetos.append(
+            b"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 595 842] "
+            b"/Resources << /Font << /F1 3 0 R >> >> /Contents %d 0 R >>" % conteudo_id
+        )
+        kids.append(b"%d 0 R" % len(objetos))
+    objetos[1] = b"<< /Type /Pages /Kids [" + b" ".join(kids) + b"] /Count %d >>" % paginas
+
+    saida = bytearray(b"%PDF-1.4\n")
+    posicoes = []
+    for numero, objeto in enumerate(objetos, 1):
+        posicoes.append(len(saida))
+        saida += b"%d 0 obj\n" % numero + objeto + b"\nendobj\n"
+    xref = len(saida)
+    saida += b"xref\n0 %d\n0000000000 65535 f \n" % (len(objetos) + 1)
+    saida += b"".join(b"%010d 00000 n \n" % posicao for posicao in posicoes)
+    saida += b"trailer\n<< /Size %d /Root 1 0 R >>\nstartxref\n%d\n%%%%EOF\n" % (len(objetos) + 1, xref)
+
+    with open(caminho, 'wb') as arquivo:
+        arquivo.write(saida)
+    return caminho
+
+
+def edital_sintetico(pasta, paginas, seed=1):
+    """Caminho do edital sintético de `paginas` páginas, gerado só se ainda não existir"""
+    caminho = os.path.join(pasta, f"edital_sintetico_{paginas}p_s{seed}.pdf")
+    if not os.path.exists(caminho):
+        gerar_edital(caminho, paginas, seed)
+    return caminho
@@ -0,0 +1,497 @@
+# cli.py
+"""Modo de linha de comando: analisa uma pasta inteira de editais sem interface gráfica"""
+import argparse
+import cProfile
+import glob
+import os
+import threading
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import isolamento
+from analyzer import CompiledCatalog, DocumentAnalyzer, IndicePosicoes, NormalizedDocument
+from database import Database
+from similaridade import ImpressaoDigital, buscar_quase_duplicata, descrever
+
+
+EXTENSOES = ('.pdf', '.doc', '.docx', '.txt', '.rtf')
+
+# Estado de cada processo do pool, preparado uma única vez pelo initializer
+_catalogo = None
+_db = None
+
+
+def listar_documentos(pasta, recursivo=False):
+    """Lista os documentos suportados da pasta, em ordem alfabética"""
+    if recursivo:
+        arquivos = [os.path.join(raiz, nome)
+                    for raiz, _, nomes in os.walk(pasta) for nome in nomes]
+    else:
+        arquivos = [os.path.join(pasta, nome) for nome in os.listdir(pasta)]
+    return sorted(f for f in arquivos
+                  if os.path.isfile(f) and os.path.splitext(f)[1].lower() in EXTENSOES)
+
+
+def _iniciar_processo(produtos, db_path, versoes=None, tempo_limite=None, memoria_limite_mb=None):
+    """Compila o catálogo uma vez por processo e abre a conexão do cache de texto
+
+    `versoes` é a versão do catálogo e o dict de versões dos produtos
+    (Database.get_catalogo_versionado), para reaproveitar análises
+    memorizadas. `tempo_limite` e `memoria_limite_mb` substituem os limites
+    da extração de cada documento (DocumentAnalyzer.TEMPO_LIMITE_EXTRACAO e
+    MEMORIA_LIMITE_EXTRACAO_MB).
+    """
+    global _catalogo, _db
+    _catalogo = CompiledCatalog(produtos, *(versoes or ())).snapshot()
+    _db = Database(db_path)
+    if tempo_limite:
+        DocumentAnalyzer.TEMPO_LIMITE_EXTRACAO = tempo_limite
+    if memoria_limite_mb:
+        DocumentAnalyzer.MEMORIA_LIMITE_EXTRACAO_MB = memoria_limite_mb
+
+
+class PoolCatalogo:
+    """Pool de processos com o catálogo compilado, recriado quando o catálogo muda
+
+    Para os modos de longa duração (pasta vigiada e serviço HTTP): a cada
+    envio a versão do catálogo no banco é comparada com a do pool e, se
+    mudou, um pool novo é criado com o catálogo atual. As análises em
+    andamento terminam no pool anterior. Pode ser usado de várias threads.
+    """
+
+    def __init__(self, db, processos):
+        self.db = db
+        self.processos = processos
+        self.executor = None
+        self.versao = None
+        # Número de produtos do catálogo em uso
+        self.produtos = 0
+        self.lock = threading.Lock()
+        with self.lock:
+            self._recriar()
+
+    def _recriar(self):
+        produtos, versao, versoes = self.db.get_catalogo_versionado()
+        anterior = self.executor
+        # Os processos do pool não são cópias (fork) deste: herdariam as threads
+        # do chamador e o estado do forkserver dos processos isolados de extração
+        self.executor = ProcessPoolExecutor(max_workers=self.processos, mp_context=isolamento.contexto(),
+                                            initializer=_iniciar_processo,
+                                            initargs=(produtos, self.db.path, (versao, versoes)))
+        self.versao, self.produtos = versao, len(produtos)
+        if anterior is not None:
+            anterior.shutdown(wait=False)
+
+    def enviar(self, funcao, *args):
+        """Envia `funcao(*args)` ao pool com o catálogo atual; retorna (futuro, versão do catálogo)"""
+        with self.lock:
+            if self.db.get_catalogo_versao() != self.versao:
+                self._recriar()
+            return self.executor.submit(funcao, *args), self.versao
+
+    def encerrar(self):
+        with self.lock:
+            self.executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _erro_sem_texto(falha):
+    if falha is not None:
+        return f"não foi possível extrair texto do documento ({falha})"
+    return "não foi possível extrair texto do documento"
+
+
+def _analise_memorizada(caminho, arquivo_hash, inicio):
+    """Análise anterior do mesmo conteúdo, atualizada para o catálogo atual, ou None"""
+    memorizada = DocumentAnalyzer.find_products_memoized(arquivo_hash, _catalogo, _db)
+    if memorizada is None:
+        return None
+    resultados, paginas, caracteres = memorizada
+    segundos = time.perf_counter() - inicio
+    return {
+        'arquivo': caminho,
+        'arquivo_hash': arquivo_hash,
+        'paginas': paginas,
+        'caracteres': caracteres,
+        'segundos': segundos,
+        'resultados': resultados,
+        # O documento já está no índice e nas impressões pela análise original
+        'texto_normalizado': None,
+        'matches': None,
+        'impressao': None,
+        'erro': None,
+        'memorizada': True,
+        'metricas': {
+            'paginas': paginas,
+            'caracteres': caracteres,
+            'produtos_catalogo': len(_catalogo),
+            'segundos_busca': segundos,
+        },
+    }
+
+
+def analisar_arquivo_streaming(caminho, leitura, arquivo_hash, inicio):
+    """Analisa página a página, com memória limitada (sem cache de texto)
+
+    `leitura` é o documento já aberto (DocumentAnalyzer.open_document). O
+    texto bruto nunca fica inteiro em memória; o texto normalizado (para o
+    índice FTS5) e o índice de posições crescem com o documento.
+    """
+    tempos = {}
+    impressao = ImpressaoDigital()
+    posicoes = IndicePosicoes()
+    extracao = {}
+    normalizadas = []
+    try:
+        pages = leitura.iterar(extracao=extracao)
+        resultados, matches, paginas, caracteres = DocumentAnalyzer.analyze_pages(
+            pages, _catalogo, tempos, impressao, posicoes, normalizadas
+        )
+        erro = None if not matches.texto_vazio else _erro_sem_texto(extracao.get('falha'))
+        if extracao.get('falha') is None:
+            DocumentAnalyzer.memoize_results(arquivo_hash, _catalogo, _db, resultados, matches, paginas,
+                                             caracteres)
+            _db.salvar_posicoes(arquivo_hash, DocumentAnalyzer.EXTRATOR_VERSAO, posicoes)
+    except Exception as e:
+        matches, resultados, paginas, caracteres, erro, impressao = None, [], 0, 0, str(e), None
+    segundos = time.perf_counter() - inicio
+    
+    return {
+        'arquivo': caminho,
+        'arquivo_hash': arquivo_hash,
+        'paginas': paginas,
+        'caracteres': caracteres,
+        'segundos': segundos,
+        'resultados': resultados,
+        'texto_normalizado': " ".join(normalizadas),
+        'matches': matches,
+        'impressao': impressao,
+        'erro': erro,
+        # Na análise em fluxo a extração é o tempo que sobra das outras etapas
+        'metricas': {
+            'paginas': paginas,
+            'caracteres': caracteres,
+            'produtos_catalogo': len(_catalogo),
+            'segundos_extracao': segundos - sum(tempos.values()),
+            'segundos_normalizacao': tempos.get('normalizacao'),
+            'segundos_busca': tempos.get('busca'),
+            'falha_extracao': extracao.get('falha'),
+        },
+    }
+
+
+def analisar_arquivo(caminho, streaming=False):
+    """Extrai e analisa um documento (executado nos processos do pool)
+
+    Com `streaming` None, editais com PAGINAS_STREAMING páginas ou mais são
+    analisados em fluxo, como na interface. O documento é aberto uma única
+    vez: o processo de extração informa o número de páginas e continua com
+    a extração completa ou em fluxo, sempre no processo do pool, não em
+    quem distribui os arquivos.
+    """
+    tempos = {}
+    inicio = time.perf_counter()
+    arquivo_hash = leitura = None
+    try:
+        arquivo_hash = DocumentAnalyzer.file_hash(caminho)
+        memorizada = _analise_memorizada(caminho, arquivo_hash, inicio)
+        if memorizada is not None:
+            return memorizada
+        # Em fluxo o texto não passa pelo cache
+        leitura = DocumentAnalyzer.open_document(caminho, None if streaming else _db, arquivo_hash)
+        if streaming or (streaming is None and leitura.streaming):
+            return analisar_arquivo_streaming(caminho, leitura, arquivo_hash, inicio)
+        pages = leitura.extrair()
+        falha = pages.falha
+        texto = "\n".join(pages)
+        tempos['segundos_extracao'] = time.perf_counter() - inicio
+        
+        etapa = time.perf_counter()
+        documento = NormalizedDocument.from_pages(pages)
+        impressao = ImpressaoDigital.das_paginas(pages)
+        tempos['segundos_normalizacao'] = time.perf_counter() - etapa
+        
+        etapa = time.perf_counter()
+        matches = _catalogo.scan(documento.text)
+        resultados = list(DocumentAnalyzer.iter_products_in_text(documento, _catalogo, matches))
+        resultados.sort(key=lambda x: x['indice'], reverse=True)
+        tempos['segundos_busca'] = time.perf_counter() - etapa
+        erro = None if documento.text else _erro_sem_texto(falha)
+        if falha is None:
+            DocumentAnalyzer.memoize_results(arquivo_hash, _catalogo, _db, resultados, matches,
+                                             len(pages), len(texto))
+            _db.salvar_posicoes(arquivo_hash, DocumentAnalyzer.EXTRATOR_VERSAO,
+                                IndicePosicoes.das_ocorrencias(matches.offsets, documento.page_starts))
+    except Exception as e:
+        pages, texto, documento, matches, resultados, erro = [], "", None, None, [], str(e)
+        impressao = falha = None
+    finally:
+        if leitura is not None:
+            leitura.encerrar()
+    
+    return {
+        'arquivo': caminho,
+        'arquivo_hash': arquivo_hash,
+        'paginas': len(pages),
+        'caracteres': len(texto),
+        'segundos': time.perf_counter() - inicio,
+        'resultados': resultados,
+        'texto_normalizado': documento.text if documento else "",
+        # Só as contagens voltam ao processo principal (para analise_termos)
+        'matches': matches.sem_posicoes() if matches else None,
+        'impressao': impressao,
+        'erro': erro,
+        'metricas': dict(tempos, paginas=len(pages), caracteres=len(texto),
+                         produtos_catalogo=len(_catalogo), falha_extracao=falha),
+    }
+
+
+def imprimir_resumo(analises, segundos, mais_lentos=5):
+    total_paginas = sum(a['paginas'] for a in analises)
+    erros = [a for a in analises if a['erro']]
+    duplicatas = [a for a in analises if a.get('impressao') and a['impressao'].duplicata]
+    # Analisados só com as páginas extraídas antes de a extração ser interrompida
+    parciais = [a for a in analises if not a['erro'] and a['metricas'].get('falha_extracao')]
+    
+    print()
+    print(f"Documentos: {len(analises)} ({len(erros)} com erro, {len(parciais)} com extração "
+          f"interrompida, {len(duplicatas)} quase duplicata(s))")
+    print(f"Páginas: {total_paginas}")
+    print(f"Tempo total: {segundos:.2f} s")
+    if segundos > 0:
+        print(f"Vazão: {len(analises) / segundos:.2f} documentos/s, {total_paginas / segundos:.2f} páginas/s")
+    
+    lentos = sorted(analises, key=lambda a: a['segundos'], reverse=True)[:mais_lentos]
+    if lentos:
+        print("Mais lentos:")
+        for a in lentos:
+            print(f"  {a['segundos']:8.2f} s  {a['paginas']:5d} pág.  {os.path.basename(a['arquivo'])}")
+
+
+def _analisar_todos(arquivos, jobs, produtos, db_path, streaming, versoes, limites):
+    """Gera as análises conforme terminam, no pool de processos"""
+    # Mesmo contexto do PoolCatalogo: os processos não são cópias (fork) deste
+    with ProcessPoolExecutor(max_workers=jobs, mp_context=isolamento.contexto(),
+                             initializer=_iniciar_processo,
+                             initargs=(produtos, db_path, versoes, *limites)) as executor:
+        futuros = [executor.submit(analisar_arquivo, arquivo, streaming) for arquivo in arquivos]
+        for futuro in as_completed(futuros):
+            yield futuro.result()
+
+
+def _analisar_no_processo(arquivos, produtos, db_path, streaming, versoes, limites):
+    """Gera as análises em série no próprio processo (usado com --profile)"""
+    _iniciar_processo(produtos, db_path, versoes, *limites)
+    for arquivo in arquivos:
+        yield analisar_arquivo(arquivo, streaming)
+
+
+def analyze(pasta, jobs=None, recursivo=False, db_path='produtos.db', streaming=False,
+            perfil=None, tempo_limite=None, memoria_limite_mb=None):
+    """Analisa todos os documentos da pasta e grava os resultados em `analises`
+
+    Com `perfil` (caminho de arquivo) a execução é feita em série, sob o
+    cProfile, e as estatísticas são gravadas nesse arquivo; a extração, que
+    roda nos processos isolados, grava um arquivo por processo ao lado dele
+    (isolamento.PERFIL). `tempo_limite`
+    (segundos) e `memoria_limite_mb` limitam a extração de cada documento.
+    """
+    limites = (tempo_limite, memoria_limite_mb)
+    db = Database(db_path)
+    produtos, *versoes = db.get_catalogo_versionado()
+    if not produtos:
+        print("Cadastre produtos primeiro!")
+        return 1
+    
+    arquivos = listar_documentos(pasta, recursivo)
+    if not arquivos:
+        print(f"Nenhum documento encontrado em {pasta}")
+        return 1
+    
+    profiler = None
+    if perfil:
+        profiler = cProfile.Profile()
+        # Como o próprio perfil, os arquivos da extração de uma execução anterior são substituídos
+        for anterior in glob.glob(isolamento.arquivo_perfil(glob.escape(perfil), '*')):
+            os.remove(anterior)
+        isolamento.PERFIL = perfil
+        analises_geradas = _analisar_no_processo(arquivos, produtos, db_path, streaming, versoes, limites)
+        print(f"Analisando {len(arquivos)} documento(s) em série, com cProfile...")
+        profiler.enable()
+    else:
+        jobs = jobs or os.cpu_count() or 1
+        analises_geradas = _analisar_todos(arquivos, jobs, produtos, db_path, streaming, versoes, limites)
+        print(f"Analisando {len(arquivos)} documento(s) com {jobs} processo(s)...")
+    
+    analises = []
+    inicio = time.perf_counter()
+    for numero, analise in enumerate(analises_geradas, 1):
+        analises.append(analise)
+        nome = os.path.basename(analise['arquivo'])
+        
+        if analise['erro']:
+            print(f"[{numero}/{len(arquivos)}] {nome}: erro - {analise['erro']}")
+            continue
+        
+        duplicata = buscar_quase_duplicata(db, analise['impressao'])
+        db.salvar_analise(nome, analise['resultados'], analise['texto_normalizado'],
+                         analise['matches'], analise['metricas'], analise['impressao'],
+                         analise['arquivo_hash'])
+        melhor = analise['resultados'][0] if analise['resultados'] else None
+        resumo = f"{melhor['nome']} ({melhor['indice']})" if melhor else "nenhum produto"
+        origem = " (análise memorizada)" if analise.get('memorizada') else ""
+        print(f"[{numero}/{len(arquivos)}] {nome}: {len(analise['resultados'])} produto(s), "
+              f"melhor: {resumo}, {analise['segundos']:.2f} s{origem}")
+        if analise['metricas'].get('falha_extracao'):
+            print(f"    extração interrompida: {analise['metricas']['falha_extracao']}")
+        if duplicata:
+            print(f"    {descrever(duplicata)}")
+    
+    if profiler is not None:
+        profiler.disable()
+        profiler.dump_stats(perfil)
+    
+    imprimir_resumo(analises, time.perf_counter() - inicio)
+    if profiler is not None:
+        print(f"Perfil gravado em {perfil} (ver com: python -m pstats {perfil})")
+        extracao = glob.glob(isolamento.arquivo_perfil(glob.escape(perfil), '*'))
+        if extracao:
+            print(f"Extração (processos isolados): {len(extracao)} arquivo(s) "
+                  f"{isolamento.arquivo_perfil(perfil, '<pid>')}")
+    return 0
+
+
+def importar_catalogo(arquivo, dry_run=False, db_path='produtos.db'):
+    import planilhas
+    try:
+        relatorio = planilhas.importar(Database(db_path), arquivo, dry_run)
+    except (OSError, ValueError) as e:
+        print(f"Erro ao importar: {e}")
+        return 1
+    print(planilhas.formatar_relatorio(relatorio))
+    return 0
+
+
+def exportar_catalogo(arquivo, db_path='produtos.db'):
+    import planilhas
+    try:
+        total = planilhas.exportar(Database(db_path), arquivo)
+    except (OSError, ValueError) as e:
+        print(f"Erro ao exportar: {e}")
+        return 1
+    print(f"{total} produto(s) exportado(s) para {arquivo}")
+    return 0
+
+
+def ranking_editais(limite=10, produto_ids=None, db_path='produtos.db'):
+    # SciPy (se instalado) só é carregado para o ranking
+    import ranking
+    db = Database(db_path)
+    if not db.fts_disponivel:
+        print("Erro: o SQLite desta instalação não tem FTS5; o arquivo de editais não está disponível")
+        return 1
+    inicio = time.perf_counter()
+    linhas = ranking.melhores_editais(db, limite, produto_ids)
+    segundos = time.perf_counter() - inicio
+
+    atual = None
+    for produto_id, nome, analise_id, arquivo_nome, data, indice, pos, neg in linhas:
+        if produto_id != atual:
+            atual = produto_id
+            print(f"\n{nome} (id {produto_id})")
+        print(f"  {indice:6.2f}%  +{pos:<4} -{neg:<4} {data}  {arquivo_nome} (análise {analise_id})")
+    print(f"\n{len({l[0] for l in linhas})} produto(s) encontrados em "
+          f"{len(db.get_documentos_indexados())} edital(is) indexado(s) ({segundos:.2f} s)")
+    return 0
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(prog='main.py', description="Analisador de Licitações")
+    subparsers = parser.add_subparsers(dest='comando', required=True)
+    
+    analyze_parser = subparsers.add_parser('analyze', help="analisa todos os editais de uma pasta")
+    analyze_parser.add_argument('pasta', help="pasta com os editais")
+    analyze_parser.add_argument('--jobs', '-j', type=int, default=None,
+                                help="número de processos (padrão: número de núcleos)")
+    analyze_parser.add_argument('--recursive', '-r', action='store_true',
+                                help="inclui subpastas")
+    analyze_parser.add_argument('--db', default='produtos.db', help="banco de dados SQLite")
+    analyze_parser.add_argument('--streaming', action='store_true',
+                                help="analisa página a página com memória limitada "
+                                     "(para editais muito grandes; não usa o cache de texto)")
+    analyze_parser.add_argument('--profile', metavar='ARQUIVO',
+                                help="executa em série sob o cProfile e grava as estatísticas")
+    analyze_parser.add_argument('--timeout', type=float, default=None, metavar='SEGUNDOS',
+                                help="prazo para extrair cada documento (padrão: "
+                                     f"{DocumentAnalyzer.TEMPO_LIMITE_EXTRACAO} s)")
+    analyze_parser.add_argument('--max-memory-mb', type=int, default=None,
+                                help="memória de cada processo de extração (padrão: "
+                                     f"{DocumentAnalyzer.MEMORIA_LIMITE_EXTRACAO_MB} MB)")
+    
+    importar_parser = subparsers.add_parser('import-catalog',
+                                            help="importa produtos de uma planilha CSV/XLSX")
+    importar_parser.add_argument('arquivo', help="planilha com as colunas nome, descricao, "
+                                                 "palavras_positivas e palavras_negativas")
+    importar_parser.add_argument('--dry-run', action='store_true',
+                                 help="só valida e mostra o que seria feito")
+    importar_parser.add_argument('--db', default='produtos.db', help="banco de dados SQLite")
+    
+    exportar_parser = subparsers.add_parser('export-catalog',
+                                            help="exporta os produtos para CSV/XLSX")
+    exportar_parser.add_argument('arquivo', help="arquivo de saída (.csv ou .xlsx)")
+    exportar_parser.add_argument('--db', default='produtos.db', help="banco de dados SQLite")
+    
+    rank_parser = subparsers.add_parser('rank',
+                                        help="melhores editais indexados de cada produto")
+    rank_parser.add_argument('--limit', '-n', type=int, default=10,
+                             help="editais por produto (padrão: 10)")
+    rank_parser.add_argument('--produto', type=int, action='append', metavar='ID',
+                             help="só este produto (pode repetir)")
+    rank_parser.add_argument('--db', default='produtos.db', help="banco de dados SQLite")
+    
+    serve_parser = subparsers.add_parser('serve',
+                                         help="serviço HTTP que recebe e analisa editais enviados")
+    serve_parser.add_argument('--host', default='127.0.0.1',
+                              help="endereço (padrão: 127.0.0.1; use 0.0.0.0 para a rede)")
+    serve_parser.add_argument('--port', type=int, default=8765)
+    serve_parser.add_argument('--jobs', '-j', type=int, default=None,
+                              help="processos de análise (padrão: número de núcleos)")
+    serve_parser.add_argument('--queue-size', type=int, default=20,
+                              help="análises aguardando na fila; além disso o envio recebe 503")
+    serve_parser.add_argument('--max-upload-mb', type=int, default=100)
+    serve_parser.add_argument('--token', default=os.environ.get('ANALISA_TOKEN'),
+                              help="exige 'Authorization: Bearer TOKEN' (padrão: $ANALISA_TOKEN)")
+    serve_parser.add_argument('--db', default='produtos.db', help="banco de dados SQLite")
+
+    watch_parser = subparsers.add_parser('watch',
+                                         help="analisa os editais que chegarem às pastas vigiadas")
+    watch_parser.add_argument('pastas', nargs='+', help="pastas vigiadas")
+    watch_parser.add_argument('--jobs', '-j', type=int, default=None,
+                              help="processos de análise (padrão: número de CPUs)")
+    watch_parser.add_argument('--recursive', '-r', action='store_true',
+                              help="inclui subpastas")
+    watch_parser.add_argument('--interval', type=float, default=5.0,
+                              help="segundos entre varreduras das pastas")
+    watch_parser.add_argument('--debounce', type=float, default=10.0,
+                              help="segundos sem alteração para considerar a cópia do arquivo concluída")
+    watch_parser.add_argument('--once', action='store_true',
+                              help="analisa o que houver nas pastas e encerra")
+    watch_parser.add_argument('--db', default='produtos.db', help="banco de dados SQLite")
+    
+    args = parser.parse_args(argv)
+    if args.comando == 'watch':
+        import vigia
+        return vigia.vigiar(args.pastas, args.db, args.jobs, args.interval, args.debounce,
+                            args.recursive, args.once)
+    if args.comando == 'serve':
+        import servidor
+        return servidor.servir(args.host, args.port, args.db, args.jobs, args.queue_size,
+                               args.max_upload_mb, args.token)
+    if args.comando == 'rank':
+        return ranking_editais(args.limit, args.produto, args.db)
+    if args.comando == 'import-catalog':
+        return importar_catalogo(args.arquivo, args.dry_run, args.db)
+    if args.comando == 'export-catalog':
+        return exportar_catalogo(args.arquivo, args.db)
+    if args.comando == 'analyze':
+        return analyze(args.pasta, args.jobs, args.recursive, args.db, args.streaming,
+                       args.profile, args.timeout, args.max_memory_mb)
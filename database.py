@@ -0,0 +1,1238 @@
+# database.py
+import os
+import sqlite3
+import threading
+import ast
+import json
+import zlib
+import time
+from collections import defaultdict
+from contextlib import contextmanager
+from datetime import datetime
+
+from analyzer import (CompiledCatalog, CompiledProduct, DocumentAnalyzer, IndicePosicoes,
+                      KeywordMatcher, MatchResult)
+
+
+class Database:
+    # Limite padrão do cache de texto extraído (configuração 'cache_limite_mb')
+    CACHE_LIMITE_MB = 256
+    # Semelhança (MinHash) a partir da qual um documento é tratado como
+    # quase duplicata de outro já analisado (configuração 'limiar_quase_duplicata')
+    LIMIAR_QUASE_DUPLICATA = 0.8
+    # Etapas com tempo registrado em analise_metricas
+    ETAPAS = ('extracao', 'normalizacao', 'busca', 'gravacao', 'total')
+    # Ordens da lista de produtos (carregada em lotes): coluna -> expressão SQL
+    ORDEM_PRODUTOS = {
+        'id': 'id',
+        'nome': 'nome',
+        'palavras_positivas': "COALESCE(palavras_positivas, '')",
+    }
+
+    # Espera máxima (segundos) pelo lock de escrita de outra conexão
+    TIMEOUT_LOCK = 30
+    # Aplicados a cada conexão aberta. Com WAL leitores não bloqueiam o
+    # escritor (e vice-versa), e synchronous=NORMAL só sincroniza o disco nos
+    # checkpoints em vez de a cada commit
+    PRAGMAS = (
+        "PRAGMA journal_mode = WAL",
+        "PRAGMA synchronous = NORMAL",
+        "PRAGMA temp_store = MEMORY",
+        "PRAGMA cache_size = -16000",
+        "PRAGMA mmap_size = 67108864",
+    )
+
+    def __init__(self, path='produtos.db'):
+        # Caminho absoluto: conexões abertas depois, em outras threads, usam o mesmo arquivo
+        self.path = path if path == ':memory:' else os.path.abspath(path)
+        self._local = threading.local()
+        self._catalogo = None
+        self.create_tables()
+
+    @property
+    def conn(self):
+        """Conexão da thread atual, aberta no primeiro uso
+
+        Objetos sqlite3 não podem ser usados entre threads, então cada thread
+        (interface, worker de análise) tem a sua conexão com o mesmo banco.
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=self.TIMEOUT_LOCK)
+            for pragma in self.PRAGMAS:
+                conn.execute(pragma)
+            # lower() do SQLite só trata ASCII; usado no filtro da lista de produtos
+            conn.create_function('casefold', 1, lambda texto: texto.casefold() if texto else texto,
+                                 deterministic=True)
+            self._local.conn = conn
+            self._local.transacoes = 0
+        return conn
+
+    def fechar(self):
+        """Fecha a conexão da thread atual (a próxima chamada abre outra)"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    @contextmanager
+    def transacao(self):
+        """Agrupa várias escritas em um único commit, desfeito se houver exceção
+
+        Os métodos chamados dentro do bloco não fazem commit próprio; blocos
+        aninhados fazem parte da transação mais externa.
+        """
+        conn = self.conn
+        self._local.transacoes += 1
+        try:
+            yield self
+        except BaseException:
+            self._local.transacoes -= 1
+            if not self._local.transacoes:
+                conn.rollback()
+                # O catálogo em memória pode ter recebido alterações desfeitas
+                self._catalogo = None
+            raise
+        self._local.transacoes -= 1
+        if not self._local.transacoes:
+            conn.commit()
+
+    def _commit(self):
+        if not self._local.transacoes:
+            self.conn.commit()
+
+    def create_tables(self):
+        cursor = self.conn.cursor()
+        
+        # Tabela de produtos
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS produtos (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                nome TEXT NOT NULL,
+                descricao TEXT,
+                palavras_positivas TEXT,
+                palavras_negativas TEXT,
+                data_criacao DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
+        # Configurações do aplicativo (chave/valor)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS configuracoes (
+                chave TEXT PRIMARY KEY,
+                valor TEXT
+            )
+        ''')
+        
+        # Cache do texto extraído, endereçado pelo hash do conteúdo do arquivo
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS cache_textos (
+                hash TEXT NOT NULL,
+                versao_extrator INTEGER NOT NULL,
+                paginas BLOB NOT NULL,
+                tamanho INTEGER NOT NULL,
+                ultimo_acesso REAL NOT NULL,
+                PRIMARY KEY (hash, versao_extrator)
+            )
+        ''')
+        
+        # Cache do texto de cada página de PDF, endereçado pelo hash do conteúdo
+        # da página: novas versões de um documento reaproveitam as páginas iguais
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS cache_paginas (
+                chave TEXT NOT NULL,
+                versao_extrator INTEGER NOT NULL,
+                texto BLOB NOT NULL,
+                tamanho INTEGER NOT NULL,
+                ultimo_acesso REAL NOT NULL,
+                PRIMARY KEY (chave, versao_extrator)
+            )
+        ''')
+        
+        # Versão de cada produto: o valor do contador do catálogo (configuração
+        # 'catalogo_versao') na última alteração dele; produtos sem registro
+        # não mudaram desde antes do contador existir (versão 0)
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS produto_versoes (
+                produto_id INTEGER PRIMARY KEY,
+                versao INTEGER NOT NULL
+            )
+        ''')
+        
+        # Análises completas memorizadas por conteúdo do arquivo, com a versão
+        # do catálogo usada: resultados, contagens e termos buscados
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS memo_analises (
+                hash TEXT NOT NULL,
+                versao_extrator INTEGER NOT NULL,
+                catalogo_versao INTEGER NOT NULL,
+                dados BLOB NOT NULL,
+                tamanho INTEGER NOT NULL,
+                ultimo_acesso REAL NOT NULL,
+                PRIMARY KEY (hash, versao_extrator)
+            )
+        ''')
+        
+        # Posições dos termos encontrados em cada conteúdo (IndicePosicoes):
+        # termos em JSON (termo -> primeiro trio, ocorrências) e os trios
+        # (página, início, fim) compactados
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS documento_posicoes (
+                hash TEXT NOT NULL,
+                versao_extrator INTEGER NOT NULL,
+                termos TEXT NOT NULL,
+                posicoes BLOB NOT NULL,
+                tamanho INTEGER NOT NULL,
+                ultimo_acesso REAL NOT NULL,
+                PRIMARY KEY (hash, versao_extrator)
+            )
+        ''')
+        
+        # Tabela para histórico de análises
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS analises (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                arquivo_nome TEXT,
+                data_analise DATETIME DEFAULT CURRENT_TIMESTAMP,
+                resultado TEXT
+            )
+        ''')
+        
+        # Um registro por produto encontrado em cada análise
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS analise_produtos (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                analise_id INTEGER NOT NULL REFERENCES analises(id) ON DELETE CASCADE,
+                produto_id INTEGER,
+                produto_nome TEXT,
+                indice REAL NOT NULL,
+                positivas INTEGER NOT NULL,
+                negativas INTEGER NOT NULL,
+                palavras_encontradas TEXT,
+                retroativo INTEGER NOT NULL DEFAULT 0
+            )
+        ''')
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_analises_data ON analises (data_analise)")
+        # Lista de produtos carregada em lotes na ordem (nome, id)
+        cursor.execute("CREATE INDEX IF NOT EXISTS idx_produtos_nome ON produtos (nome)")
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_analise_produtos_analise ON analise_produtos (analise_id)
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_analise_produtos_produto
+            ON analise_produtos (produto_id, indice)
+        ''')
+        cursor.execute('''
+            CREATE INDEX IF NOT EXISTS idx_analise_produtos_indice ON analise_produtos (indice)
+        ''')
+        
+        # Tempos de cada etapa e tamanho do documento, um registro por análise
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS analise_metricas (
+                analise_id INTEGER PRIMARY KEY REFERENCES analises(id) ON DELETE CASCADE,
+                paginas INTEGER,
+                caracteres INTEGER,
+                produtos_catalogo INTEGER,
+                produtos_encontrados INTEGER,
+                segundos_extracao REAL,
+                segundos_normalizacao REAL,
+                segundos_busca REAL,
+                segundos_gravacao REAL,
+                segundos_total REAL,
+                falha_extracao TEXT,
+                falha_detalhe TEXT
+            )
+        ''')
+        
+        # Impressão digital de cada análise (assinatura MinHash e hashes das
+        # páginas) e a análise anterior de que ela é quase duplicata
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS analise_impressoes (
+                analise_id INTEGER PRIMARY KEY REFERENCES analises(id) ON DELETE CASCADE,
+                assinatura BLOB NOT NULL,
+                paginas TEXT NOT NULL,
+                duplicata_de INTEGER,
+                similaridade REAL
+            )
+        ''')
+        # Bandas da assinatura (LSH): candidatos a quase duplicata por índice
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS impressao_bandas (
+                banda INTEGER NOT NULL,
+                valor INTEGER NOT NULL,
+                analise_id INTEGER NOT NULL,
+                PRIMARY KEY (banda, valor, analise_id)
+            ) WITHOUT ROWID
+        ''')
+        
+        # Registro da pasta vigiada (main.py watch): arquivos vistos, pelo
+        # caminho, e conteúdos já processados, pelo hash, para retomar sem
+        # repetir análises depois de reiniciar
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS ingestao_arquivos (
+                caminho TEXT PRIMARY KEY,
+                tamanho INTEGER NOT NULL,
+                mtime_ns INTEGER NOT NULL,
+                hash TEXT NOT NULL
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS ingestao_conteudos (
+                hash TEXT PRIMARY KEY,
+                arquivo_nome TEXT,
+                analise_id INTEGER,
+                erro TEXT,
+                processado_em DATETIME DEFAULT CURRENT_TIMESTAMP
+            )
+        ''')
+        
+        # Estatísticas por documento: contagem de cada termo do catálogo em cada
+        # análise indexada (só contagens > 0), para recalcular índices sem reler
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS termos (
+                id INTEGER PRIMARY KEY AUTOINCREMENT,
+                termo TEXT NOT NULL UNIQUE
+            )
+        ''')
+        cursor.execute('''
+            CREATE TABLE IF NOT EXISTS analise_termos (
+                termo_id INTEGER NOT NULL,
+                analise_id INTEGER NOT NULL,
+                contagem INTEGER NOT NULL,
+                PRIMARY KEY (termo_id, analise_id)
+            ) WITHOUT ROWID
+        ''')
+        
+        # Texto normalizado de cada documento analisado (rowid = id da análise)
+        try:
+            cursor.execute('''
+                CREATE VIRTUAL TABLE IF NOT EXISTS documentos_fts USING fts5(
+                    texto, tokenize = 'unicode61 remove_diacritics 2'
+                )
+            ''')
+            self.fts_disponivel = True
+        except sqlite3.OperationalError:
+            # SQLite compilado sem FTS5: o histórico continua, sem busca retroativa
+            self.fts_disponivel = False
+        
+        self._commit()
+        self._migrar()
+
+    def _colunas(self, tabela):
+        return {row[1] for row in self.conn.execute(f"PRAGMA table_info({tabela})")}
+
+    def _migrar(self):
+        """Aplica as migrações pendentes, controladas por PRAGMA user_version"""
+        cursor = self.conn.cursor()
+        versao = cursor.execute("PRAGMA user_version").fetchone()[0]
+        
+        if versao < 1:
+            # Converte o histórico antigo (repr de lista de dicts) para analise_produtos
+            cursor.execute("SELECT id, resultado FROM analises WHERE resultado IS NOT NULL")
+            for analise_id, resultado in cursor.fetchall():
+                try:
+                    resultados = ast.literal_eval(resultado)
+                except (ValueError, SyntaxError):
+                    continue
+                self._inserir_resultados(analise_id, resultados)
+                cursor.execute("UPDATE analises SET resultado = NULL WHERE id = ?", (analise_id,))
+            cursor.execute("PRAGMA user_version = 1")
+        
+        if versao < 2:
+            if 'retroativo' not in self._colunas('analise_produtos'):
+                cursor.execute('''
+                    ALTER TABLE analise_produtos ADD COLUMN retroativo INTEGER NOT NULL DEFAULT 0
+                ''')
+            cursor.execute("PRAGMA user_version = 2")
+        
+        if versao < 3:
+            # Análises com texto no índice FTS5 podem ser recalculadas
+            if 'indexado' not in self._colunas('analises'):
+                cursor.execute('''
+                    ALTER TABLE analises ADD COLUMN indexado INTEGER NOT NULL DEFAULT 0
+                ''')
+            if self.fts_disponivel:
+                cursor.execute('''
+                    UPDATE analises SET indexado = 1 WHERE id IN (SELECT rowid FROM documentos_fts)
+                ''')
+            cursor.execute("PRAGMA user_version = 3")
+        
+        if versao < 4:
+            # Motivo de extrações interrompidas (análises com parte das páginas)
+            colunas = self._colunas('analise_metricas')
+            for coluna in ('falha_extracao', 'falha_detalhe'):
+                if coluna not in colunas:
+                    cursor.execute(f"ALTER TABLE analise_metricas ADD COLUMN {coluna} TEXT")
+            cursor.execute("PRAGMA user_version = 4")
+        
+        if versao < 5:
+            # Conteúdo analisado, para reabrir o documento a partir do histórico
+            if 'arquivo_hash' not in self._colunas('analises'):
+                cursor.execute("ALTER TABLE analises ADD COLUMN arquivo_hash TEXT")
+            cursor.execute("PRAGMA user_version = 5")
+        
+        if versao < 6:
+            # Tentativas de análise de cada conteúdo da pasta vigiada (os com erro são repetidos)
+            if 'tentativas' not in self._colunas('ingestao_conteudos'):
+                cursor.execute("ALTER TABLE ingestao_conteudos ADD COLUMN tentativas INTEGER NOT NULL DEFAULT 1")
+            cursor.execute("PRAGMA user_version = 6")
+        
+        self._commit()
+
+    def get_config(self, chave, padrao=None):
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT valor FROM configuracoes WHERE chave = ?", (chave,))
+        row = cursor.fetchone()
+        return row[0] if row else padrao
+
+    def set_config(self, chave, valor):
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            INSERT OR REPLACE INTO configuracoes (chave, valor) VALUES (?, ?)
+        ''', (chave, str(valor)))
+        self._commit()
+
+    def get_texto_cache(self, arquivo_hash, versao_extrator):
+        """Páginas já extraídas de um arquivo com este conteúdo, ou None
+
+        Conta o acerto ou a falha do cache e renova a entrada no LRU.
+        """
+        paginas = self.ler_texto_cache(arquivo_hash, versao_extrator)
+        if paginas is None:
+            self._contar_cache('cache_falhas')
+            return None
+        
+        with self.transacao():
+            self.conn.execute('''
+                UPDATE cache_textos SET ultimo_acesso = ? WHERE hash = ? AND versao_extrator = ?
+            ''', (time.time(), arquivo_hash, versao_extrator))
+            self._contar_cache('cache_acertos')
+        return paginas
+
+    def ler_texto_cache(self, arquivo_hash, versao_extrator):
+        """Como get_texto_cache, só leitura: não altera as estatísticas nem a ordem do LRU
+
+        Para consultas que não são extrações (ex.: o visualizador de páginas).
+        """
+        row = self.conn.execute('''
+            SELECT paginas FROM cache_textos WHERE hash = ? AND versao_extrator = ?
+        ''', (arquivo_hash, versao_extrator)).fetchone()
+        if row is None:
+            return None
+        return json.loads(zlib.decompress(row[0]).decode('utf-8'))
+
+    def salvar_texto_cache(self, arquivo_hash, versao_extrator, paginas):
+        """Guarda as páginas comprimidas e descarta as entradas menos usadas além do limite"""
+        blob = zlib.compress(json.dumps(paginas, ensure_ascii=False).encode('utf-8'))
+        limite = int(self.get_config('cache_limite_mb', self.CACHE_LIMITE_MB)) * 1024 * 1024
+        
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            INSERT OR REPLACE INTO cache_textos (hash, versao_extrator, paginas, tamanho, ultimo_acesso)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (arquivo_hash, versao_extrator, blob, len(blob), time.time()))
+        
+        # LRU: mantém as entradas mais recentes cuja soma cabe no limite
+        cursor.execute('''
+            DELETE FROM cache_textos WHERE rowid IN (
+                SELECT rowid FROM (
+                    SELECT rowid, SUM(tamanho) OVER (
+                        ORDER BY ultimo_acesso DESC, rowid DESC
+                    ) AS acumulado
+                    FROM cache_textos
+                ) WHERE acumulado > ?
+            )
+        ''', (limite,))
+        self._commit()
+
+    def get_paginas_cache(self, chaves, versao_extrator):
+        """Textos de páginas já extraídas ({chave: texto}) entre as `chaves`"""
+        chaves = list(chaves)
+        encontrados = {}
+        cursor = self.conn.cursor()
+        # Em lotes, abaixo do limite de parâmetros do SQLite
+        for inicio in range(0, len(chaves), 500):
+            lote = chaves[inicio:inicio + 500]
+            cursor.execute(f'''
+                SELECT chave, texto FROM cache_paginas
+                WHERE versao_extrator = ? AND chave IN ({','.join('?' * len(lote))})
+            ''', [versao_extrator] + lote)
+            encontrados.update((chave, zlib.decompress(texto).decode('utf-8'))
+                               for chave, texto in cursor.fetchall())
+        if encontrados:
+            with self.transacao():
+                cursor.executemany('''
+                    UPDATE cache_paginas SET ultimo_acesso = ? WHERE chave = ? AND versao_extrator = ?
+                ''', [(time.time(), chave, versao_extrator) for chave in encontrados])
+        return encontrados
+
+    def salvar_paginas_cache(self, versao_extrator, paginas):
+        """Guarda os textos ({chave: texto}) e descarta as páginas menos usadas além do limite"""
+        agora = time.time()
+        linhas = []
+        for chave, texto in paginas.items():
+            blob = zlib.compress(texto.encode('utf-8'))
+            linhas.append((chave, versao_extrator, blob, len(blob), agora))
+        limite = int(self.get_config('cache_limite_mb', self.CACHE_LIMITE_MB)) * 1024 * 1024
+        
+        with self.transacao():
+            cursor = self.conn.cursor()
+            cursor.executemany('''
+                INSERT OR REPLACE INTO cache_paginas (chave, versao_extrator, texto, tamanho, ultimo_acesso)
+                VALUES (?, ?, ?, ?, ?)
+            ''', linhas)
+            cursor.execute('''
+                DELETE FROM cache_paginas WHERE rowid IN (
+                    SELECT rowid FROM (
+                        SELECT rowid, SUM(tamanho) OVER (
+                            ORDER BY ultimo_acesso DESC, rowid DESC
+                        ) AS acumulado
+                        FROM cache_paginas
+                    ) WHERE acumulado > ?
+                )
+            ''', (limite,))
+
+    def get_memo_analise(self, arquivo_hash, versao_extrator):
+        """Análise memorizada deste conteúdo, ou None
+
+        Retorna um dict com catalogo_versao, resultados, matches (MatchResult
+        só com as contagens e os termos buscados), paginas e caracteres.
+        """
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            SELECT catalogo_versao, dados FROM memo_analises WHERE hash = ? AND versao_extrator = ?
+        ''', (arquivo_hash, versao_extrator))
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        
+        with self.transacao():
+            cursor.execute('''
+                UPDATE memo_analises SET ultimo_acesso = ? WHERE hash = ? AND versao_extrator = ?
+            ''', (time.time(), arquivo_hash, versao_extrator))
+        dados = json.loads(zlib.decompress(row[1]).decode('utf-8'))
+        return {
+            'catalogo_versao': row[0],
+            'resultados': dados['resultados'],
+            'matches': MatchResult(counts=dados['contagens'], terms=dados['termos']),
+            'paginas': dados['paginas'],
+            'caracteres': dados['caracteres'],
+        }
+
+    def salvar_memo_analise(self, arquivo_hash, versao_extrator, catalogo_versao, resultados, matches,
+                            paginas, caracteres):
+        """Memoriza a análise completa deste conteúdo com a versão do catálogo usada
+
+        Fica uma entrada por conteúdo, a da versão mais recente do catálogo;
+        as menos usadas são descartadas além do limite do cache de texto.
+        """
+        dados = {
+            'resultados': resultados,
+            'contagens': matches.counts,
+            'termos': sorted(matches.terms),
+            'paginas': paginas,
+            'caracteres': caracteres,
+        }
+        blob = zlib.compress(json.dumps(dados, ensure_ascii=False).encode('utf-8'))
+        limite = int(self.get_config('cache_limite_mb', self.CACHE_LIMITE_MB)) * 1024 * 1024
+        
+        with self.transacao():
+            cursor = self.conn.cursor()
+            cursor.execute('''
+                INSERT INTO memo_analises (hash, versao_extrator, catalogo_versao, dados, tamanho,
+                                           ultimo_acesso)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(hash, versao_extrator) DO UPDATE SET
+                    catalogo_versao = excluded.catalogo_versao, dados = excluded.dados,
+                    tamanho = excluded.tamanho, ultimo_acesso = excluded.ultimo_acesso
+                WHERE excluded.catalogo_versao >= memo_analises.catalogo_versao
+            ''', (arquivo_hash, versao_extrator, catalogo_versao, blob, len(blob), time.time()))
+            cursor.execute('''
+                DELETE FROM memo_analises WHERE rowid IN (
+                    SELECT rowid FROM (
+                        SELECT rowid, SUM(tamanho) OVER (
+                            ORDER BY ultimo_acesso DESC, rowid DESC
+                        ) AS acumulado
+                        FROM memo_analises
+                    ) WHERE acumulado > ?
+                )
+            ''', (limite,))
+
+    def get_posicoes(self, arquivo_hash, versao_extrator):
+        """Índice de posições (IndicePosicoes) deste conteúdo, ou None"""
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            SELECT termos, posicoes FROM documento_posicoes WHERE hash = ? AND versao_extrator = ?
+        ''', (arquivo_hash, versao_extrator))
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        
+        with self.transacao():
+            cursor.execute('''
+                UPDATE documento_posicoes SET ultimo_acesso = ? WHERE hash = ? AND versao_extrator = ?
+            ''', (time.time(), arquivo_hash, versao_extrator))
+        return IndicePosicoes.from_bytes(json.loads(row[0]), zlib.decompress(row[1]))
+
+    def salvar_posicoes(self, arquivo_hash, versao_extrator, posicoes):
+        """Grava o índice de posições deste conteúdo, substituindo o anterior
+
+        Os índices menos usados são descartados além do limite do cache de texto.
+        """
+        termos = json.dumps(posicoes.termos, ensure_ascii=False)
+        blob = zlib.compress(posicoes.to_bytes())
+        limite = int(self.get_config('cache_limite_mb', self.CACHE_LIMITE_MB)) * 1024 * 1024
+        
+        with self.transacao():
+            cursor = self.conn.cursor()
+            cursor.execute('''
+                INSERT OR REPLACE INTO documento_posicoes (hash, versao_extrator, termos, posicoes,
+                                                          tamanho, ultimo_acesso)
+                VALUES (?, ?, ?, ?, ?, ?)
+            ''', (arquivo_hash, versao_extrator, termos, blob, len(termos) + len(blob), time.time()))
+            cursor.execute('''
+                DELETE FROM documento_posicoes WHERE rowid IN (
+                    SELECT rowid FROM (
+                        SELECT rowid, SUM(tamanho) OVER (
+                            ORDER BY ultimo_acesso DESC, rowid DESC
+                        ) AS acumulado
+                        FROM documento_posicoes
+                    ) WHERE acumulado > ?
+                )
+            ''', (limite,))
+
+    def adicionar_posicoes(self, arquivo_hash, versao_extrator, posicoes):
+        """Acrescenta termos ao índice de posições já gravado (ex.: palavras-chave novas)
+
+        Sem índice gravado nada é feito: um índice parcial daria a entender
+        que os demais termos não aparecem no documento.
+        """
+        with self.transacao():
+            atual = self.get_posicoes(arquivo_hash, versao_extrator)
+            if atual is None:
+                return
+            atual.atualizar(posicoes)
+            self.salvar_posicoes(arquivo_hash, versao_extrator, atual)
+
+    def _contar_cache(self, chave):
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            INSERT INTO configuracoes (chave, valor) VALUES (?, 1)
+            ON CONFLICT(chave) DO UPDATE SET valor = valor + 1
+        ''', (chave,))
+        self._commit()
+
+    def get_estatisticas_cache(self):
+        """Retorna (acertos, falhas, entradas, bytes) do cache de texto"""
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT COUNT(*), COALESCE(SUM(tamanho), 0) FROM cache_textos")
+        entradas, tamanho = cursor.fetchone()
+        return (int(self.get_config('cache_acertos', 0)), int(self.get_config('cache_falhas', 0)),
+                entradas, tamanho)
+
+    def get_produtos(self):
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT * FROM produtos ORDER BY nome")
+        return cursor.fetchall()
+
+    @staticmethod
+    def _filtro_produtos(filtro):
+        """Condição SQL (e parâmetros) dos produtos com `filtro` no id, no nome ou nas palavras positivas"""
+        if not filtro:
+            return "1", []
+        return ("(instr(CAST(id AS TEXT), ?) OR instr(casefold(nome), ?) "
+                "OR instr(casefold(palavras_positivas), ?))"), [filtro.casefold()] * 3
+
+    def contar_produtos(self, filtro=None):
+        condicao, parametros = self._filtro_produtos(filtro)
+        cursor = self.conn.cursor()
+        cursor.execute(f"SELECT COUNT(*) FROM produtos WHERE {condicao}", parametros)
+        return cursor.fetchone()[0]
+
+    def produto_no_filtro(self, produto_id, filtro=None):
+        condicao, parametros = self._filtro_produtos(filtro)
+        cursor = self.conn.cursor()
+        cursor.execute(f"SELECT 1 FROM produtos WHERE id = ? AND {condicao}", [produto_id] + parametros)
+        return cursor.fetchone() is not None
+
+    def get_produtos_lote(self, limite, apos=None, filtro=None, coluna='nome', decrescente=False):
+        """Próximo lote de produtos na ordem (`coluna`, id), após a chave `apos`
+
+        `apos` é o par (valor da coluna, id) do último produto já carregado;
+        `coluna` é uma das chaves de ORDEM_PRODUTOS. Só entram os produtos
+        que contêm `filtro` (ver _filtro_produtos).
+        """
+        expressao = self.ORDEM_PRODUTOS[coluna]
+        condicao, parametros = self._filtro_produtos(filtro)
+        direcao, comparacao = ('DESC', '<') if decrescente else ('ASC', '>')
+        if apos is not None:
+            condicao += f" AND ({expressao}, id) {comparacao} (?, ?)"
+            parametros = parametros + list(apos)
+        cursor = self.conn.cursor()
+        cursor.execute(f'''
+            SELECT * FROM produtos WHERE {condicao}
+            ORDER BY {expressao} {direcao}, id {direcao} LIMIT ?
+        ''', parametros + [limite])
+        return cursor.fetchall()
+
+    def get_produto(self, produto_id):
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT * FROM produtos WHERE id = ?", (produto_id,))
+        return cursor.fetchone()
+
+    def get_catalogo(self):
+        """Retorna o catálogo compilado (com as versões), montado só na primeira chamada"""
+        if self._catalogo is None:
+            self._catalogo = CompiledCatalog(*self.get_catalogo_versionado())
+        return self._catalogo
+
+    def get_catalogo_versao(self):
+        return int(self.get_config('catalogo_versao', 0))
+
+    def get_versoes_produtos(self):
+        """{produto_id: versão} dos produtos alterados desde que as versões existem"""
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT produto_id, versao FROM produto_versoes")
+        return dict(cursor.fetchall())
+
+    def get_catalogo_versionado(self):
+        """(produtos, versão do catálogo, {produto_id: versão}) lidos do mesmo estado do banco"""
+        with self.transacao():
+            if not self.conn.in_transaction:
+                # Em uma transação de leitura, outra conexão não altera o cadastro entre as consultas
+                self.conn.execute("BEGIN")
+            return self.get_produtos(), self.get_catalogo_versao(), self.get_versoes_produtos()
+
+    def _nova_versao(self, alterados=(), removidos=()):
+        """Incrementa a versão do catálogo e a atribui aos produtos `alterados`
+
+        Chamado dentro da transação que altera o cadastro.
+        """
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            INSERT INTO configuracoes (chave, valor) VALUES ('catalogo_versao', 1)
+            ON CONFLICT(chave) DO UPDATE SET valor = valor + 1
+        ''')
+        versao = self.get_catalogo_versao()
+        cursor.executemany('''
+            INSERT OR REPLACE INTO produto_versoes (produto_id, versao) VALUES (?, ?)
+        ''', [(produto_id, versao) for produto_id in alterados])
+        cursor.executemany("DELETE FROM produto_versoes WHERE produto_id = ?",
+                           [(produto_id,) for produto_id in removidos])
+        if self._catalogo is not None:
+            self._catalogo.versao = versao
+            self._catalogo.versoes.update(dict.fromkeys(alterados, versao))
+            for produto_id in removidos:
+                self._catalogo.versoes.pop(produto_id, None)
+        return versao
+
+    def add_produto(self, nome, descricao, palavras_positivas, palavras_negativas):
+        with self.transacao():
+            cursor = self.conn.cursor()
+            cursor.execute('''
+                INSERT INTO produtos (nome, descricao, palavras_positivas, palavras_negativas)
+                VALUES (?, ?, ?, ?)
+            ''', (nome, descricao, palavras_positivas, palavras_negativas))
+            if self._catalogo is not None:
+                self._catalogo.add(self.get_produto(cursor.lastrowid))
+            self._nova_versao([cursor.lastrowid])
+        return cursor.lastrowid
+
+    def update_produto(self, produto_id, nome, descricao, palavras_positivas, palavras_negativas):
+        with self.transacao():
+            cursor = self.conn.cursor()
+            cursor.execute('''
+                UPDATE produtos 
+                SET nome = ?, descricao = ?, palavras_positivas = ?, palavras_negativas = ?
+                WHERE id = ?
+            ''', (nome, descricao, palavras_positivas, palavras_negativas, produto_id))
+            if self._catalogo is not None:
+                self._catalogo.update(self.get_produto(produto_id))
+            self._nova_versao([produto_id])
+
+    def delete_produto(self, produto_id):
+        with self.transacao():
+            cursor = self.conn.cursor()
+            cursor.execute("DELETE FROM produtos WHERE id = ?", (produto_id,))
+            if self._catalogo is not None:
+                self._catalogo.remove(produto_id)
+            self._nova_versao(removidos=[produto_id])
+
+    @staticmethod
+    def chave_nome(nome):
+        """Chave usada para casar produtos pelo nome na importação"""
+        return ' '.join(nome.split()).casefold()
+
+    @staticmethod
+    def _comparavel(nome, descricao, positivas, negativas):
+        """Campos de um produto como a importação os compara
+
+        Espaços a mais, a forma de separar as palavras por vírgula e a
+        diferença entre vazio e NULL não contam como alteração: reimportar
+        uma planilha exportada não altera nenhum produto.
+        """
+        def palavras(texto):
+            return [p.strip() for p in (texto or '').split(',') if p.strip()]
+        return ' '.join(nome.split()), (descricao or '').strip(), palavras(positivas), palavras(negativas)
+
+    def importar_produtos(self, produtos, dry_run=False):
+        """Insere ou atualiza, pelo nome, os produtos (nome, descricao, positivas, negativas)
+
+        Tudo em uma única transação com executemany; o catálogo compilado é
+        remontado uma vez no final. Com `dry_run` nada é gravado. Retorna um
+        dict com as quantidades inseridas/atualizadas/inalteradas e os nomes
+        repetidos no próprio banco (atualiza-se o de menor id). Só produtos
+        com alguma diferença além da formatação (ver _comparavel) são
+        atualizados e mudam a versão do catálogo.
+        """
+        existentes = {}
+        duplicados_banco = set()
+        for produto in self.get_produtos():
+            chave = self.chave_nome(produto[1])
+            if chave in existentes:
+                duplicados_banco.add(produto[1])
+                if produto[0] > existentes[chave][0]:
+                    continue
+            existentes[chave] = produto
+        
+        inserir, atualizar, inalterados = [], [], 0
+        for nome, descricao, positivas, negativas in produtos:
+            atual = existentes.get(self.chave_nome(nome))
+            if atual is None:
+                inserir.append((nome, descricao, positivas, negativas))
+            elif self._comparavel(*atual[1:5]) == self._comparavel(nome, descricao, positivas, negativas):
+                inalterados += 1
+            else:
+                atualizar.append((nome, descricao, positivas, negativas, atual[0]))
+        
+        if not dry_run:
+            with self.transacao():
+                # AUTOINCREMENT: os produtos inseridos têm ids acima do maior atual
+                ultimo_id = self.conn.execute("SELECT COALESCE(MAX(id), 0) FROM produtos").fetchone()[0]
+                self.conn.executemany('''
+                    UPDATE produtos
+                    SET nome = ?, descricao = ?, palavras_positivas = ?, palavras_negativas = ?
+                    WHERE id = ?
+                ''', atualizar)
+                self.conn.executemany('''
+                    INSERT INTO produtos (nome, descricao, palavras_positivas, palavras_negativas)
+                    VALUES (?, ?, ?, ?)
+                ''', inserir)
+                if inserir or atualizar:
+                    inseridos = [row[0] for row in self.conn.execute(
+                        "SELECT id FROM produtos WHERE id > ?", (ultimo_id,))]
+                    self._nova_versao([produto[4] for produto in atualizar] + inseridos)
+            if inserir or atualizar:
+                # Um único rebuild em vez de um patch do catálogo por produto
+                self._catalogo = None
+        
+        return {
+            'inseridos': len(inserir),
+            'atualizados': len(atualizar),
+            'inalterados': inalterados,
+            'duplicados_banco': sorted(duplicados_banco),
+        }
+
+    def salvar_analise(self, arquivo_nome, resultado, texto_normalizado=None, matches=None,
+                       metricas=None, impressao=None, arquivo_hash=None):
+        """Grava a análise e um registro por produto encontrado; retorna o id da análise
+
+        Com `texto_normalizado` o documento também entra no índice FTS5 e tem
+        as contagens de termos gravadas (aproveitando `matches`, o MatchResult
+        da análise, quando disponível), permitindo avaliar produtos novos ou
+        editados contra o arquivo de editais. `metricas` (dict com paginas,
+        caracteres, produtos_catalogo, segundos_extracao/normalizacao/busca e,
+        se a extração foi interrompida, falha_extracao) é gravado em analise_metricas junto com o tempo da própria gravação.
+        `impressao` (similaridade.ImpressaoDigital) é gravada para detectar
+        quase duplicatas nas próximas análises. `arquivo_hash` liga a análise
+        ao conteúdo (caches de texto e de posições).
+        """
+        with self.transacao():
+            inicio = time.perf_counter()
+            indexar = bool(texto_normalizado) and self.fts_disponivel
+            if indexar:
+                # Termos novos são indexados no arquivo antes deste documento entrar nele
+                termo_ids = self._ids_termos(matches.terms if matches is not None else ())
+        
+            cursor = self.conn.cursor()
+            cursor.execute('''
+                INSERT INTO analises (arquivo_nome, indexado, arquivo_hash)
+                VALUES (?, ?, ?)
+            ''', (arquivo_nome, int(indexar), arquivo_hash))
+            analise_id = cursor.lastrowid
+            self._inserir_resultados(analise_id, resultado)
+            if indexar:
+                cursor.execute('''
+                    INSERT INTO documentos_fts (rowid, texto) VALUES (?, ?)
+                ''', (analise_id, texto_normalizado))
+                self._inserir_contagens(analise_id, texto_normalizado, termo_ids, matches)
+            if metricas is not None:
+                self._inserir_metricas(analise_id, metricas, len(resultado),
+                                       time.perf_counter() - inicio)
+            if impressao is not None:
+                self._inserir_impressao(analise_id, impressao)
+        return analise_id
+
+    def _inserir_metricas(self, analise_id, metricas, encontrados, segundos_gravacao):
+        etapas = [metricas.get(f'segundos_{etapa}') for etapa in ('extracao', 'normalizacao', 'busca')]
+        total = sum(segundos or 0 for segundos in etapas) + segundos_gravacao
+        # isolamento.FalhaExtracao: motivo e a descrição completa
+        falha = metricas.get('falha_extracao')
+        self.conn.execute('''
+            INSERT OR REPLACE INTO analise_metricas (analise_id, paginas, caracteres,
+                                                     produtos_catalogo, produtos_encontrados,
+                                                     segundos_extracao, segundos_normalizacao,
+                                                     segundos_busca, segundos_gravacao,
+                                                     segundos_total, falha_extracao,
+                                                     falha_detalhe)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+        ''', (analise_id, metricas.get('paginas'), metricas.get('caracteres'),
+              metricas.get('produtos_catalogo'), encontrados, *etapas, segundos_gravacao, total,
+              falha.motivo if falha else None, str(falha) if falha else None))
+
+    def _inserir_impressao(self, analise_id, impressao):
+        duplicata = impressao.duplicata or {}
+        self.conn.execute('''
+            INSERT OR REPLACE INTO analise_impressoes (analise_id, assinatura, paginas,
+                                                       duplicata_de, similaridade)
+            VALUES (?, ?, ?, ?, ?)
+        ''', (analise_id, impressao.assinatura_bytes(), json.dumps(impressao.paginas),
+              duplicata.get('analise_id'), duplicata.get('similaridade')))
+        self.conn.executemany('''
+            INSERT OR IGNORE INTO impressao_bandas (banda, valor, analise_id) VALUES (?, ?, ?)
+        ''', [(banda, valor, analise_id) for banda, valor in impressao.bandas()])
+
+    def get_arquivos_ingeridos(self):
+        """{caminho: (tamanho, mtime_ns, hash)} dos arquivos já vistos na pasta vigiada"""
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT caminho, tamanho, mtime_ns, hash FROM ingestao_arquivos")
+        return {caminho: (tamanho, mtime_ns, arquivo_hash)
+                for caminho, tamanho, mtime_ns, arquivo_hash in cursor.fetchall()}
+
+    def get_conteudos_ingeridos(self):
+        """Hashes dos conteúdos já analisados pela pasta vigiada (os com erro ficam de fora)"""
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT hash FROM ingestao_conteudos WHERE erro IS NULL")
+        return {row[0] for row in cursor.fetchall()}
+
+    def registrar_arquivo_ingerido(self, caminho, tamanho, mtime_ns, arquivo_hash):
+        self.conn.execute('''
+            INSERT OR REPLACE INTO ingestao_arquivos (caminho, tamanho, mtime_ns, hash)
+            VALUES (?, ?, ?, ?)
+        ''', (caminho, tamanho, mtime_ns, arquivo_hash))
+        self._commit()
+
+    def registrar_conteudo_ingerido(self, arquivo_hash, arquivo_nome, analise_id=None, erro=None):
+        """Registra uma tentativa de análise do conteúdo; retorna quantas já foram feitas"""
+        self.conn.execute('''
+            INSERT INTO ingestao_conteudos (hash, arquivo_nome, analise_id, erro) VALUES (?, ?, ?, ?)
+            ON CONFLICT(hash) DO UPDATE SET
+                arquivo_nome = excluded.arquivo_nome, analise_id = excluded.analise_id,
+                erro = excluded.erro, tentativas = tentativas + 1,
+                processado_em = CURRENT_TIMESTAMP
+        ''', (arquivo_hash, arquivo_nome, analise_id, erro))
+        tentativas = self.conn.execute('''
+            SELECT tentativas FROM ingestao_conteudos WHERE hash = ?
+        ''', (arquivo_hash,)).fetchone()[0]
+        self._commit()
+        return tentativas
+
+    def get_impressoes_candidatas(self, bandas):
+        """Análises que coincidem em alguma banda: (id, arquivo_nome, data_analise, assinatura, paginas)"""
+        cursor = self.conn.cursor()
+        cursor.execute(f'''
+            SELECT a.id, a.arquivo_nome, a.data_analise, i.assinatura, i.paginas
+            FROM analises a
+            JOIN analise_impressoes i ON i.analise_id = a.id
+            WHERE a.id IN (
+                SELECT analise_id FROM impressao_bandas
+                WHERE (banda, valor) IN (VALUES {','.join(['(?, ?)'] * len(bandas))})
+            )
+            ORDER BY a.id
+        ''', [v for par in bandas for v in par])
+        return [(analise_id, arquivo_nome, data, assinatura, json.loads(paginas))
+                for analise_id, arquivo_nome, data, assinatura, paginas in cursor.fetchall()]
+
+    def _inserir_resultados(self, analise_id, resultados, retroativo=False):
+        self.conn.executemany('''
+            INSERT INTO analise_produtos (analise_id, produto_id, produto_nome, indice,
+                                          positivas, negativas, palavras_encontradas,
+                                          retroativo)
+            VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        ''', [
+            (analise_id, r.get('id'), r.get('nome'), r.get('indice', 0),
+             r.get('positivas_encontradas', 0), r.get('negativas_encontradas', 0),
+             json.dumps(r.get('palavras_encontradas_lista', []), ensure_ascii=False),
+             int(retroativo))
+            for r in resultados
+        ])
+
+    def _inserir_contagens(self, analise_id, texto_normalizado, termo_ids, matches=None):
+        """Grava a contagem de todos os termos conhecidos neste documento"""
+        buscados = matches.terms if matches is not None else frozenset()
+        faltantes = [termo for termo in termo_ids if termo not in buscados]
+        if faltantes:
+            extras = KeywordMatcher(faltantes).scan(texto_normalizado)
+        contagens = []
+        for termo, termo_id in termo_ids.items():
+            contagem = matches.count(termo) if termo in buscados else extras.count(termo)
+            if contagem:
+                contagens.append((termo_id, analise_id, contagem))
+        self.conn.executemany('''
+            INSERT OR REPLACE INTO analise_termos (termo_id, analise_id, contagem) VALUES (?, ?, ?)
+        ''', contagens)
+
+    def _ids_termos(self, termos):
+        """Todos os termos conhecidos ({termo: id}), cadastrando os novos de `termos`
+
+        Um termo novo é contado em todos os documentos já indexados, mantendo
+        `analise_termos` completa para qualquer termo de `termos`.
+        """
+        cursor = self.conn.cursor()
+        conhecidos = dict(cursor.execute("SELECT termo, id FROM termos").fetchall())
+        novos = [t for t in termos if t not in conhecidos and KeywordMatcher.TERMO_VALIDO.fullmatch(t)]
+        if not novos:
+            return conhecidos
+        
+        cursor.executemany("INSERT OR IGNORE INTO termos (termo) VALUES (?)", [(t,) for t in novos])
+        for termo in novos:
+            conhecidos[termo] = cursor.execute(
+                "SELECT id FROM termos WHERE termo = ?", (termo,)
+            ).fetchone()[0]
+        
+        # O FTS5 aponta os documentos que podem conter cada termo novo; cada um
+        # deles é lido uma única vez e contado com o KeywordMatcher
+        candidatos = defaultdict(list)
+        for termo in novos:
+            for (analise_id,) in self._documentos_candidatos(termo):
+                candidatos[analise_id].append(termo)
+        for analise_id, termos_doc in candidatos.items():
+            texto = cursor.execute(
+                "SELECT texto FROM documentos_fts WHERE rowid = ?", (analise_id,)
+            ).fetchone()[0]
+            self._inserir_contagens(
+                analise_id, texto, {t: conhecidos[t] for t in termos_doc}
+            )
+        return conhecidos
+
+    def get_documentos_indexados(self):
+        """(id, arquivo_nome, data_analise) das análises com contagens de termos gravadas"""
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            SELECT id, arquivo_nome, data_analise FROM analises WHERE indexado = 1 ORDER BY id
+        ''')
+        return cursor.fetchall()
+
+    def get_contagens_termos(self, termos):
+        """Contagens (analise_id, termo, contagem) dos `termos` nas análises indexadas
+
+        Termos ainda desconhecidos são contados antes em todo o arquivo.
+        """
+        if not self.fts_disponivel:
+            return []
+        termo_ids = self._ids_termos(termos)
+        self._commit()
+        nomes = {termo_ids[t]: t for t in set(termos) if t in termo_ids}
+        ids = list(nomes)
+        contagens = []
+        cursor = self.conn.cursor()
+        # Em lotes, abaixo do limite de parâmetros do SQLite
+        for inicio in range(0, len(ids), 500):
+            lote = ids[inicio:inicio + 500]
+            cursor.execute(f'''
+                SELECT analise_id, termo_id, contagem FROM analise_termos
+                WHERE termo_id IN ({','.join('?' * len(lote))})
+            ''', lote)
+            contagens.extend((analise_id, nomes[termo_id], contagem)
+                             for analise_id, termo_id, contagem in cursor.fetchall())
+        return contagens
+
+    def _documentos_candidatos(self, termo):
+        """Documentos do índice FTS5 que podem conter o termo
+
+        O FTS5 ignora acentos e separa tokens em mais pontos que \\w, então
+        devolve um superconjunto dos casamentos exatos; a contagem exata é
+        feita depois pelo KeywordMatcher.
+        """
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            SELECT rowid FROM documentos_fts WHERE documentos_fts MATCH ?
+        ''', ('"' + termo.replace('"', '""') + '"',))
+        return cursor.fetchall()
+
+    def reavaliar_produto(self, produto_id):
+        """Recalcula o produto em todas as análises indexadas, sem reler documentos
+
+        Usa as contagens de termos guardadas em `analise_termos` (os termos
+        novos do produto são contados uma vez via FTS5). Documentos em que o
+        produto ainda não tinha resultado entram no histórico como acertos
+        retroativos. Retorna a lista de (analise_id, arquivo_nome, índice, retroativo).
+        """
+        produto = self.get_produto(produto_id)
+        if produto is None or not self.fts_disponivel:
+            return []
+        compilado = CompiledProduct(produto)
+        termo_ids = self._ids_termos(compilado.terms())
+        termos_produto = {termo_ids[t]: t for t in compilado.terms() if t in termo_ids}
+        
+        cursor = self.conn.cursor()
+        contagens = defaultdict(dict)
+        if termos_produto:
+            cursor.execute(f'''
+                SELECT analise_id, termo_id, contagem FROM analise_termos
+                WHERE termo_id IN ({','.join('?' * len(termos_produto))})
+            ''', list(termos_produto))
+            for analise_id, termo_id, contagem in cursor.fetchall():
+                contagens[analise_id][termos_produto[termo_id]] = contagem
+        
+        if compilado.nome_normalized:
+            encontrados = [a for a, c in contagens.items() if compilado.nome_normalized in c]
+        else:
+            # Nome vazio casa com qualquer documento (mesmo comportamento de \b\b)
+            encontrados = [row[0] for row in cursor.execute("SELECT id FROM analises WHERE indexado = 1")]
+        
+        # Mantém a origem (análise normal ou retroativa) dos resultados existentes
+        cursor.execute('''
+            SELECT ap.analise_id, ap.retroativo FROM analise_produtos ap
+            JOIN analises a ON a.id = ap.analise_id
+            WHERE ap.produto_id = ? AND a.indexado = 1
+        ''', (produto_id,))
+        origem = dict(cursor.fetchall())
+        cursor.execute('''
+            DELETE FROM analise_produtos
+            WHERE produto_id = ? AND analise_id IN (SELECT id FROM analises WHERE indexado = 1)
+        ''', (produto_id,))
+        
+        acertos = []
+        for analise_id in encontrados:
+            matches = MatchResult(counts=contagens[analise_id])
+            index, pos_count, neg_count = DocumentAnalyzer.calculate_index_from_lists(
+                None, compilado.pos_list, compilado.neg_list, matches
+            )
+            resultado = {
+                'id': produto_id,
+                'nome': compilado.nome,
+                'indice': index,
+                'positivas_encontradas': pos_count,
+                'negativas_encontradas': neg_count,
+                'palavras_encontradas_lista': DocumentAnalyzer.get_palavras_encontradas_from_lists(
+                    None, compilado.pos_list, compilado.neg_list, matches
+                ),
+            }
+            retroativo = origem.get(analise_id, 1)
+            self._inserir_resultados(analise_id, [resultado], retroativo)
+            acertos.append((analise_id, index, bool(retroativo)))
+        self._commit()
+        
+        nomes = dict(cursor.execute("SELECT id, arquivo_nome FROM analises WHERE indexado = 1").fetchall())
+        return [(analise_id, nomes.get(analise_id), indice, retroativo)
+                for analise_id, indice, retroativo in acertos]
+
+    def get_analise_hash(self, analise_id):
+        """Hash do conteúdo analisado, ou None (análises anteriores ao registro do hash)"""
+        cursor = self.conn.cursor()
+        cursor.execute("SELECT arquivo_hash FROM analises WHERE id = ?", (analise_id,))
+        row = cursor.fetchone()
+        return row[0] if row else None
+
+    def get_resultados_analise(self, analise_id):
+        """Resultados de uma análise no mesmo formato de find_products_in_text"""
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            SELECT ap.produto_id, ap.produto_nome, p.descricao, ap.indice, ap.positivas,
+                   ap.negativas, p.palavras_positivas, p.palavras_negativas,
+                   ap.palavras_encontradas, ap.retroativo
+            FROM analise_produtos ap
+            LEFT JOIN produtos p ON p.id = ap.produto_id
+            WHERE ap.analise_id = ?
+            ORDER BY ap.indice DESC, ap.id
+        ''', (analise_id,))
+        return [{
+            'id': row[0],
+            'nome': row[1],
+            'descricao': row[2],
+            'indice': row[3],
+            'positivas_encontradas': row[4],
+            'negativas_encontradas': row[5],
+            'palavras_positivas': row[6],
+            'palavras_negativas': row[7],
+            'palavras_encontradas_lista': json.loads(row[8] or '[]'),
+            'retroativo': bool(row[9])
+        } for row in cursor.fetchall()]
+
+    @staticmethod
+    def _filtro_historico(produto_id=None, indice_minimo=None, desde=None):
+        condicoes = []
+        parametros = []
+        if produto_id is not None:
+            condicoes.append("ap.produto_id = ?")
+            parametros.append(produto_id)
+        if indice_minimo is not None:
+            condicoes.append("ap.indice >= ?")
+            parametros.append(indice_minimo)
+        if desde is not None:
+            if isinstance(desde, datetime):
+                desde = desde.strftime('%Y-%m-%d %H:%M:%S')
+            condicoes.append("a.data_analise >= ?")
+            parametros.append(desde)
+        where = ("WHERE " + " AND ".join(condicoes)) if condicoes else ""
+        return where, parametros
+
+    def buscar_historico(self, produto_id=None, indice_minimo=None, desde=None,
+                         limite=50, offset=0):
+        """Página do histórico: (analise_id, arquivo, data, produto, índice, positivas,
+        negativas, retroativo)"""
+        where, parametros = self._filtro_historico(produto_id, indice_minimo, desde)
+        cursor = self.conn.cursor()
+        cursor.execute(f'''
+            SELECT a.id, a.arquivo_nome, a.data_analise, ap.produto_nome, ap.indice,
+                   ap.positivas, ap.negativas, ap.retroativo
+            FROM analise_produtos ap
+            JOIN analises a ON a.id = ap.analise_id
+            {where}
+            ORDER BY a.data_analise DESC, a.id DESC, ap.indice DESC
+            LIMIT ? OFFSET ?
+        ''', parametros + [limite, offset])
+        return cursor.fetchall()
+
+    def contar_historico(self, produto_id=None, indice_minimo=None, desde=None):
+        where, parametros = self._filtro_historico(produto_id, indice_minimo, desde)
+        cursor = self.conn.cursor()
+        cursor.execute(f'''
+            SELECT COUNT(*)
+            FROM analise_produtos ap
+            JOIN analises a ON a.id = ap.analise_id
+            {where}
+        ''', parametros)
+        return cursor.fetchone()[0]
+
+    def get_metricas_recentes(self, limite=100):
+        """Métricas das últimas `limite` análises, da mais recente para a mais antiga"""
+        cursor = self.conn.cursor()
+        cursor.execute('''
+            SELECT a.id, a.arquivo_nome, a.data_analise, m.paginas, m.caracteres,
+                   m.produtos_catalogo, m.produtos_encontrados, m.segundos_extracao,
+                   m.segundos_normalizacao, m.segundos_busca, m.segundos_gravacao,
+                   m.segundos_total, m.falha_detalhe
+            FROM analise_metricas m
+            JOIN analises a ON a.id = m.analise_id
+            ORDER BY m.analise_id DESC
+            LIMIT ?
+        ''', (limite,))
+        return cursor.fetchall()
+
+    @staticmethod
+    def _percentil(ordenados, p):
+        """Percentil pelo método do posto mais próximo (lista já ordenada)"""
+        posto = max(1, -(-len(ordenados) * p // 100))
+        return ordenados[posto - 1]
+
+    def get_percentis_tempos(self, limite=100, percentis=(50, 90, 99)):
+        """{etapa: [percentis..., máximo]} dos tempos das últimas `limite` análises"""
+        linhas = self.get_metricas_recentes(limite)
+        resumo = {}
+        for coluna, etapa in enumerate(self.ETAPAS, 7):
+            tempos = sorted(linha[coluna] for linha in linhas if linha[coluna] is not None)
+            if tempos:
+                resumo[etapa] = [self._percentil(tempos, p) for p in percentis] + [tempos[-1]]
+        return resumo
@@ -0,0 +1,1750 @@
+# gui.py
+import sys
+import os
+import re
+import html
+import time
+import cProfile
+from bisect import bisect_left, bisect_right
+from datetime import datetime, timedelta
+from PySide6.QtWidgets import (QApplication, QCheckBox, QComboBox, QDialog, QDoubleSpinBox, QFileDialog,
+                               QHBoxLayout, QLabel, QLineEdit, QMainWindow, QMessageBox,
+                               QProgressBar, QPushButton, QSpinBox, QTableView, QTableWidget,
+                               QTableWidgetItem, QTextBrowser, QTextEdit, QVBoxLayout, QWidget)
+from PySide6.QtCore import (QAbstractTableModel, QModelIndex, QObject, Qt, QThread, QTimer,
+                            Signal)
+from PySide6.QtGui import QColor
+
+from analyzer import (AnaliseCancelada, DocumentAnalyzer, IndicePosicoes, KeywordMatcher,
+                      NormalizedDocument)
+from database import Database
+from similaridade import ImpressaoDigital, buscar_quase_duplicata, descrever
+
+# Cor de destaque de cada tipo de termo no visualizador de páginas
+CORES_DESTAQUE = {'nome': '#fff59d', 'positiva': '#a5d6a7', 'negativa': '#ef9a9a'}
+
+
+def destacar_html(documento, ocorrencias, inicio=0, fim=None):
+    """HTML do texto original de `documento` (NormalizedDocument) com os termos destacados
+
+    `ocorrencias` são (início, fim, tipo) no texto normalizado, em ordem;
+    só o intervalo normalizado [inicio, fim) é convertido. Uma ocorrência
+    sobreposta à anterior (ex.: palavra-chave dentro do nome) é ignorada.
+    """
+    fim = len(documento.text) if fim is None else fim
+    partes = []
+    atual = documento.to_original(inicio)
+    for termo_inicio, termo_fim, tipo in ocorrencias:
+        if termo_inicio < inicio or termo_fim > fim:
+            continue
+        a, b = documento.to_original(termo_inicio), documento.to_original(termo_fim)
+        if a < atual:
+            continue
+        partes.append(html.escape(documento.original[atual:a]))
+        partes.append(f'<span style="background-color: {CORES_DESTAQUE[tipo]}; color: black">'
+                      f'{html.escape(documento.original[a:b])}</span>')
+        atual = b
+    partes.append(html.escape(documento.original[atual:documento.to_original(fim)]))
+    return ''.join(partes)
+
+
+class AnaliseWorker(QObject):
+    """Executa extração e busca de produtos fora da thread da interface"""
+
+    etapa = Signal(str)
+    progresso = Signal(int)
+    pagina = Signal(int, int)
+    resultado_parcial = Signal(dict)
+    duplicata = Signal(str, dict)
+    extracao_interrompida = Signal(str, str)
+    # Arquivo, hash do conteúdo, IndicePosicoes, páginas em memória (ou None) e número de páginas
+    documento_indexado = Signal(str, str, object, object, int)
+    # Arquivo, resultados, id da análise gravada no histórico, métricas e impressão digital
+    concluido = Signal(str, list, int, dict, object)
+    falhou = Signal(str, str)
+    cancelado = Signal(str)
+    terminou = Signal()
+
+    # Fração da barra de progresso reservada para a extração de texto
+    PESO_EXTRACAO = 80
+
+    def __init__(self, arquivo, catalogo, processos=1, db=None, perfil=None):
+        super().__init__()
+        self.arquivo = arquivo
+        # Caminho do arquivo de estatísticas do cProfile, quando pedido
+        self.perfil = perfil
+        self.db = db
+        self.catalogo = catalogo
+        self.processos = processos
+        self._cancelar = False
+
+    def cancelar(self):
+        self._cancelar = True
+
+    def _verificar_cancelamento(self):
+        if self._cancelar:
+            raise AnaliseCancelada()
+
+    def _progresso_extracao(self, numero, total):
+        self._verificar_cancelamento()
+        self.pagina.emit(numero, total)
+        self.progresso.emit(int(numero / total * self.PESO_EXTRACAO))
+
+    def run(self):
+        try:
+            if self.perfil:
+                # cProfile só enxerga a thread em que é ativado: roda a análise dentro dele
+                profiler = cProfile.Profile()
+                try:
+                    profiler.runcall(self._analisar)
+                finally:
+                    profiler.dump_stats(self.perfil)
+            else:
+                self._analisar()
+        
+        except AnaliseCancelada:
+            self.cancelado.emit(self.arquivo)
+        except Exception as e:
+            self.falhou.emit(self.arquivo, f"Erro ao analisar documento: {str(e)}")
+        finally:
+            self.terminou.emit()
+
+    def _analisar(self):
+        inicio = time.perf_counter()
+        arquivo_hash = DocumentAnalyzer.file_hash(self.arquivo)
+        if self._concluir_memorizada(arquivo_hash, inicio):
+            return
+        # O documento é aberto uma vez: o número de páginas decide entre a
+        # extração completa e a análise em fluxo
+        leitura = DocumentAnalyzer.open_document(self.arquivo, self.db, arquivo_hash)
+        try:
+            if leitura.streaming:
+                self._analisar_em_fluxo(leitura, inicio, arquivo_hash)
+                return
+            
+            self.etapa.emit("Extraindo texto...")
+            self.progresso.emit(0)
+            # O Database abre uma conexão própria para esta thread (fechada no fim)
+            pages = leitura.extrair(self._progresso_extracao, self.processos)
+        finally:
+            leitura.encerrar()
+            self.db.fechar()
+        texto = "\n".join(pages)
+        metricas = {
+            'paginas': len(pages),
+            'caracteres': len(texto),
+            'produtos_catalogo': len(self.catalogo),
+            'segundos_extracao': time.perf_counter() - inicio,
+            'falha_extracao': pages.falha,
+        }
+        
+        if not texto.strip():
+            self._sem_texto(pages.falha)
+            return
+        if pages.falha is not None:
+            self.extracao_interrompida.emit(self.arquivo, str(pages.falha))
+        
+        self._verificar_cancelamento()
+        self.etapa.emit("Normalizando texto...")
+        self.progresso.emit(self.PESO_EXTRACAO + 5)
+        etapa = time.perf_counter()
+        documento = NormalizedDocument.from_pages(pages)
+        impressao = ImpressaoDigital.das_paginas(pages)
+        metricas['segundos_normalizacao'] = time.perf_counter() - etapa
+        self._buscar_duplicata(impressao)
+        
+        self._verificar_cancelamento()
+        self.etapa.emit("Buscando produtos...")
+        self.progresso.emit(self.PESO_EXTRACAO + 10)
+        etapa = time.perf_counter()
+        resultados = []
+        matches = self.catalogo.scan(documento.text)
+        for resultado in DocumentAnalyzer.iter_products_in_text(documento, self.catalogo, matches):
+            self._verificar_cancelamento()
+            resultados.append(resultado)
+            self.resultado_parcial.emit(resultado)
+        
+        # Ordena por índice (maior primeiro)
+        resultados.sort(key=lambda x: x['indice'], reverse=True)
+        metricas['segundos_busca'] = time.perf_counter() - etapa
+        posicoes = IndicePosicoes.das_ocorrencias(matches.offsets, documento.page_starts)
+        if pages.falha is None:
+            self._memorizar(arquivo_hash, resultados, matches, len(pages), len(texto), posicoes)
+        self.documento_indexado.emit(self.arquivo, arquivo_hash, posicoes, list(pages), len(pages))
+        self.progresso.emit(100)
+        self._concluir(arquivo_hash, resultados, documento.text, matches, metricas, impressao)
+
+    def _concluir_memorizada(self, arquivo_hash, inicio):
+        """Conclui na hora, se o mesmo conteúdo já foi analisado (ver find_products_memoized)
+
+        Memorizações sem índice de posições (anteriores a ele) são refeitas
+        uma vez, para que os detalhes possam mostrar as ocorrências.
+        """
+        try:
+            posicoes = self.db.get_posicoes(arquivo_hash, DocumentAnalyzer.EXTRATOR_VERSAO)
+            memorizada = None
+            if posicoes is not None:
+                memorizada = DocumentAnalyzer.find_products_memoized(arquivo_hash, self.catalogo, self.db)
+                # Termos novos do catálogo entram no índice gravado
+                posicoes = self.db.get_posicoes(arquivo_hash, DocumentAnalyzer.EXTRATOR_VERSAO)
+        finally:
+            self.db.fechar()
+        if memorizada is None:
+            return False
+        resultados, paginas, caracteres = memorizada
+        metricas = {
+            'paginas': paginas,
+            'caracteres': caracteres,
+            'produtos_catalogo': len(self.catalogo),
+            'segundos_busca': time.perf_counter() - inicio,
+            'memorizada': True,
+        }
+        self.progresso.emit(100)
+        self.documento_indexado.emit(self.arquivo, arquivo_hash, posicoes, None, paginas)
+        # Sem texto nem impressão: ambos já foram gravados pela análise original
+        self._concluir(arquivo_hash, resultados, None, None, metricas, None)
+        return True
+
+    def _concluir(self, arquivo_hash, resultados, texto_normalizado, matches, metricas, impressao):
+        """Grava a análise no histórico, nesta thread, e avisa a janela com o id gravado"""
+        try:
+            analise_id = self.db.salvar_analise(os.path.basename(self.arquivo), resultados,
+                                                texto_normalizado, matches, metricas, impressao,
+                                                arquivo_hash)
+        finally:
+            self.db.fechar()
+        self.concluido.emit(self.arquivo, resultados, analise_id, metricas, impressao)
+
+    def _memorizar(self, arquivo_hash, resultados, matches, paginas, caracteres, posicoes):
+        try:
+            DocumentAnalyzer.memoize_results(arquivo_hash, self.catalogo, self.db, resultados, matches,
+                                             paginas, caracteres)
+            self.db.salvar_posicoes(arquivo_hash, DocumentAnalyzer.EXTRATOR_VERSAO, posicoes)
+        finally:
+            self.db.fechar()
+
+    def _sem_texto(self, falha):
+        mensagem = "Não foi possível extrair texto do documento!"
+        if falha is not None:
+            mensagem += f"\n({falha})"
+        self.falhou.emit(self.arquivo, mensagem)
+
+    def _buscar_duplicata(self, impressao):
+        """Avisa antes do fim da análise se o documento é quase duplicata de outro"""
+        try:
+            duplicata = buscar_quase_duplicata(self.db, impressao)
+        finally:
+            self.db.fechar()
+        if duplicata:
+            self.duplicata.emit(self.arquivo, duplicata)
+
+    def _analisar_em_fluxo(self, leitura, inicio, arquivo_hash):
+        """Documentos muito grandes: extrai, normaliza e busca uma página por vez"""
+        self.etapa.emit("Analisando página a página...")
+        self.progresso.emit(0)
+        tempos = {}
+        impressao = ImpressaoDigital()
+        posicoes = IndicePosicoes()
+        extracao = {}
+        # Só o texto normalizado é mantido, para o índice de busca do histórico
+        normalizadas = []
+        pages = leitura.iterar(self._progresso_extracao, extracao)
+        resultados, matches, paginas, caracteres = DocumentAnalyzer.analyze_pages(
+            pages, self.catalogo, tempos, impressao, posicoes, normalizadas
+        )
+        falha = extracao.get('falha')
+        if matches.texto_vazio:
+            self._sem_texto(falha)
+            return
+        if falha is not None:
+            self.extracao_interrompida.emit(self.arquivo, str(falha))
+        self._buscar_duplicata(impressao)
+        
+        for resultado in resultados:
+            self.resultado_parcial.emit(resultado)
+        self.progresso.emit(100)
+        metricas = {
+            'paginas': paginas,
+            'caracteres': caracteres,
+            'produtos_catalogo': len(self.catalogo),
+            # Extração é o tempo que sobra das etapas medidas página a página
+            'segundos_extracao': time.perf_counter() - inicio - sum(tempos.values()),
+            'segundos_normalizacao': tempos['normalizacao'],
+            'segundos_busca': tempos['busca'],
+            'falha_extracao': falha,
+        }
+        if falha is None:
+            self._memorizar(arquivo_hash, resultados, matches, paginas, caracteres, posicoes)
+        # Sem as páginas: o texto bruto inteiro nunca fica em memória
+        self.documento_indexado.emit(self.arquivo, arquivo_hash, posicoes, None, paginas)
+        self._concluir(arquivo_hash, resultados, " ".join(normalizadas), matches, metricas, impressao)
+
+
+class ReavaliacaoWorker(QObject):
+    """Recalcula um produto nos editais já analisados fora da thread da interface"""
+
+    # Id do produto e acertos (analise_id, arquivo, índice, retroativo)
+    concluido = Signal(int, list)
+    falhou = Signal(int, str)
+    terminou = Signal()
+
+    def __init__(self, produto_id, db):
+        super().__init__()
+        self.produto_id = produto_id
+        self.db = db
+
+    def run(self):
+        try:
+            self.concluido.emit(self.produto_id, self.db.reavaliar_produto(self.produto_id))
+        except Exception as e:
+            self.falhou.emit(self.produto_id, f"Erro ao recalcular os editais anteriores: {str(e)}")
+        finally:
+            self.db.fechar()
+            self.terminou.emit()
+
+
+class PaginasWorker(QObject):
+    """Extrai um bloco de páginas do arquivo fora da thread da interface
+
+    Usado pelo visualizador quando o texto do documento não está em memória
+    nem no cache (documentos analisados em fluxo): cada extração relê o PDF.
+    """
+
+    # Documento (dict de MainWindow.documento_atual), números pedidos e {número: texto}
+    concluido = Signal(object, list, object)
+    terminou = Signal()
+
+    def __init__(self, documento, numeros):
+        super().__init__()
+        self.documento = documento
+        self.numeros = numeros
+
+    def run(self):
+        try:
+            paginas = DocumentAnalyzer.extract_selected_pages(self.documento['arquivo'], self.numeros)
+        except Exception:
+            paginas = {}
+        self.concluido.emit(self.documento, self.numeros, paginas)
+        self.terminou.emit()
+
+
+class ProdutoDialog(QDialog):
+    def __init__(self, parent=None, produto=None):
+        super().__init__(parent)
+        self.produto = produto
+        self.setup_ui()
+
+    def setup_ui(self):
+        self.setWindowTitle("Editar Produto" if self.produto else "Novo Produto")
+        self.setModal(True)
+        self.resize(500, 400)
+
+        layout = QVBoxLayout(self)
+
+        # Nome
+        layout.addWidget(QLabel("Nome do Produto:"))
+        self.nome_edit = QLineEdit()
+        if self.produto:
+            self.nome_edit.setText(self.produto[1])
+        layout.addWidget(self.nome_edit)
+
+        # Descrição
+        layout.addWidget(QLabel("Descrição:"))
+        self.descricao_edit = QTextEdit()
+        if self.produto:
+            self.descricao_edit.setText(self.produto[2])
+        layout.addWidget(self.descricao_edit)
+
+        # Palavras Positivas
+        layout.addWidget(QLabel("Palavras Positivas (separadas por vírgula):"))
+        self.pos_edit = QTextEdit()
+        if self.produto:
+            self.pos_edit.setText(self.produto[3])
+        layout.addWidget(self.pos_edit)
+
+        # Palavras Negativas
+        layout.addWidget(QLabel("Palavras Negativas (separadas por vírgula):"))
+        self.neg_edit = QTextEdit()
+        if self.produto:
+            self.neg_edit.setText(self.produto[4])
+        layout.addWidget(self.neg_edit)
+
+        # Botões
+        button_layout = QHBoxLayout()
+        self.salvar_btn = QPushButton("Salvar")
+        self.cancelar_btn = QPushButton("Cancelar")
+        
+        self.salvar_btn.clicked.connect(self.accept)
+        self.cancelar_btn.clicked.connect(self.reject)
+        
+        button_layout.addWidget(self.salvar_btn)
+        button_layout.addWidget(self.cancelar_btn)
+        layout.addLayout(button_layout)
+
+    def get_data(self):
+        return {
+            'nome': self.nome_edit.text().strip(),
+            'descricao': self.descricao_edit.toPlainText().strip(),
+            'palavras_positivas': self.pos_edit.toPlainText().strip(),
+            'palavras_negativas': self.neg_edit.toPlainText().strip()
+        }
+
+
+class HistoricoDialog(QDialog):
+    """Histórico de análises paginado com LIMIT/OFFSET direto no banco"""
+
+    POR_PAGINA = 50
+    PERIODOS = [("Todo o período", None), ("Últimos 7 dias", 7),
+                ("Últimos 30 dias", 30), ("Últimos 365 dias", 365)]
+
+    def __init__(self, db, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self.pagina = 0
+        self.total = 0
+        self.setup_ui()
+        self.carregar_pagina()
+
+    def setup_ui(self):
+        self.setWindowTitle("Histórico de Análises")
+        self.resize(900, 500)
+
+        layout = QVBoxLayout(self)
+
+        # Filtros
+        filtros_layout = QHBoxLayout()
+        filtros_layout.addWidget(QLabel("Produto:"))
+        self.produto_combo = QComboBox()
+        self.produto_combo.addItem("Todos", None)
+        for produto in self.db.get_produtos():
+            self.produto_combo.addItem(produto[1], produto[0])
+        filtros_layout.addWidget(self.produto_combo, 1)
+
+        filtros_layout.addWidget(QLabel("Índice mínimo:"))
+        self.indice_spin = QDoubleSpinBox()
+        self.indice_spin.setRange(0, 100)
+        filtros_layout.addWidget(self.indice_spin)
+
+        self.periodo_combo = QComboBox()
+        for nome, dias in self.PERIODOS:
+            self.periodo_combo.addItem(nome, dias)
+        filtros_layout.addWidget(self.periodo_combo)
+
+        self.filtrar_btn = QPushButton("Filtrar")
+        self.filtrar_btn.clicked.connect(self.filtrar)
+        filtros_layout.addWidget(self.filtrar_btn)
+        layout.addLayout(filtros_layout)
+
+        # Resultados
+        self.historico_table = QTableWidget()
+        self.historico_table.setColumnCount(7)
+        self.historico_table.setHorizontalHeaderLabels([
+            'Data', 'Arquivo', 'Produto', 'Índice', 'Positivas', 'Negativas', 'Origem'
+        ])
+        self.historico_table.setSelectionBehavior(QTableWidget.SelectRows)
+        self.historico_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.historico_table.cellDoubleClicked.connect(self.abrir_analise)
+        layout.addWidget(self.historico_table)
+
+        # Paginação
+        paginacao_layout = QHBoxLayout()
+        self.anterior_btn = QPushButton("Anterior")
+        self.proxima_btn = QPushButton("Próxima")
+        self.pagina_label = QLabel("")
+        self.anterior_btn.clicked.connect(lambda: self.mudar_pagina(-1))
+        self.proxima_btn.clicked.connect(lambda: self.mudar_pagina(1))
+        paginacao_layout.addWidget(self.anterior_btn)
+        paginacao_layout.addWidget(self.pagina_label, 1, Qt.AlignCenter)
+        paginacao_layout.addWidget(self.proxima_btn)
+        layout.addLayout(paginacao_layout)
+
+    def filtros(self):
+        dias = self.periodo_combo.currentData()
+        return {
+            'produto_id': self.produto_combo.currentData(),
+            'indice_minimo': self.indice_spin.value() or None,
+            # data_analise é gravada em UTC (CURRENT_TIMESTAMP)
+            'desde': datetime.utcnow() - timedelta(days=dias) if dias else None,
+        }
+
+    def filtrar(self):
+        self.pagina = 0
+        self.carregar_pagina()
+
+    def mudar_pagina(self, delta):
+        self.pagina += delta
+        self.carregar_pagina()
+
+    def carregar_pagina(self):
+        filtros = self.filtros()
+        self.total = self.db.contar_historico(**filtros)
+        paginas = max(1, -(-self.total // self.POR_PAGINA))
+        self.pagina = max(0, min(self.pagina, paginas - 1))
+        
+        linhas = self.db.buscar_historico(
+            limite=self.POR_PAGINA, offset=self.pagina * self.POR_PAGINA, **filtros
+        )
+        self.analise_ids = [linha[0] for linha in linhas]
+        self.historico_table.setRowCount(len(linhas))
+        for row, (_, arquivo, data, produto, indice, positivas, negativas, retroativo) in enumerate(linhas):
+            origem = "Retroativa" if retroativo else "Análise"
+            for col, valor in enumerate([data, arquivo, produto, indice, positivas, negativas, origem]):
+                self.historico_table.setItem(row, col, QTableWidgetItem(str(valor)))
+        self.historico_table.resizeColumnsToContents()
+        
+        self.pagina_label.setText(f"Página {self.pagina + 1} de {paginas} ({self.total} registros)")
+        self.anterior_btn.setEnabled(self.pagina > 0)
+        self.proxima_btn.setEnabled(self.pagina < paginas - 1)
+
+    def abrir_analise(self, row, _col):
+        """Mostra os resultados completos da análise na janela principal"""
+        parent = self.parent()
+        if parent is not None:
+            analise_id = self.analise_ids[row]
+            parent.exibir_resultados(self.db.get_resultados_analise(analise_id))
+            parent.abrir_documento(self.db.get_analise_hash(analise_id))
+
+
+class DiagnosticoDialog(QDialog):
+    """Percentis dos tempos de cada etapa nas últimas análises"""
+
+    ETAPAS = [('extracao', "Extração"), ('normalizacao', "Normalização"),
+              ('busca', "Busca"), ('gravacao', "Gravação"), ('total', "Total")]
+    PERCENTIS = (50, 90, 99)
+
+    def __init__(self, db, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self.setup_ui()
+        self.carregar()
+
+    def setup_ui(self):
+        self.setWindowTitle("Diagnóstico de Desempenho")
+        self.resize(900, 500)
+
+        layout = QVBoxLayout(self)
+
+        limite_layout = QHBoxLayout()
+        limite_layout.addWidget(QLabel("Últimas análises:"))
+        self.limite_spin = QSpinBox()
+        self.limite_spin.setRange(1, 10000)
+        self.limite_spin.setValue(100)
+        self.limite_spin.valueChanged.connect(self.carregar)
+        limite_layout.addWidget(self.limite_spin)
+        limite_layout.addStretch()
+        layout.addLayout(limite_layout)
+
+        # Percentis por etapa (segundos)
+        self.percentis_table = QTableWidget()
+        self.percentis_table.setColumnCount(len(self.PERCENTIS) + 1)
+        self.percentis_table.setHorizontalHeaderLabels(
+            [f"p{p}" for p in self.PERCENTIS] + ["Máximo"]
+        )
+        self.percentis_table.setRowCount(len(self.ETAPAS))
+        self.percentis_table.setVerticalHeaderLabels([nome for _, nome in self.ETAPAS])
+        self.percentis_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        layout.addWidget(self.percentis_table)
+
+        # Análises recentes
+        self.recentes_table = QTableWidget()
+        self.recentes_table.setColumnCount(11)
+        self.recentes_table.setHorizontalHeaderLabels([
+            'Arquivo', 'Data', 'Páginas', 'Caracteres', 'Produtos', 'Encontrados',
+            'Extração', 'Normalização', 'Busca', 'Gravação', 'Falha na Extração'
+        ])
+        self.recentes_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        layout.addWidget(self.recentes_table, 1)
+
+        parent = self.parent()
+        self.perfil_check = QCheckBox("Gerar perfil (cProfile) da próxima análise")
+        self.perfil_check.setChecked(bool(parent is not None and parent.perfil_proxima_analise))
+        self.perfil_check.toggled.connect(self.definir_perfil)
+        layout.addWidget(self.perfil_check)
+
+    def definir_perfil(self, ativo):
+        if self.parent() is not None:
+            self.parent().perfil_proxima_analise = ativo
+
+    def carregar(self):
+        limite = self.limite_spin.value()
+        resumo = self.db.get_percentis_tempos(limite, self.PERCENTIS)
+        for row, (etapa, _) in enumerate(self.ETAPAS):
+            for col, segundos in enumerate(resumo.get(etapa, [])):
+                self.percentis_table.setItem(row, col, QTableWidgetItem(f"{segundos:.3f} s"))
+        self.percentis_table.resizeColumnsToContents()
+
+        linhas = self.db.get_metricas_recentes(limite)
+        self.recentes_table.setRowCount(len(linhas))
+        for row, linha in enumerate(linhas):
+            _, arquivo, data, *tamanhos = linha[:7]
+            tempos = linha[7:11]
+            valores = [arquivo, data] + ["" if v is None else str(v) for v in tamanhos]
+            valores += ["" if t is None else f"{t:.3f} s" for t in tempos]
+            valores.append(linha[12] or "")
+            for col, valor in enumerate(valores):
+                self.recentes_table.setItem(row, col, QTableWidgetItem(str(valor)))
+        self.recentes_table.resizeColumnsToContents()
+
+
+class RankingDialog(QDialog):
+    """Melhores editais indexados de cada produto (índices calculados em matriz)"""
+
+    COLUNAS = ['Produto', 'Edital', 'Data', 'Índice', 'Positivas', 'Negativas']
+
+    def __init__(self, db, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self.setup_ui()
+        self.carregar()
+
+    def setup_ui(self):
+        self.setWindowTitle("Melhores Editais por Produto")
+        self.resize(900, 500)
+
+        layout = QVBoxLayout(self)
+
+        filtros_layout = QHBoxLayout()
+        filtros_layout.addWidget(QLabel("Produto:"))
+        self.produto_combo = QComboBox()
+        self.produto_combo.addItem("Todos", None)
+        for produto in self.db.get_produtos():
+            self.produto_combo.addItem(produto[1], produto[0])
+        filtros_layout.addWidget(self.produto_combo, 1)
+
+        filtros_layout.addWidget(QLabel("Editais por produto:"))
+        self.limite_spin = QSpinBox()
+        self.limite_spin.setRange(1, 1000)
+        self.limite_spin.setValue(10)
+        filtros_layout.addWidget(self.limite_spin)
+
+        self.filtrar_btn = QPushButton("Filtrar")
+        self.filtrar_btn.clicked.connect(self.carregar)
+        filtros_layout.addWidget(self.filtrar_btn)
+        layout.addLayout(filtros_layout)
+
+        self.ranking_table = QTableWidget()
+        self.ranking_table.setColumnCount(len(self.COLUNAS))
+        self.ranking_table.setHorizontalHeaderLabels(self.COLUNAS)
+        self.ranking_table.setSelectionBehavior(QTableWidget.SelectRows)
+        self.ranking_table.setEditTriggers(QTableWidget.NoEditTriggers)
+        self.ranking_table.cellDoubleClicked.connect(self.abrir_analise)
+        layout.addWidget(self.ranking_table)
+
+        self.status_label = QLabel("")
+        layout.addWidget(self.status_label)
+
+    def carregar(self):
+        # NumPy só é carregado quando o ranking é aberto
+        import ranking
+
+        if not self.db.fts_disponivel:
+            self.status_label.setText("O SQLite desta instalação não tem FTS5: arquivo de editais indisponível")
+            return
+        produto_id = self.produto_combo.currentData()
+        inicio = time.perf_counter()
+        linhas = ranking.melhores_editais(self.db, self.limite_spin.value(),
+                                          None if produto_id is None else [produto_id])
+        segundos = time.perf_counter() - inicio
+
+        # A ordenação é desligada durante o preenchimento para as linhas não mudarem de lugar
+        self.ranking_table.setSortingEnabled(False)
+        self.ranking_table.setRowCount(len(linhas))
+        for row, (_, nome, analise_id, arquivo, data, indice, positivas, negativas) in enumerate(linhas):
+            for col, valor in enumerate([nome, arquivo, data, indice, positivas, negativas]):
+                item = QTableWidgetItem()
+                # Números no DisplayRole para ordenar por valor, não como texto
+                item.setData(Qt.DisplayRole, valor)
+                item.setData(Qt.UserRole, analise_id)
+                self.ranking_table.setItem(row, col, item)
+        self.ranking_table.setSortingEnabled(True)
+        self.ranking_table.resizeColumnsToContents()
+        self.status_label.setText(f"{len(linhas)} resultado(s) em "
+                                  f"{len(self.db.get_documentos_indexados())} edital(is) indexado(s) "
+                                  f"({segundos:.2f} s)")
+
+    def abrir_analise(self, row, _col):
+        """Mostra os resultados completos da análise na janela principal"""
+        parent = self.parent()
+        if parent is not None:
+            analise_id = self.ranking_table.item(row, 0).data(Qt.UserRole)
+            parent.exibir_resultados(self.db.get_resultados_analise(analise_id))
+            parent.abrir_documento(self.db.get_analise_hash(analise_id))
+
+
+class ProdutosModel(QAbstractTableModel):
+    """Catálogo de produtos carregado do SQLite em lotes, conforme a rolagem
+
+    Filtro e ordenação são feitos na consulta (Database.get_produtos_lote):
+    um proxy só veria as linhas já carregadas.
+    """
+
+    COLUNAS = ['ID', 'Nome', 'Palavras Positivas']
+    # Chave de Database.ORDEM_PRODUTOS de cada coluna
+    ORDEM = ['id', 'nome', 'palavras_positivas']
+    LOTE = 200
+
+    def __init__(self, db, parent=None):
+        super().__init__(parent)
+        self.db = db
+        self.produtos = []
+        self.filtro = ""
+        self.coluna = 1
+        self.decrescente = False
+        self.total = db.contar_produtos() if db is not None else 0
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.produtos)
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUNAS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.COLUNAS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        produto = self.produtos[index.row()]
+        valor = (produto[0], produto[1], produto[3] or "")[index.column()]
+        if role == Qt.DisplayRole:
+            if index.column() == 2 and len(valor) > 50:
+                return valor[:50] + "..."
+            return str(valor)
+        return None
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        self.coluna = column
+        self.decrescente = order == Qt.DescendingOrder
+        if self.db is not None:
+            self.recarregar()
+
+    def filtrar(self, texto):
+        self.filtro = texto.strip()
+        self.recarregar()
+
+    def _chave(self, produto):
+        """(valor da coluna ordenada, id): posição do produto na consulta"""
+        return ((produto[0], produto[1], produto[3] or "")[self.coluna], produto[0])
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and len(self.produtos) < self.total
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        apos = self._chave(self.produtos[-1]) if self.produtos else None
+        lote = self.db.get_produtos_lote(self.LOTE, apos, self.filtro, self.ORDEM[self.coluna],
+                                         self.decrescente)
+        if not lote:
+            self.total = len(self.produtos)
+            return
+        inicio = len(self.produtos)
+        self.beginInsertRows(QModelIndex(), inicio, inicio + len(lote) - 1)
+        self.produtos.extend(lote)
+        self.endInsertRows()
+
+    def recarregar(self):
+        self.beginResetModel()
+        self.produtos = []
+        self.total = self.db.contar_produtos(self.filtro)
+        self.endResetModel()
+
+    def produto_id(self, row):
+        return self.produtos[row][0]
+
+    def _linha(self, produto_id):
+        for row, produto in enumerate(self.produtos):
+            if produto[0] == produto_id:
+                return row
+        return None
+
+    def _inserir(self, produto):
+        """Insere na posição da ordem atual se ela já estiver carregada (e o produto passar no filtro)"""
+        self.total = self.db.contar_produtos(self.filtro)
+        if not self.db.produto_no_filtro(produto[0], self.filtro):
+            return
+        chaves = [self._chave(p) for p in self.produtos]
+        if self.decrescente:
+            chaves.reverse()
+            row = len(chaves) - bisect_left(chaves, self._chave(produto))
+        else:
+            row = bisect_left(chaves, self._chave(produto))
+        # Além do último lote carregado o produto virá no próximo fetchMore
+        if row < len(self.produtos) or len(self.produtos) >= self.total - 1:
+            self.beginInsertRows(QModelIndex(), row, row)
+            self.produtos.insert(row, produto)
+            self.endInsertRows()
+
+    def produto_adicionado(self, produto_id):
+        self._inserir(self.db.get_produto(produto_id))
+
+    def produto_atualizado(self, produto_id):
+        produto = self.db.get_produto(produto_id)
+        row = self._linha(produto_id)
+        if (row is not None and self._chave(self.produtos[row]) == self._chave(produto)
+                and self.db.produto_no_filtro(produto_id, self.filtro)):
+            # Mesma posição: só atualiza a linha
+            self.produtos[row] = produto
+            self.dataChanged.emit(self.index(row, 0), self.index(row, len(self.COLUNAS) - 1))
+            return
+        if row is not None:
+            self.beginRemoveRows(QModelIndex(), row, row)
+            del self.produtos[row]
+            self.endRemoveRows()
+        self._inserir(produto)
+
+    def produto_removido(self, produto_id):
+        row = self._linha(produto_id)
+        if row is not None:
+            self.beginRemoveRows(QModelIndex(), row, row)
+            del self.produtos[row]
+            self.endRemoveRows()
+        self.total = self.db.contar_produtos(self.filtro)
+
+
+class ResultadosModel(QAbstractTableModel):
+    """Resultados da análise, expostos à tabela em lotes conforme a rolagem
+
+    A ordenação é feita aqui, sobre a lista completa: um proxy só veria as
+    linhas já expostas.
+    """
+
+    COLUNAS = ['Produto', 'Índice', 'Positivas', 'Negativas', 'Status']
+    LOTE = 200
+
+    def __init__(self, parent=None):
+        super().__init__(parent)
+        self.resultados = []
+        self.visiveis = 0
+        # Como a análise entrega: índice, maior primeiro
+        self.coluna = 1
+        self.decrescente = True
+
+    @staticmethod
+    def status(indice):
+        return "Ótimo" if indice >= 70 else "Regular" if indice >= 30 else "Ruim"
+
+    def rowCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else self.visiveis
+
+    def columnCount(self, parent=QModelIndex()):
+        return 0 if parent.isValid() else len(self.COLUNAS)
+
+    def headerData(self, section, orientation, role=Qt.DisplayRole):
+        if orientation == Qt.Horizontal and role == Qt.DisplayRole:
+            return self.COLUNAS[section]
+        return None
+
+    def data(self, index, role=Qt.DisplayRole):
+        if not index.isValid():
+            return None
+        resultado = self.resultados[index.row()]
+        coluna = index.column()
+        if role == Qt.DisplayRole:
+            return str(self._valor(resultado, coluna))
+        if role == Qt.BackgroundRole and coluna == 1:
+            # Colorir baseado no índice
+            if resultado['indice'] >= 70:
+                return QColor(144, 238, 144)  # Verde claro
+            elif resultado['indice'] >= 30:
+                return QColor(255, 255, 224)  # Amarelo claro
+            return QColor(255, 182, 193)  # Vermelho claro
+        return None
+
+    def _valor(self, resultado, coluna):
+        return (resultado['nome'], resultado['indice'], resultado['positivas_encontradas'],
+                resultado['negativas_encontradas'], self.status(resultado['indice']))[coluna]
+
+    def _chave(self, resultado):
+        return self._valor(resultado, self.coluna)
+
+    def sort(self, column, order=Qt.AscendingOrder):
+        self.coluna = column
+        self.decrescente = order == Qt.DescendingOrder
+        self.beginResetModel()
+        # Estável: empates mantêm a ordem anterior
+        self.resultados.sort(key=self._chave, reverse=self.decrescente)
+        self.endResetModel()
+
+    def canFetchMore(self, parent=QModelIndex()):
+        return not parent.isValid() and self.visiveis < len(self.resultados)
+
+    def fetchMore(self, parent=QModelIndex()):
+        if parent.isValid():
+            return
+        fim = min(self.visiveis + self.LOTE, len(self.resultados))
+        self.beginInsertRows(QModelIndex(), self.visiveis, fim - 1)
+        self.visiveis = fim
+        self.endInsertRows()
+
+    def definir_resultados(self, resultados):
+        self.beginResetModel()
+        self.resultados = sorted(resultados, key=self._chave, reverse=self.decrescente)
+        self.visiveis = min(self.LOTE, len(self.resultados))
+        self.endResetModel()
+
+    def adicionar(self, resultado):
+        """Insere um resultado parcial mantendo a ordem atual (depois dos empates)"""
+        chave = self._chave(resultado)
+        row = 0
+        while row < len(self.resultados) and (self._chave(self.resultados[row]) >= chave if self.decrescente
+                                              else self._chave(self.resultados[row]) <= chave):
+            row += 1
+        if row < self.visiveis or self.visiveis == len(self.resultados):
+            self.beginInsertRows(QModelIndex(), row, row)
+            self.resultados.insert(row, resultado)
+            self.visiveis += 1
+            self.endInsertRows()
+        else:
+            self.resultados.insert(row, resultado)
+
+    def resultado(self, row):
+        return self.resultados[row]
+
+
+class MainWindow(QMainWindow):
+    # Limites do painel de detalhes: páginas listadas por termo e trechos por página
+    PAGINAS_POR_TERMO = 30
+    TRECHOS_POR_PAGINA = 10
+    # Páginas extraídas de uma vez do arquivo quando o texto não está em cache
+    PAGINAS_POR_BLOCO = 10
+    TIPOS_TERMO = {'nome': "Nome", 'positiva': "Positiva", 'negativa': "Negativa"}
+
+    def __init__(self, perfil=None):
+        super().__init__()
+        # O banco é aberto depois que a janela aparece (ver inicializar_dados)
+        self.db = None
+        self.perfil = perfil
+        # Marcado no diálogo de diagnóstico; vale só para a próxima análise
+        self.perfil_proxima_analise = False
+        self.perfil_em_andamento = None
+        self.analyzer = DocumentAnalyzer()
+        self.current_files = []
+        self.fila_analises = []
+        self.analise_thread = None
+        self.analise_worker = None
+        self.arquivo_em_analise = None
+        # Produtos incluídos ou editados aguardando o recálculo nos editais anteriores
+        self.fila_reavaliacoes = []
+        self.reavaliacao_thread = None
+        self.reavaliacao_worker = None
+        # Extração de páginas para o visualizador e a página que aguarda por ela
+        self.paginas_thread = None
+        self.paginas_worker = None
+        self.pagina_aguardada = None
+        self.etapa_atual = ""
+        # Avisos de quase duplicata e de extração interrompida da análise em andamento
+        self.aviso_duplicata = None
+        self.aviso_extracao = None
+        # Documento dos resultados exibidos (ver abrir_documento) e ocorrências
+        # (página, início, fim, tipo) do produto selecionado
+        self.documento_atual = None
+        self.ocorrencias_produto = []
+        self.paginas_ocorrencias = []
+        self.setup_ui()
+
+    def setup_ui(self):
+        self.setWindowTitle("Analisador de Licitações")
+        self.setGeometry(100, 100, 1200, 700)
+
+        # Widget central e layout principal
+        central_widget = QWidget()
+        # Habilitado quando o banco estiver pronto
+        central_widget.setEnabled(False)
+        self.setCentralWidget(central_widget)
+        main_layout = QHBoxLayout(central_widget)
+
+        # Painel esquerdo - Cadastro de Produtos
+        left_panel = QWidget()
+        left_layout = QVBoxLayout(left_panel)
+        
+        left_layout.addWidget(QLabel("<h3>Cadastro de Produtos</h3>"))
+        
+        # Botões do CRUD
+        button_layout = QHBoxLayout()
+        self.novo_btn = QPushButton("Novo Produto")
+        self.editar_btn = QPushButton("Editar")
+        self.excluir_btn = QPushButton("Excluir")
+        self.atualizar_btn = QPushButton("Atualizar Lista")
+        
+        self.novo_btn.clicked.connect(self.novo_produto)
+        self.editar_btn.clicked.connect(self.editar_produto)
+        self.excluir_btn.clicked.connect(self.excluir_produto)
+        self.atualizar_btn.clicked.connect(self.carregar_produtos)
+        
+        button_layout.addWidget(self.novo_btn)
+        button_layout.addWidget(self.editar_btn)
+        button_layout.addWidget(self.excluir_btn)
+        button_layout.addWidget(self.atualizar_btn)
+        left_layout.addLayout(button_layout)
+        
+        # Importação/exportação do catálogo em planilhas
+        planilha_layout = QHBoxLayout()
+        self.importar_btn = QPushButton("Importar Planilha")
+        self.exportar_btn = QPushButton("Exportar Planilha")
+        self.importar_btn.clicked.connect(self.importar_planilha)
+        self.exportar_btn.clicked.connect(self.exportar_planilha)
+        planilha_layout.addWidget(self.importar_btn)
+        planilha_layout.addWidget(self.exportar_btn)
+        left_layout.addLayout(planilha_layout)
+        
+        # Filtro da lista de produtos
+        self.filtro_produtos_edit = QLineEdit()
+        self.filtro_produtos_edit.setPlaceholderText("Filtrar produtos...")
+        left_layout.addWidget(self.filtro_produtos_edit)
+        
+        # Lista de produtos (modelo carregado sob demanda; filtro e ordenação no SQLite)
+        self.produtos_model = ProdutosModel(None, self)
+        self.filtro_produtos_edit.textChanged.connect(self.filtrar_produtos)
+        
+        self.produtos_table = QTableView()
+        self.produtos_table.setModel(self.produtos_model)
+        self.produtos_table.setSelectionBehavior(QTableView.SelectRows)
+        self.produtos_table.setSelectionMode(QTableView.SingleSelection)
+        self.produtos_table.setEditTriggers(QTableView.NoEditTriggers)
+        self.produtos_table.setSortingEnabled(True)
+        self.produtos_table.sortByColumn(1, Qt.AscendingOrder)
+        self.produtos_table.horizontalHeader().setStretchLastSection(True)
+        left_layout.addWidget(self.produtos_table)
+        
+        main_layout.addWidget(left_panel, 1)
+
+        # Painel direito - Análise de Documentos
+        right_panel = QWidget()
+        right_layout = QVBoxLayout(right_panel)
+        
+        right_layout.addWidget(QLabel("<h3>Análise de Documentos</h3>"))
+        
+        # Seleção de arquivo
+        file_layout = QHBoxLayout()
+        self.file_path_edit = QLineEdit()
+        self.file_path_edit.setPlaceholderText("Selecione um arquivo...")
+        self.browse_btn = QPushButton("Procurar")
+        self.analisar_btn = QPushButton("Analisar Documento")
+        
+        self.browse_btn.clicked.connect(self.selecionar_arquivo)
+        self.analisar_btn.clicked.connect(self.analisar_documento)
+        self.historico_btn = QPushButton("Histórico")
+        self.historico_btn.clicked.connect(self.abrir_historico)
+        self.diagnostico_btn = QPushButton("Diagnóstico")
+        self.diagnostico_btn.clicked.connect(self.abrir_diagnostico)
+        self.ranking_btn = QPushButton("Ranking")
+        self.ranking_btn.clicked.connect(self.abrir_ranking)
+        
+        file_layout.addWidget(self.file_path_edit)
+        file_layout.addWidget(self.browse_btn)
+        file_layout.addWidget(self.analisar_btn)
+        file_layout.addWidget(self.historico_btn)
+        file_layout.addWidget(self.diagnostico_btn)
+        file_layout.addWidget(self.ranking_btn)
+        right_layout.addLayout(file_layout)
+        
+        # Processos usados na extração de PDFs grandes
+        config_layout = QHBoxLayout()
+        config_layout.addWidget(QLabel("Processos de extração:"))
+        self.processos_spin = QSpinBox()
+        self.processos_spin.setRange(1, os.cpu_count() or 1)
+        self.processos_spin.setValue(DocumentAnalyzer.PROCESSOS_PADRAO)
+        config_layout.addWidget(self.processos_spin)
+        config_layout.addStretch()
+        right_layout.addLayout(config_layout)
+        
+        # Progresso da análise em andamento
+        progresso_layout = QHBoxLayout()
+        self.status_label = QLabel("")
+        self.progress_bar = QProgressBar()
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.setValue(0)
+        self.cancelar_btn = QPushButton("Cancelar")
+        self.cancelar_btn.setEnabled(False)
+        self.cancelar_btn.clicked.connect(self.cancelar_analise)
+        
+        progresso_layout.addWidget(self.status_label, 1)
+        progresso_layout.addWidget(self.progress_bar, 1)
+        progresso_layout.addWidget(self.cancelar_btn)
+        right_layout.addLayout(progresso_layout)
+        
+        # Resultados da análise
+        right_layout.addWidget(QLabel("<h4>Resultados da Análise:</h4>"))
+        self.resultados_model = ResultadosModel(self)
+        
+        self.resultados_table = QTableView()
+        self.resultados_table.setModel(self.resultados_model)
+        self.resultados_table.setSelectionBehavior(QTableView.SelectRows)
+        self.resultados_table.setSelectionMode(QTableView.SingleSelection)
+        self.resultados_table.setEditTriggers(QTableView.NoEditTriggers)
+        self.resultados_table.setSortingEnabled(True)
+        self.resultados_table.sortByColumn(1, Qt.DescendingOrder)
+        self.resultados_table.horizontalHeader().setStretchLastSection(True)
+        right_layout.addWidget(self.resultados_table)
+        
+        # Detalhes do resultado selecionado; os links levam à página da ocorrência
+        right_layout.addWidget(QLabel("<h4>Detalhes:</h4>"))
+        self.detalhes_text = QTextBrowser()
+        self.detalhes_text.setOpenLinks(False)
+        self.detalhes_text.anchorClicked.connect(lambda url: self.mostrar_pagina(int(url.fragment())))
+        right_layout.addWidget(self.detalhes_text)
+        
+        # Visualizador do documento: só a página exibida é carregada e destacada
+        pagina_layout = QHBoxLayout()
+        self.pagina_anterior_btn = QPushButton("Anterior")
+        self.pagina_spin = QSpinBox()
+        self.pagina_spin.setRange(1, 1)
+        self.pagina_spin.setKeyboardTracking(False)
+        self.pagina_total_label = QLabel("")
+        self.pagina_proxima_btn = QPushButton("Próxima")
+        self.ocorrencia_anterior_btn = QPushButton("Ocorrência Anterior")
+        self.ocorrencia_proxima_btn = QPushButton("Próxima Ocorrência")
+        self.pagina_anterior_btn.clicked.connect(lambda: self.pagina_spin.stepBy(-1))
+        self.pagina_proxima_btn.clicked.connect(lambda: self.pagina_spin.stepBy(1))
+        self.pagina_spin.valueChanged.connect(lambda valor: self.mostrar_pagina(valor - 1))
+        self.ocorrencia_anterior_btn.clicked.connect(lambda: self.ir_para_ocorrencia(-1))
+        self.ocorrencia_proxima_btn.clicked.connect(lambda: self.ir_para_ocorrencia(1))
+        pagina_layout.addWidget(QLabel("Página:"))
+        pagina_layout.addWidget(self.pagina_anterior_btn)
+        pagina_layout.addWidget(self.pagina_spin)
+        pagina_layout.addWidget(self.pagina_total_label)
+        pagina_layout.addWidget(self.pagina_proxima_btn)
+        pagina_layout.addStretch()
+        pagina_layout.addWidget(self.ocorrencia_anterior_btn)
+        pagina_layout.addWidget(self.ocorrencia_proxima_btn)
+        right_layout.addLayout(pagina_layout)
+        self.pagina_text = QTextBrowser()
+        right_layout.addWidget(self.pagina_text, 1)
+        self.abrir_documento(None)
+        
+        main_layout.addWidget(right_panel, 2)
+        
+        # Conectar sinais
+        self.resultados_table.selectionModel().selectionChanged.connect(self.mostrar_detalhes)
+        
+        # Carregar dados iniciais assim que a janela for exibida
+        self.statusBar().showMessage("Carregando...")
+        QTimer.singleShot(0, self.inicializar_dados)
+
+    def marcar_perfil(self, etapa):
+        if self.perfil is not None:
+            self.perfil.marcar(etapa)
+
+    def inicializar_dados(self):
+        """Abre o banco (criação/migração das tabelas) e carrega a lista de produtos"""
+        self.db = Database()
+        self.marcar_perfil("banco de dados (create_tables)")
+        
+        self.processos_spin.setValue(int(self.db.get_config(
+            'processos_extracao', DocumentAnalyzer.PROCESSOS_PADRAO
+        )))
+        self.processos_spin.valueChanged.connect(
+            lambda valor: self.db.set_config('processos_extracao', valor)
+        )
+        self.produtos_model.db = self.db
+        self.carregar_produtos()
+        self.produtos_table.resizeColumnsToContents()
+        self.atualizar_status_cache()
+        self.centralWidget().setEnabled(True)
+        self.marcar_perfil("lista de produtos")
+        
+        # O catálogo compilado só é preciso na primeira análise; é montado em seguida
+        QTimer.singleShot(0, self.carregar_catalogo)
+
+    def carregar_catalogo(self):
+        self.db.get_catalogo().matcher.compile()
+        self.marcar_perfil("catálogo compilado")
+        if self.perfil is not None:
+            self.perfil.relatorio()
+
+    def carregar_produtos(self):
+        self.produtos_model.recarregar()
+
+    def filtrar_produtos(self, texto):
+        if self.db is not None:
+            self.produtos_model.filtrar(texto)
+
+    def produto_selecionado(self):
+        """Id do produto selecionado na tabela, ou None"""
+        index = self.produtos_table.currentIndex()
+        if not index.isValid():
+            return None
+        return self.produtos_model.produto_id(index.row())
+
+    def novo_produto(self):
+        dialog = ProdutoDialog(self)
+        if dialog.exec():
+            data = dialog.get_data()
+            if data['nome']:
+                produto_id = self.db.add_produto(
+                    data['nome'],
+                    data['descricao'],
+                    data['palavras_positivas'],
+                    data['palavras_negativas']
+                )
+                self.produtos_model.produto_adicionado(produto_id)
+                self.informar_acertos_retroativos(produto_id)
+
+    def editar_produto(self):
+        produto_id = self.produto_selecionado()
+        if produto_id is not None:
+            produto = self.db.get_produto(produto_id)
+            
+            dialog = ProdutoDialog(self, produto)
+            if dialog.exec():
+                data = dialog.get_data()
+                if data['nome']:
+                    self.db.update_produto(
+                        produto_id,
+                        data['nome'],
+                        data['descricao'],
+                        data['palavras_positivas'],
+                        data['palavras_negativas']
+                    )
+                    self.produtos_model.produto_atualizado(produto_id)
+                    self.informar_acertos_retroativos(produto_id)
+
+    def informar_acertos_retroativos(self, produto_id):
+        """Recalcula o produto nos editais já analisados, em segundo plano, e informa os acertos
+
+        Um recálculo por vez: as edições feitas enquanto um roda aguardam na fila.
+        """
+        if produto_id not in self.fila_reavaliacoes:
+            self.fila_reavaliacoes.append(produto_id)
+        if self.reavaliacao_thread is None:
+            self.iniciar_proxima_reavaliacao()
+
+    def iniciar_proxima_reavaliacao(self):
+        if not self.fila_reavaliacoes:
+            return
+        produto_id = self.fila_reavaliacoes.pop(0)
+        self.reavaliacao_thread = QThread(self)
+        self.reavaliacao_worker = ReavaliacaoWorker(produto_id, self.db)
+        self.reavaliacao_worker.moveToThread(self.reavaliacao_thread)
+        
+        self.reavaliacao_thread.started.connect(self.reavaliacao_worker.run)
+        self.reavaliacao_worker.concluido.connect(self.reavaliacao_concluida)
+        self.reavaliacao_worker.falhou.connect(self.reavaliacao_falhou)
+        self.reavaliacao_worker.terminou.connect(self.reavaliacao_thread.quit)
+        self.reavaliacao_thread.finished.connect(self.reavaliacao_finalizada)
+        self.reavaliacao_thread.start()
+
+    def reavaliacao_concluida(self, produto_id, acertos):
+        produto = self.db.get_produto(produto_id)
+        if not acertos or produto is None:
+            return
+        acertos.sort(key=lambda acerto: acerto[2], reverse=True)
+        linhas = "<br>".join(
+            f"{arquivo}: índice {indice}" for _, arquivo, indice, _ in acertos[:10]
+        )
+        if len(acertos) > 10:
+            linhas += f"<br>... e mais {len(acertos) - 10}"
+        retroativos = sum(1 for acerto in acertos if acerto[3])
+        QMessageBox.information(
+            self, "Editais Anteriores",
+            f"O produto {html.escape(produto[1])} aparece em {len(acertos)} edital(is) já analisado(s) "
+            f"({retroativos} retroativo(s)); os índices foram recalculados:<br>{linhas}"
+        )
+
+    def reavaliacao_falhou(self, produto_id, mensagem):
+        QMessageBox.warning(self, "Aviso", mensagem)
+
+    def reavaliacao_finalizada(self):
+        self.reavaliacao_thread.deleteLater()
+        self.reavaliacao_worker.deleteLater()
+        self.reavaliacao_thread = None
+        self.reavaliacao_worker = None
+        self.iniciar_proxima_reavaliacao()
+
+    def excluir_produto(self):
+        produto_id = self.produto_selecionado()
+        if produto_id is not None:
+            reply = QMessageBox.question(
+                self, 'Confirmar Exclusão',
+                f'Tem certeza que deseja excluir este produto?',
+                QMessageBox.Yes | QMessageBox.No, QMessageBox.No
+            )
+            
+            if reply == QMessageBox.Yes:
+                self.db.delete_produto(produto_id)
+                self.produtos_model.produto_removido(produto_id)
+
+    def importar_planilha(self):
+        import planilhas
+        caminho, _ = QFileDialog.getOpenFileName(
+            self, "Importar Produtos", "", "Planilhas (*.csv *.xlsx)"
+        )
+        if not caminho:
+            return
+        
+        # Primeiro uma simulação, para o usuário conferir antes de gravar
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            relatorio = planilhas.importar(self.db, caminho, dry_run=True)
+        except Exception as e:
+            QMessageBox.warning(self, "Aviso", f"Erro ao ler a planilha: {str(e)}")
+            return
+        finally:
+            QApplication.restoreOverrideCursor()
+        
+        caixa = QMessageBox(self)
+        caixa.setWindowTitle("Importar Produtos")
+        caixa.setText(
+            f"{relatorio['inseridos']} produto(s) novo(s), {relatorio['atualizados']} atualizado(s), "
+            f"{relatorio['inalterados']} inalterado(s), {len(relatorio['erros'])} linha(s) com erro.\n"
+            "Deseja importar?"
+        )
+        caixa.setDetailedText(planilhas.formatar_relatorio(relatorio))
+        caixa.setStandardButtons(QMessageBox.Yes | QMessageBox.No)
+        if caixa.exec() != QMessageBox.Yes:
+            return
+        
+        QApplication.setOverrideCursor(Qt.WaitCursor)
+        try:
+            relatorio = planilhas.importar(self.db, caminho)
+            self.carregar_produtos()
+        finally:
+            QApplication.restoreOverrideCursor()
+        self.statusBar().showMessage(
+            f"Importação: {relatorio['inseridos']} inserido(s), "
+            f"{relatorio['atualizados']} atualizado(s) em {relatorio['segundos']:.1f} s"
+        )
+
+    def exportar_planilha(self):
+        import planilhas
+        caminho, _ = QFileDialog.getSaveFileName(
+            self, "Exportar Produtos", "produtos.xlsx", "Excel (*.xlsx);;CSV (*.csv)"
+        )
+        if not caminho:
+            return
+        try:
+            total = planilhas.exportar(self.db, caminho)
+        except Exception as e:
+            QMessageBox.warning(self, "Aviso", f"Erro ao exportar: {str(e)}")
+            return
+        self.statusBar().showMessage(f"{total} produto(s) exportado(s) para {caminho}")
+
+    def selecionar_arquivo(self):
+        file_paths, _ = QFileDialog.getOpenFileNames(
+            self,
+            "Selecionar Documentos",
+            "",
+            "Documentos (*.pdf *.doc *.docx *.txt *.rtf);;Todos os arquivos (*)"
+        )
+        
+        if file_paths:
+            self.file_path_edit.setText("; ".join(file_paths))
+            self.current_files = file_paths
+
+    def analisar_documento(self):
+        arquivos = [f for f in self.current_files if os.path.exists(f)]
+        if not arquivos:
+            QMessageBox.warning(self, "Aviso", "Selecione um arquivo válido!")
+            return
+        
+        if not self.db.get_catalogo():
+            QMessageBox.warning(self, "Aviso", "Cadastre produtos primeiro!")
+            return
+        
+        # Enfileira os documentos; a análise roda em segundo plano
+        self.fila_analises.extend(arquivos)
+        if self.analise_thread is None:
+            self.iniciar_proxima_analise()
+        else:
+            self.atualizar_status_fila()
+
+    def iniciar_proxima_analise(self):
+        if not self.fila_analises:
+            self.analisar_btn.setText("Analisar Documento")
+            self.cancelar_btn.setEnabled(False)
+            return
+        
+        arquivo = self.fila_analises.pop(0)
+        self.resultados_model.definir_resultados([])
+        self.abrir_documento(None)
+        self.progress_bar.setValue(0)
+        self.cancelar_btn.setEnabled(True)
+        self.analisar_btn.setText("Adicionar à Fila")
+        
+        self.perfil_em_andamento = None
+        if self.perfil_proxima_analise:
+            self.perfil_proxima_analise = False
+            nome = os.path.splitext(os.path.basename(arquivo))[0]
+            self.perfil_em_andamento = os.path.join(
+                os.path.dirname(os.path.abspath(self.db.path)),
+                f"perfil_{nome}_{datetime.now():%Y%m%d_%H%M%S}.prof"
+            )
+        
+        # O worker recebe uma cópia do catálogo: o cadastro continua editável
+        self.analise_thread = QThread(self)
+        self.analise_worker = AnaliseWorker(
+            arquivo, self.db.get_catalogo().snapshot(), self.processos_spin.value(), self.db,
+            self.perfil_em_andamento
+        )
+        self.analise_worker.moveToThread(self.analise_thread)
+        
+        self.analise_thread.started.connect(self.analise_worker.run)
+        self.analise_worker.etapa.connect(self.atualizar_etapa)
+        self.analise_worker.pagina.connect(self.atualizar_pagina)
+        self.analise_worker.progresso.connect(self.progress_bar.setValue)
+        self.analise_worker.resultado_parcial.connect(self.adicionar_resultado)
+        self.analise_worker.duplicata.connect(self.duplicata_encontrada)
+        self.analise_worker.extracao_interrompida.connect(self.extracao_interrompida)
+        self.analise_worker.documento_indexado.connect(self.documento_indexado)
+        self.analise_worker.concluido.connect(self.analise_concluida)
+        self.analise_worker.falhou.connect(self.analise_falhou)
+        self.analise_worker.cancelado.connect(self.analise_cancelada)
+        self.analise_worker.terminou.connect(self.analise_thread.quit)
+        self.analise_thread.finished.connect(self.analise_finalizada)
+        
+        self.arquivo_em_analise = arquivo
+        self.aviso_duplicata = None
+        self.aviso_extracao = None
+        self.atualizar_etapa("Iniciando...")
+        self.analise_thread.start()
+
+    def abrir_historico(self):
+        HistoricoDialog(self.db, self).exec()
+
+    def abrir_diagnostico(self):
+        DiagnosticoDialog(self.db, self).exec()
+
+    def abrir_ranking(self):
+        RankingDialog(self.db, self).exec()
+
+    def cancelar_analise(self):
+        if self.analise_worker is not None:
+            self.analise_worker.cancelar()
+            self.cancelar_btn.setEnabled(False)
+
+    def atualizar_status_fila(self, etapa=None):
+        if etapa is not None:
+            self.etapa_atual = etapa
+        texto = f"{os.path.basename(self.arquivo_em_analise)}: {self.etapa_atual}"
+        if self.aviso_extracao:
+            texto += f" - extração interrompida: {self.aviso_extracao}"
+        if self.aviso_duplicata:
+            texto += f" - {self.aviso_duplicata}"
+        if self.fila_analises:
+            texto += f" ({len(self.fila_analises)} na fila)"
+        self.status_label.setText(texto)
+
+    def atualizar_etapa(self, etapa):
+        self.atualizar_status_fila(etapa)
+
+    def atualizar_pagina(self, numero, total):
+        self.atualizar_status_fila(f"Extraindo texto... página {numero} de {total}")
+
+    def duplicata_encontrada(self, arquivo, duplicata):
+        self.aviso_duplicata = descrever(duplicata)
+        self.atualizar_status_fila()
+
+    def extracao_interrompida(self, arquivo, falha):
+        self.aviso_extracao = falha
+        self.atualizar_status_fila()
+
+    def analise_concluida(self, arquivo, resultados, analise_id, metricas, impressao):
+        self.exibir_resultados(resultados)
+        mensagem = f"{os.path.basename(arquivo)}: {len(resultados)} produto(s) encontrado(s)"
+        if metricas.get('memorizada'):
+            mensagem += " (análise memorizada)"
+        if metricas.get('falha_extracao'):
+            mensagem += f" - extração interrompida: {metricas['falha_extracao']}"
+        if impressao is not None and impressao.duplicata:
+            mensagem += f" - {descrever(impressao.duplicata)}"
+        if self.perfil_em_andamento:
+            mensagem += f" - perfil em {os.path.basename(self.perfil_em_andamento)}"
+        # A análise já foi gravada no histórico (id `analise_id`) pelo worker
+        self.status_label.setText(mensagem)
+
+    def analise_falhou(self, arquivo, mensagem):
+        self.status_label.setText(f"{os.path.basename(arquivo)}: falhou")
+        QMessageBox.warning(self, "Aviso", f"{os.path.basename(arquivo)}: {mensagem}")
+
+    def analise_cancelada(self, arquivo):
+        self.status_label.setText(f"{os.path.basename(arquivo)}: análise cancelada")
+
+    def atualizar_status_cache(self):
+        acertos, falhas, entradas, tamanho = self.db.get_estatisticas_cache()
+        self.statusBar().showMessage(
+            f"Cache de texto: {acertos} acerto(s), {falhas} falha(s) - "
+            f"{entradas} documento(s), {tamanho / (1024 * 1024):.1f} MB"
+        )
+
+    def analise_finalizada(self):
+        self.atualizar_status_cache()
+        self.analise_thread.deleteLater()
+        self.analise_worker.deleteLater()
+        self.analise_thread = None
+        self.analise_worker = None
+        self.iniciar_proxima_analise()
+
+    def closeEvent(self, event):
+        # Interrompe a análise em andamento antes de fechar a janela
+        self.fila_analises.clear()
+        if self.analise_thread is not None:
+            self.analise_worker.cancelar()
+            self.analise_thread.quit()
+            self.analise_thread.wait()
+        # O recálculo em andamento grava no banco: termina antes de fechar
+        self.fila_reavaliacoes.clear()
+        if self.reavaliacao_thread is not None:
+            self.reavaliacao_thread.quit()
+            self.reavaliacao_thread.wait()
+        if self.paginas_thread is not None:
+            self.paginas_thread.quit()
+            self.paginas_thread.wait()
+        super().closeEvent(event)
+
+    def adicionar_resultado(self, resultado):
+        """Insere um resultado parcial mantendo a tabela ordenada por índice"""
+        self.resultados_model.adicionar(resultado)
+
+    def exibir_resultados(self, resultados):
+        self.resultados_model.definir_resultados(resultados)
+
+    def documento_indexado(self, arquivo, arquivo_hash, posicoes, paginas, total):
+        self.abrir_documento(arquivo_hash, arquivo, posicoes, paginas, total)
+
+    def abrir_documento(self, arquivo_hash, arquivo=None, posicoes=None, paginas=None, total=0):
+        """Define o documento dos resultados exibidos (detalhes e visualizador)
+
+        Sem `posicoes`, o índice gravado para o conteúdo é carregado. O texto
+        das páginas vem de `paginas`, do cache de texto ou, em último caso, do
+        próprio arquivo, em blocos extraídos em segundo plano (ver
+        _carregar_paginas).
+        """
+        self.documento_atual = None
+        self.pagina_aguardada = None
+        if arquivo_hash is not None:
+            if posicoes is None:
+                posicoes = self.db.get_posicoes(arquivo_hash, DocumentAnalyzer.EXTRATOR_VERSAO)
+            if not total and posicoes:
+                # Análises do histórico: as páginas conhecidas são as do índice
+                total = max(posicoes.valores[0::3]) + 1
+            self.documento_atual = {
+                'arquivo': arquivo,
+                'hash': arquivo_hash,
+                'posicoes': posicoes,
+                'paginas': paginas,
+                'total': total,
+                'cache_lido': paginas is not None,
+                'extraidas': {},
+                'falhas': set(),
+            }
+        self.ocorrencias_produto = []
+        self.paginas_ocorrencias = []
+        self.detalhes_text.clear()
+        self.pagina_text.clear()
+        self._atualizar_navegacao()
+
+    def _atualizar_navegacao(self):
+        documento = self.documento_atual
+        total = max(documento['total'], 1) if documento else 1
+        self.pagina_spin.setRange(1, total)
+        self.pagina_total_label.setText(f"de {total}" if documento else "")
+        for widget in (self.pagina_anterior_btn, self.pagina_spin, self.pagina_proxima_btn):
+            widget.setEnabled(documento is not None)
+        for widget in (self.ocorrencia_anterior_btn, self.ocorrencia_proxima_btn):
+            widget.setEnabled(bool(self.paginas_ocorrencias))
+
+    def _texto_pagina(self, numero):
+        """Texto de uma página do documento atual, ou None se não estiver em memória nem no cache"""
+        documento = self.documento_atual
+        if not documento['cache_lido']:
+            # O cache de texto guarda o documento inteiro: lido uma vez, na primeira página pedida
+            documento['cache_lido'] = True
+            documento['paginas'] = self.db.ler_texto_cache(documento['hash'],
+                                                           DocumentAnalyzer.EXTRATOR_VERSAO)
+            if documento['paginas'] is not None:
+                documento['total'] = len(documento['paginas'])
+                self._atualizar_navegacao()
+        if documento['paginas'] is not None:
+            paginas = documento['paginas']
+            return paginas[numero] if numero < len(paginas) else None
+        return documento['extraidas'].get(numero)
+
+    def _carregar_paginas(self, numero):
+        """Extrai do arquivo, em segundo plano, o bloco de páginas a partir de `numero`
+
+        Retorna False se a página não puder ser extraída (arquivo ausente ou
+        falha anterior). Com uma extração em andamento, a página é pedida
+        quando ela terminar (ver paginas_finalizadas).
+        """
+        documento = self.documento_atual
+        arquivo = documento['arquivo']
+        if numero in documento['falhas'] or not arquivo or not os.path.exists(arquivo):
+            return False
+        if self.paginas_thread is None:
+            fim = min(numero + self.PAGINAS_POR_BLOCO, max(documento['total'], numero + 1))
+            numeros = [n for n in range(numero, fim) if n not in documento['extraidas']]
+            self.paginas_thread = QThread(self)
+            self.paginas_worker = PaginasWorker(documento, numeros)
+            self.paginas_worker.moveToThread(self.paginas_thread)
+            
+            self.paginas_thread.started.connect(self.paginas_worker.run)
+            self.paginas_worker.concluido.connect(self.paginas_extraidas)
+            self.paginas_worker.terminou.connect(self.paginas_thread.quit)
+            self.paginas_thread.finished.connect(self.paginas_finalizadas)
+            self.paginas_thread.start()
+        return True
+
+    def paginas_extraidas(self, documento, numeros, paginas):
+        documento['extraidas'].update(paginas)
+        documento['falhas'].update(n for n in numeros if n not in paginas)
+
+    def paginas_finalizadas(self):
+        self.paginas_thread.deleteLater()
+        self.paginas_worker.deleteLater()
+        self.paginas_thread = None
+        self.paginas_worker = None
+        # Exibe a página aguardada (ou pede o bloco dela, se a navegação mudou de página)
+        if self.documento_atual is not None and self.pagina_aguardada is not None:
+            self.mostrar_pagina(self.pagina_aguardada)
+
+    @staticmethod
+    def _termos_produto(resultado):
+        """Termos buscados para um resultado: (termo normalizado, tipo)"""
+        termos = [(DocumentAnalyzer.normalize_text(resultado['nome']), 'nome')]
+        for tipo, chave in (('positiva', 'palavras_positivas'), ('negativa', 'palavras_negativas')):
+            for palavra in DocumentAnalyzer.split_palavras(resultado.get(chave)):
+                termos.extend((termo, tipo) for termo in KeywordMatcher.keyword_terms(palavra))
+        return termos
+
+    def mostrar_detalhes(self):
+        index = self.resultados_table.currentIndex()
+        if index.isValid():
+            resultado = self.resultados_model.resultado(index.row())
+            detalhes = f"""
+            <b>Produto:</b> {resultado['nome']}<br>
+            <b>Índice:</b> {resultado['indice']}<br>
+            <b>Palavras Positivas Encontradas:</b> {resultado['positivas_encontradas']}<br>
+            <b>Palavras Negativas Encontradas:</b> {resultado['negativas_encontradas']}<br>
+            <b>Status:</b> {ResultadosModel.status(resultado['indice'])}<br>
+            <hr>
+            <i>Nota: Índice calculado com base na relação entre palavras positivas e negativas encontradas na descrição.</i>
+            """
+            
+            # Ocorrências vindas do índice de posições: nenhuma busca no texto
+            posicoes = self.documento_atual['posicoes'] if self.documento_atual else None
+            ocorrencias = []
+            linhas = []
+            for termo, tipo in self._termos_produto(resultado) if posicoes is not None else ():
+                do_termo = posicoes.ocorrencias(termo)
+                if not do_termo:
+                    continue
+                ocorrencias.extend((pagina, inicio, fim, tipo) for pagina, inicio, fim in do_termo)
+                paginas = sorted({pagina for pagina, _, _ in do_termo})
+                links = ", ".join(f'<a href="#{pagina}">{pagina + 1}</a>'
+                                  for pagina in paginas[:self.PAGINAS_POR_TERMO])
+                if len(paginas) > self.PAGINAS_POR_TERMO:
+                    links += ", ..."
+                linhas.append(f'<span style="background-color: {CORES_DESTAQUE[tipo]}; color: black">'
+                              f'{self.TIPOS_TERMO[tipo]}</span> <b>{html.escape(termo)}</b>: '
+                              f'{len(do_termo)} ocorrência(s) - página(s) {links}')
+            ocorrencias.sort()
+            self.ocorrencias_produto = ocorrencias
+            self.paginas_ocorrencias = sorted({pagina for pagina, _, _, _ in ocorrencias})
+            
+            if linhas:
+                detalhes += "<hr><b>Ocorrências:</b><br>" + "<br>".join(linhas)
+            elif self.documento_atual is None or posicoes is None:
+                detalhes += "<hr><i>Posições das ocorrências indisponíveis para esta análise.</i>"
+            self.detalhes_text.setHtml(detalhes)
+            self._atualizar_navegacao()
+            
+            # Abre a página da primeira menção ao produto
+            if self.documento_atual is not None:
+                primeira = next((o[0] for o in ocorrencias if o[3] == 'nome'),
+                                self.paginas_ocorrencias[0] if ocorrencias else 0)
+                self.mostrar_pagina(primeira)
+
+    def mostrar_pagina(self, numero):
+        """Exibe só a página `numero` (a partir de 0), com trechos e termos destacados"""
+        documento = self.documento_atual
+        if documento is None:
+            return
+        numero = max(0, min(numero, max(documento['total'], 1) - 1))
+        texto = self._texto_pagina(numero)
+        self.pagina_spin.blockSignals(True)
+        self.pagina_spin.setValue(numero + 1)
+        self.pagina_spin.blockSignals(False)
+        self.pagina_aguardada = None
+        if texto is None:
+            if self._carregar_paginas(numero):
+                self.pagina_aguardada = numero
+                self.pagina_text.setPlainText(f"Carregando a página {numero + 1}...")
+            else:
+                self.pagina_text.setPlainText(
+                    "Texto da página indisponível: o arquivo não foi encontrado nem está no cache de texto."
+                )
+            return
+        
+        pagina = NormalizedDocument(texto)
+        primeiro = bisect_left(self.ocorrencias_produto, (numero,))
+        ultimo = bisect_left(self.ocorrencias_produto, (numero + 1,))
+        ocorrencias = [(inicio, fim, tipo) for _, inicio, fim, tipo in self.ocorrencias_produto[primeiro:ultimo]]
+        
+        trechos = []
+        for inicio, fim, tipo in ocorrencias[:self.TRECHOS_POR_PAGINA]:
+            antes, depois = DocumentAnalyzer.context_bounds(pagina.text, inicio, fim)
+            trecho = re.sub(r'\s+', ' ', destacar_html(pagina, [(inicio, fim, tipo)], antes, depois))
+            trechos.append(f"<li>...{trecho}...</li>")
+        cabecalho = f"<b>Página {numero + 1}</b>"
+        if ocorrencias:
+            cabecalho += f" - {len(ocorrencias)} ocorrência(s)<ul>{''.join(trechos)}</ul>"
+        corpo = destacar_html(pagina, ocorrencias).replace('\n', '<br>')
+        self.pagina_text.setHtml(f"{cabecalho}<hr>{corpo}")
+
+    def ir_para_ocorrencia(self, delta):
+        """Vai para a página anterior (delta -1) ou seguinte (1) com ocorrências do produto"""
+        paginas = self.paginas_ocorrencias
+        atual = self.pagina_spin.value() - 1
+        if delta > 0:
+            i = bisect_right(paginas, atual)
+        else:
+            i = bisect_left(paginas, atual) - 1
+        if 0 <= i < len(paginas):
+            self.mostrar_pagina(paginas[i])
+
+def main(perfil=None):
+    app = QApplication(sys.argv)
+    app.setStyle('Fusion')
+    
+    # Estilo básico
+    app.setStyleSheet("""
+        QMainWindow {
+            background-color: #292828;
+        }
+        QPushButton {
+            background-color: #4CAF50;
+            color: white;
+            border: none;
+            padding: 8px;
+            border-radius: 4px;
+        }
+        QPushButton:hover {
+            background-color: #45a049;
+        }
+        QTableWidget, QTableView {
+            background-color: #363434;
+            border: 1px solid #ddd;
+            color: white;
+        }
+        QLineEdit, QTextEdit {
+            border: 1px solid #ddd;
+            border-radius: 4px;
+            padding: 4px;
+        }
+        QLabel[text*="<h3>"],
+        QLabel[text*="<h4>"] {
+            color: #ebe8e8;
+        }
+    """)
+    
+    if perfil is not None:
+        perfil.marcar("QApplication")
+    
+    window = MainWindow(perfil)
+    window.show()
+    if perfil is not None:
+        perfil.marcar("janela exibida")
+    sys.exit(app.exec())
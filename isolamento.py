@@ -0,0 +1,253 @@
+# isolamento.py
+"""Processos isolados para a leitura de documentos
+
+Alguns PDFs malformados deixam o PyPDF2 minutos preso ou consumindo memória
+sem limite. A extração roda em processos filhos supervisionados: o documento
+tem um prazo (tempo de relógio) e cada processo um limite de memória, aplicado
+como espaço de endereçamento (RLIMIT_AS, no Linux) e conferido pelo processo
+principal pela memória residente (Linux e Windows). O filho envia o que extrai
+pelo pipe, mensagem a mensagem, então uma falha preserva o que já chegou.
+
+Os processos são criados por 'forkserver' (ou 'spawn', no Windows): o filho
+não herda a memória nem as threads de quem pediu a extração (a interface, o
+servidor HTTP).
+"""
+import multiprocessing
+import os
+import sys
+import time
+from multiprocessing.connection import wait
+
+# Motivos de falha
+TEMPO_ESGOTADO = 'tempo_esgotado'
+MEMORIA = 'memoria'
+LEITURA = 'leitura'
+
+DESCRICOES = {
+    TEMPO_ESGOTADO: "tempo esgotado",
+    MEMORIA: "limite de memória excedido",
+    LEITURA: "erro de leitura",
+}
+
+# Intervalo (segundos) entre as verificações da memória dos processos
+INTERVALO_MEMORIA = 0.25
+
+_contexto = None
+
+# Com um caminho (ex.: 'perfil.prof'), cada processo isolado roda sob o
+# cProfile e grava 'perfil.extracao-<pid>.prof' ao terminar (analyze --profile)
+PERFIL = None
+
+
+class FalhaExtracao(Exception):
+    """Extração interrompida: motivo (TEMPO_ESGOTADO, MEMORIA ou LEITURA) e páginas obtidas
+
+    `paginas` e `total` são preenchidos por quem montou o resultado parcial
+    (total é None se o número de páginas não chegou a ser lido).
+    """
+
+    def __init__(self, motivo, detalhe=''):
+        super().__init__(motivo, detalhe)
+        self.motivo = motivo
+        self.detalhe = detalhe
+        self.paginas = 0
+        self.total = None
+
+    def __str__(self):
+        texto = DESCRICOES.get(self.motivo, self.motivo)
+        if self.detalhe:
+            texto += f": {self.detalhe}"
+        if self.total:
+            texto += f" (extraídas {self.paginas} de {self.total} páginas)"
+        return texto
+
+
+def contexto():
+    """Contexto de multiprocessing dos processos isolados, criado no primeiro uso"""
+    global _contexto
+    if _contexto is None:
+        if 'forkserver' in multiprocessing.get_all_start_methods():
+            _contexto = multiprocessing.get_context('forkserver')
+            # O servidor já tem o leitor de PDF carregado; cada filho é só um fork dele
+            _contexto.set_forkserver_preload(['analyzer', 'PyPDF2'])
+        else:
+            _contexto = multiprocessing.get_context('spawn')
+    return _contexto
+
+
+def _memoria_mb(pid):
+    """Memória residente do processo em MB, ou None se não puder ser medida"""
+    if sys.platform.startswith('linux'):
+        try:
+            with open(f'/proc/{pid}/statm') as arquivo:
+                residentes = int(arquivo.read().split()[1])
+        except (OSError, ValueError, IndexError):
+            return None
+        return residentes * os.sysconf('SC_PAGE_SIZE') / (1024 * 1024)
+    if sys.platform == 'win32':
+        import ctypes
+        from ctypes import wintypes
+
+        class Contadores(ctypes.Structure):
+            _fields_ = [('cb', wintypes.DWORD), ('PageFaultCount', wintypes.DWORD)] + [
+                (nome, ctypes.c_size_t) for nome in (
+                    'PeakWorkingSetSize', 'WorkingSetSize', 'QuotaPeakPagedPoolUsage',
+                    'QuotaPagedPoolUsage', 'QuotaPeakNonPagedPoolUsage',
+                    'QuotaNonPagedPoolUsage', 'PagefileUsage', 'PeakPagefileUsage')
+            ]
+
+        kernel32 = ctypes.WinDLL('kernel32', use_last_error=True)
+        # PROCESS_QUERY_LIMITED_INFORMATION | PROCESS_VM_READ
+        handle = kernel32.OpenProcess(0x1000 | 0x0010, False, pid)
+        if not handle:
+            return None
+        try:
+            contadores = Contadores()
+            contadores.cb = ctypes.sizeof(contadores)
+            if not kernel32.K32GetProcessMemoryInfo(handle, ctypes.byref(contadores), contadores.cb):
+                return None
+            return contadores.WorkingSetSize / (1024 * 1024)
+        finally:
+            kernel32.CloseHandle(handle)
+    return None
+
+
+def _limitar_memoria(limite_mb):
+    """Limita o espaço de endereçamento do próprio processo a `limite_mb` além do atual
+
+    Só no Linux: o espaço já reservado pelo interpretador varia muito entre
+    sistemas (no macOS passa de vários GB), então o limite é somado a ele.
+    """
+    try:
+        import resource
+        with open('/proc/self/statm') as arquivo:
+            atual = int(arquivo.read().split()[0]) * os.sysconf('SC_PAGE_SIZE')
+    except (ImportError, OSError, ValueError):
+        return
+    limite = atual + limite_mb * 1024 * 1024
+    _, maximo = resource.getrlimit(resource.RLIMIT_AS)
+    if maximo != resource.RLIM_INFINITY:
+        limite = min(limite, maximo)
+    resource.setrlimit(resource.RLIMIT_AS, (limite, maximo))
+
+
+def arquivo_perfil(perfil, pid):
+    """Arquivo de estatísticas do cProfile do processo isolado `pid` (ver PERFIL)"""
+    base, ext = os.path.splitext(perfil)
+    return f"{base}.extracao-{pid}{ext}"
+
+
+def _perfilar(perfil, alvo, conn, args):
+    import cProfile
+    profiler = cProfile.Profile()
+    try:
+        profiler.runcall(alvo, conn, *args)
+    finally:
+        # Antes do aviso de 'fim': depois dele o processo pode ser encerrado
+        profiler.dump_stats(arquivo_perfil(perfil, os.getpid()))
+
+
+def _executar(conn, alvo, args, limite_memoria_mb, perfil=None):
+    """Corpo do processo filho: roda `alvo(conn, *args)` e avisa como terminou"""
+    if limite_memoria_mb:
+        _limitar_memoria(limite_memoria_mb)
+    try:
+        if perfil:
+            _perfilar(perfil, alvo, conn, args)
+        else:
+            alvo(conn, *args)
+        conn.send(('fim',))
+    except MemoryError:
+        # Solta o que for possível antes de tentar avisar
+        alvo = args = None
+        try:
+            conn.send(('falha', MEMORIA, ''))
+        except Exception:
+            pass
+    except Exception as e:
+        try:
+            conn.send(('falha', LEITURA, f"{type(e).__name__}: {e}"))
+        except Exception:
+            pass
+    finally:
+        conn.close()
+
+
+class ProcessoIsolado:
+    """Processo filho que executa `alvo(conn, *args)` e envia mensagens pelo pipe
+
+    Cada mensagem é uma tupla cujo primeiro item é o tipo; 'fim' e 'falha'
+    são enviadas pelo próprio processo isolado ao terminar.
+    """
+
+    def __init__(self, alvo, args=(), limite_memoria_mb=None):
+        ctx = contexto()
+        self.conn, filho = ctx.Pipe()
+        self.limite_memoria_mb = limite_memoria_mb
+        self.processo = ctx.Process(target=_executar,
+                                    args=(filho, alvo, args, limite_memoria_mb, PERFIL), daemon=True)
+        self.processo.start()
+        filho.close()
+
+    def enviar(self, mensagem):
+        self.conn.send(mensagem)
+
+    def memoria_excedida(self):
+        if not self.limite_memoria_mb:
+            return False
+        memoria = _memoria_mb(self.processo.pid)
+        return memoria is not None and memoria > self.limite_memoria_mb
+
+    def falha_ao_terminar(self):
+        """Falha de um processo que fechou o pipe sem avisar (morto pelo sistema)"""
+        self.processo.join(1)
+        codigo = self.processo.exitcode
+        # SIGKILL costuma ser o OOM killer; no Windows, falta de memória encerra sem sinal
+        if codigo is not None and codigo == -9:
+            return FalhaExtracao(MEMORIA, "processo encerrado pelo sistema")
+        return FalhaExtracao(LEITURA, f"processo de extração terminou com código {codigo}")
+
+    def encerrar(self):
+        if self.processo.is_alive():
+            self.processo.kill()
+        self.processo.join()
+        self.conn.close()
+
+
+def mensagens(processos, prazo):
+    """Gera (processo, mensagem) dos `processos` até que todos terminem
+
+    `processos` pode receber novos processos durante a iteração. Levanta
+    FalhaExtracao se o prazo (time.monotonic()) passar, se um processo
+    exceder o limite de memória, morrer sem avisar ou enviar uma falha. Quem
+    chama é responsável por encerrar os processos.
+    """
+    ativos = {}
+    while True:
+        for processo in processos:
+            if processo.conn not in ativos and not processo.conn.closed:
+                ativos[processo.conn] = processo
+        if not ativos:
+            return
+
+        restante = prazo - time.monotonic()
+        if restante <= 0:
+            raise FalhaExtracao(TEMPO_ESGOTADO)
+        prontos = wait(list(ativos), timeout=min(restante, INTERVALO_MEMORIA))
+        for processo in ativos.values():
+            if processo.memoria_excedida():
+                raise FalhaExtracao(MEMORIA, f"mais de {processo.limite_memoria_mb} MB")
+
+        for conn in prontos:
+            processo = ativos[conn]
+            try:
+                mensagem = conn.recv()
+            except EOFError:
+                raise processo.falha_ao_terminar()
+            if mensagem[0] == 'fim':
+                del ativos[conn]
+                conn.close()
+            elif mensagem[0] == 'falha':
+                raise FalhaExtracao(mensagem[1], mensagem[2])
+            else:
+                yield processo, mensagem
@@ -0,0 +1,147 @@
+# planilhas.py
+"""Importação e exportação do catálogo de produtos em CSV e XLSX (via pandas)"""
+import os
+import time
+import unicodedata
+
+from analyzer import DocumentAnalyzer, KeywordMatcher
+from database import Database
+
+
+COLUNAS = ['nome', 'descricao', 'palavras_positivas', 'palavras_negativas']
+EXTENSOES = ('.csv', '.xlsx')
+
+
+def _nome_coluna(coluna):
+    """'Palavras Positivas' -> 'palavras_positivas', 'Descrição' -> 'descricao'"""
+    sem_acentos = unicodedata.normalize('NFKD', str(coluna)).encode('ascii', 'ignore').decode()
+    return '_'.join(sem_acentos.lower().split())
+
+
+def _limpar_palavras(texto):
+    return ', '.join(p.strip() for p in texto.split(',') if p.strip())
+
+
+def ler_planilha(caminho):
+    """Lê o CSV/XLSX e devolve a lista de dicts com as colunas de COLUNAS"""
+    # pandas só é carregado quando uma planilha é de fato usada
+    import pandas as pd
+
+    ext = os.path.splitext(caminho)[1].lower()
+    if ext == '.xlsx':
+        tabela = pd.read_excel(caminho, dtype=str, keep_default_na=False)
+    elif ext == '.csv':
+        try:
+            # sep=None detecta ',' ou ';' (padrão do Excel em português)
+            tabela = pd.read_csv(caminho, dtype=str, keep_default_na=False, sep=None,
+                                 engine='python', encoding='utf-8-sig')
+        except UnicodeDecodeError:
+            tabela = pd.read_csv(caminho, dtype=str, keep_default_na=False, sep=None,
+                                 engine='python', encoding='cp1252')
+    else:
+        raise ValueError(f"Formato não suportado: {ext} (use {', '.join(EXTENSOES)})")
+
+    tabela.columns = [_nome_coluna(c) for c in tabela.columns]
+    if 'nome' not in tabela.columns:
+        raise ValueError("A planilha precisa de uma coluna 'nome'")
+    for coluna in COLUNAS:
+        if coluna not in tabela.columns:
+            tabela[coluna] = ''
+    return tabela[COLUNAS].to_dict('records')
+
+
+def validar(linhas):
+    """Separa as linhas válidas e aponta erros, avisos e nomes repetidos
+
+    Retorna (produtos, erros, avisos, duplicados): `produtos` com as tuplas
+    (nome, descricao, positivas, negativas) prontas para importar (para nomes
+    repetidos vale a última linha); `erros` e `avisos` como (linha, mensagem),
+    numerando as linhas como na planilha (cabeçalho = 1); `duplicados` como
+    {nome: [linhas]}.
+    """
+    por_nome = {}
+    linhas_por_nome = {}
+    erros, avisos = [], []
+    for numero, linha in enumerate(linhas, 2):
+        nome = ' '.join(str(linha['nome']).split())
+        if not nome:
+            erros.append((numero, "nome vazio"))
+            continue
+
+        positivas = _limpar_palavras(str(linha['palavras_positivas']))
+        negativas = _limpar_palavras(str(linha['palavras_negativas']))
+        if not positivas:
+            avisos.append((numero, f"'{nome}' sem palavras positivas (índice sempre 0)"))
+        for palavra in DocumentAnalyzer.split_palavras(positivas + ',' + negativas):
+            if not any(KeywordMatcher.TERMO_VALIDO.fullmatch(t) for t in KeywordMatcher.keyword_terms(palavra)):
+                avisos.append((numero, f"'{nome}': a palavra '{palavra}' nunca será encontrada "
+                                       f"(use só letras, números e espaços)"))
+
+        chave = Database.chave_nome(nome)
+        # Célula vazia: sem descrição (NULL)
+        por_nome[chave] = (nome, str(linha['descricao']).strip() or None, positivas, negativas)
+        linhas_por_nome.setdefault(chave, []).append(numero)
+
+    duplicados = {por_nome[chave][0]: numeros
+                  for chave, numeros in linhas_por_nome.items() if len(numeros) > 1}
+    return list(por_nome.values()), erros, avisos, duplicados
+
+
+def importar(db, caminho, dry_run=False):
+    """Importa a planilha no banco (upsert pelo nome) e devolve o relatório"""
+    inicio = time.perf_counter()
+    produtos, erros, avisos, duplicados = validar(ler_planilha(caminho))
+    relatorio = db.importar_produtos(produtos, dry_run)
+    relatorio.update({
+        'arquivo': caminho,
+        'dry_run': dry_run,
+        'erros': erros,
+        'avisos': avisos,
+        'duplicados': duplicados,
+        'segundos': time.perf_counter() - inicio,
+    })
+    return relatorio
+
+
+def exportar(db, caminho):
+    """Grava o catálogo em CSV (separado por ';', abre direto no Excel) ou XLSX"""
+    import pandas as pd
+
+    colunas = ['id'] + COLUNAS + ['data_criacao']
+    tabela = pd.DataFrame(db.get_produtos(), columns=colunas)
+    ext = os.path.splitext(caminho)[1].lower()
+    if ext == '.xlsx':
+        tabela.to_excel(caminho, index=False)
+    elif ext == '.csv':
+        tabela.to_csv(caminho, index=False, sep=';', encoding='utf-8-sig')
+    else:
+        raise ValueError(f"Formato não suportado: {ext} (use {', '.join(EXTENSOES)})")
+    return len(tabela)
+
+
+def formatar_relatorio(relatorio, max_itens=20):
+    """Texto do relatório de importação (linha de comando e interface)"""
+    modo = "Simulação (nada foi gravado)" if relatorio['dry_run'] else "Importação concluída"
+    linhas = [
+        f"{modo}: {relatorio['arquivo']}",
+        f"Inseridos: {relatorio['inseridos']}, atualizados: {relatorio['atualizados']}, "
+        f"inalterados: {relatorio['inalterados']} ({relatorio['segundos']:.2f} s)",
+    ]
+    if relatorio['duplicados']:
+        linhas.append(f"Nomes repetidos na planilha (vale a última linha): {len(relatorio['duplicados'])}")
+        for nome, numeros in list(relatorio['duplicados'].items())[:max_itens]:
+            mais = f" (+{len(numeros) - 10})" if len(numeros) > 10 else ""
+            linhas.append(f"  {nome}: linhas {', '.join(map(str, numeros[:10]))}{mais}")
+        if len(relatorio['duplicados']) > max_itens:
+            linhas.append(f"  ... e mais {len(relatorio['duplicados']) - max_itens}")
+    if relatorio['duplicados_banco']:
+        linhas.append(f"Nomes repetidos no banco (atualizado o mais antigo): "
+                      f"{len(relatorio['duplicados_banco'])}")
+        linhas.extend(f"  {nome}" for nome in relatorio['duplicados_banco'][:max_itens])
+    for titulo, itens in (("Erros (linhas ignoradas)", relatorio['erros']), ("Avisos", relatorio['avisos'])):
+        if itens:
+            linhas.append(f"{titulo}: {len(itens)}")
+            linhas.extend(f"  linha {numero}: {mensagem}" for numero, mensagem in itens[:max_itens])
+            if len(itens) > max_itens:
+                linhas.append(f"  ... e mais {len(itens) - max_itens}")
+    return "\n".join(linhas)
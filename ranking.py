@@ -0,0 +1,164 @@
+# ranking.py
+"""Índices de todos os produtos em todos os editais indexados, com operações de matrizes
+
+Em vez de chamar calculate_index por produto e por documento, as contagens de
+termos gravadas em `analise_termos` formam uma matriz documentos × termos. Dela
+sai a matriz documentos × palavras-chave (uma frase vale o maior entre a
+variação exata e a sem espaços), que multiplicada pelas matrizes de pesos
+palavras-chave × produtos (positivas e negativas) dá as contagens de todos os
+pares de uma vez.
+"""
+import numpy as np
+
+try:
+    import scipy.sparse as sparse
+except ImportError:
+    # SciPy é opcional: sem ele a multiplicação usa somas por segmento do NumPy
+    sparse = None
+
+from analyzer import CompiledCatalog, KeywordMatcher
+
+
+class MatrizIndices:
+    """Pesos do catálogo compilados em matrizes, para calcular lotes de documentos"""
+
+    # Documentos por lote (a matriz documentos × termos de um lote é densa)
+    LOTE_DOCUMENTOS = 64
+
+    def __init__(self, catalogo):
+        if not isinstance(catalogo, CompiledCatalog):
+            catalogo = CompiledCatalog(catalogo)
+        self.produtos = list(catalogo)
+
+        # Coluna 0: sempre zero (termos que nunca casam); coluna 1: sempre um
+        # (nome vazio, que casa com qualquer documento com texto)
+        self.termos = {}
+        self._zero, self._um = 0, 1
+        palavras = {}
+        variante_exata, variante_sem_espacos = [], []
+
+        def coluna_termo(termo):
+            if not KeywordMatcher.TERMO_VALIDO.fullmatch(termo):
+                return self._zero
+            return self.termos.setdefault(termo, len(self.termos) + 2)
+
+        def coluna_palavra(palavra):
+            if palavra not in palavras:
+                variantes = [coluna_termo(t) for t in KeywordMatcher.keyword_terms(palavra)]
+                variantes = (variantes + [self._zero, self._zero])[:2]
+                palavras[palavra] = len(palavras)
+                variante_exata.append(variantes[0])
+                variante_sem_espacos.append(variantes[1])
+            return palavras[palavra]
+
+        # Palavras repetidas na lista contam mais de uma vez, como na soma de
+        # calculate_index; uma palavra nas duas listas conta nas duas
+        positivas, negativas = {}, {}
+        nomes = []
+        for p, produto in enumerate(self.produtos):
+            nomes.append(coluna_termo(produto.nome_normalized) if produto.nome_normalized else self._um)
+            for lista, pesos in ((produto.pos_list, positivas), (produto.neg_list, negativas)):
+                for palavra in lista:
+                    chave = (coluna_palavra(palavra), p)
+                    pesos[chave] = pesos.get(chave, 0) + 1
+
+        self.colunas_nome = np.array(nomes, dtype=np.intp)
+        self.variante_exata = np.array(variante_exata, dtype=np.intp)
+        self.variante_sem_espacos = np.array(variante_sem_espacos, dtype=np.intp)
+        self.total_colunas = len(self.termos) + 2
+        self.positivas = self._matriz_pesos(positivas, len(palavras))
+        self.negativas = self._matriz_pesos(negativas, len(palavras))
+
+    def _matriz_pesos(self, pesos, total_palavras):
+        """Matriz esparsa palavras-chave × produtos (ou sua forma em segmentos, sem SciPy)"""
+        entradas = sorted(((k, p, w) for (k, p), w in pesos.items()), key=lambda e: (e[1], e[0]))
+        palavras = np.array([e[0] for e in entradas], dtype=np.intp)
+        produtos = np.array([e[1] for e in entradas], dtype=np.intp)
+        pesos = np.array([e[2] for e in entradas], dtype=np.int64)
+        if sparse is not None:
+            return sparse.csc_matrix((pesos, (palavras, produtos)),
+                                     shape=(total_palavras, len(self.produtos)))
+        # Produtos com pelo menos uma palavra e o início do seu segmento
+        com_palavras, inicios = np.unique(produtos, return_index=True)
+        return palavras, pesos, com_palavras, inicios
+
+    def _multiplicar(self, contagens_palavras, matriz):
+        """contagens (documentos × palavras) @ pesos (palavras × produtos)"""
+        if sparse is not None:
+            return np.asarray(matriz.T.dot(contagens_palavras.T).T)
+        palavras, pesos, com_palavras, inicios = matriz
+        resultado = np.zeros((contagens_palavras.shape[0], len(self.produtos)), dtype=np.int64)
+        if len(palavras):
+            parciais = contagens_palavras[:, palavras] * pesos
+            resultado[:, com_palavras] = np.add.reduceat(parciais, inicios, axis=1)
+        return resultado
+
+    def calcular(self, documentos, contagens):
+        """Gera (documento, produto, índice, positivas, negativas) dos produtos encontrados
+
+        `documentos` é a lista de ids; `contagens`, as triplas (id, termo,
+        contagem) de Database.get_contagens_termos. `documento` e `produto`
+        são posições em `documentos` e em `self.produtos`.
+        """
+        linha_documento = {documento: i for i, documento in enumerate(documentos)}
+        triplas = [(linha_documento[d], self.termos[t], c) for d, t, c in contagens
+                   if d in linha_documento and t in self.termos]
+        triplas.sort()
+        linhas = np.array([t[0] for t in triplas], dtype=np.intp)
+        colunas = np.array([t[1] for t in triplas], dtype=np.intp)
+        valores = np.array([t[2] for t in triplas], dtype=np.int64)
+
+        for inicio in range(0, len(documentos), self.LOTE_DOCUMENTOS):
+            fim = min(inicio + self.LOTE_DOCUMENTOS, len(documentos))
+            a, b = np.searchsorted(linhas, [inicio, fim])
+            termos_lote = np.zeros((fim - inicio, self.total_colunas), dtype=np.int64)
+            termos_lote[linhas[a:b] - inicio, colunas[a:b]] = valores[a:b]
+            termos_lote[:, self._um] = 1
+
+            palavras_lote = np.maximum(termos_lote[:, self.variante_exata],
+                                       termos_lote[:, self.variante_sem_espacos])
+            positivas = self._multiplicar(palavras_lote, self.positivas)
+            negativas = self._multiplicar(palavras_lote, self.negativas)
+
+            docs, prods = np.nonzero(termos_lote[:, self.colunas_nome] > 0)
+            pos = positivas[docs, prods]
+            neg = negativas[docs, prods]
+            total = pos + neg
+            with np.errstate(divide='ignore', invalid='ignore'):
+                brutos = np.where(total > 0, (pos - neg) / total * 100, 0.0)
+            brutos = np.maximum(brutos, 0.0)
+
+            # round() do Python (e não np.round) para arredondar igual a calculate_index
+            for doc, prod, bruto, p, n in zip((docs + inicio).tolist(), prods.tolist(),
+                                              brutos.tolist(), pos.tolist(), neg.tolist()):
+                yield doc, prod, round(bruto, 2), p, n
+
+
+def melhores_editais(db, limite=10, produto_ids=None):
+    """Melhores editais indexados de cada produto, pelo índice (maior primeiro)
+
+    Retorna linhas (produto_id, produto_nome, analise_id, arquivo_nome,
+    data_analise, índice, positivas, negativas), agrupadas por produto na
+    ordem do catálogo.
+    """
+    catalogo = db.get_catalogo()
+    if produto_ids is not None:
+        catalogo = CompiledCatalog([catalogo.produtos[i].produto for i in produto_ids
+                                    if i in catalogo.produtos])
+    matriz = MatrizIndices(catalogo)
+    documentos = db.get_documentos_indexados()
+    contagens = db.get_contagens_termos(list(matriz.termos))
+
+    por_produto = {}
+    for doc, prod, indice, pos, neg in matriz.calcular([d[0] for d in documentos], contagens):
+        por_produto.setdefault(prod, []).append((indice, pos, doc, neg))
+
+    linhas = []
+    for prod, acertos in sorted(por_produto.items()):
+        produto = matriz.produtos[prod]
+        # Empates: mais palavras positivas, depois a análise mais recente
+        acertos.sort(key=lambda a: (a[0], a[1], a[2]), reverse=True)
+        for indice, pos, doc, neg in acertos[:limite]:
+            analise_id, arquivo_nome, data = documentos[doc]
+            linhas.append((produto.id, produto.nome, analise_id, arquivo_nome, data, indice, pos, neg))
+    return linhas
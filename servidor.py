@@ -0,0 +1,285 @@
+# servidor.py
+"""Serviço HTTP de análise: recebe editais, enfileira e analisa em um pool de processos
+
+Só a biblioteca padrão: ThreadingHTTPServer atende as requisições (uma thread
+por conexão) e nunca espera uma análise terminar. Os envios entram em uma fila
+limitada; cada thread despachante leva um trabalho por vez ao pool de
+processos, que compila o catálogo uma única vez por processo e é recriado
+quando o catálogo muda no banco. Com a fila
+cheia o envio é recusado com 503 e Retry-After.
+
+Rotas:
+    POST /analises?nome=edital.pdf   corpo = conteúdo do arquivo -> 202 {id, status}
+    GET  /analises                   trabalhos recentes (sem os resultados)
+    GET  /analises/<id>              situação e, quando concluída, os resultados
+    GET  /status                     fila, processos e contadores
+"""
+import hmac
+import itertools
+import json
+import os
+import queue
+import shutil
+import signal
+import sys
+import tempfile
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlparse
+
+import cli
+from database import Database
+from similaridade import buscar_quase_duplicata
+
+
+class ServicoAnalise:
+    """Fila de trabalhos, pool de processos e gravação dos resultados no banco"""
+
+    # Trabalhos concluídos mantidos em memória para consulta
+    MAX_CONCLUIDOS = 1000
+
+    def __init__(self, db_path='produtos.db', processos=None, max_fila=20, max_upload_mb=100):
+        self.db = Database(db_path)
+        self.processos = processos or os.cpu_count() or 1
+        self.max_upload = max_upload_mb * 1024 * 1024
+        self.fila = queue.Queue(maxsize=max_fila)
+        self.trabalhos = OrderedDict()
+        self.lock = threading.Lock()
+        # A busca de quase duplicatas e a gravação de uma análise não se intercalam com outra
+        self.lock_gravacao = threading.Lock()
+        self.contadores = {'recebidos': 0, 'recusados': 0, 'concluidos': 0, 'erros': 0}
+        self._ids = itertools.count(1)
+        self.pasta = tempfile.mkdtemp(prefix='analisa_licitacoes_')
+
+        # Cada envio confere a versão do catálogo; se mudou, o pool é recriado
+        self.pool = cli.PoolCatalogo(self.db, self.processos)
+        self.despachantes = [threading.Thread(target=self._despachar, daemon=True)
+                             for _ in range(self.processos)]
+        for despachante in self.despachantes:
+            despachante.start()
+
+    def enviar(self, nome, conteudo):
+        """Grava o arquivo e o coloca na fila; retorna o trabalho ou None se a fila estiver cheia"""
+        trabalho_id = next(self._ids)
+        caminho = os.path.join(self.pasta, f"{trabalho_id}_{nome}")
+        with open(caminho, 'wb') as arquivo:
+            arquivo.write(conteudo)
+
+        trabalho = {
+            'id': trabalho_id,
+            'arquivo': nome,
+            'status': 'na_fila',
+            'enviado_em': datetime.now().isoformat(timespec='seconds'),
+            'caminho': caminho,
+        }
+        with self.lock:
+            try:
+                self.fila.put_nowait(trabalho)
+            except queue.Full:
+                os.remove(caminho)
+                return None
+            self.trabalhos[trabalho_id] = trabalho
+            self.contadores['recebidos'] += 1
+        return trabalho
+
+    def _despachar(self):
+        """Leva os trabalhos da fila ao pool, um por vez (uma thread por processo)"""
+        while True:
+            trabalho = self.fila.get()
+            if trabalho is None:
+                return
+            with self.lock:
+                trabalho['status'] = 'processando'
+                trabalho['iniciado_em'] = datetime.now().isoformat(timespec='seconds')
+            try:
+                self._analisar(trabalho)
+            except Exception as e:
+                self._concluir(trabalho, erro=f"Erro ao analisar documento: {e}")
+            finally:
+                if os.path.exists(trabalho['caminho']):
+                    os.remove(trabalho['caminho'])
+
+    def _analisar(self, trabalho):
+        # Fluxo ou extração completa é decidido no processo do pool (cli.analisar_arquivo)
+        futuro, _ = self.pool.enviar(cli.analisar_arquivo, trabalho['caminho'], None)
+        analise = futuro.result()
+        if analise['erro']:
+            self._concluir(trabalho, erro=analise['erro'])
+            return
+
+        with self.lock_gravacao:
+            duplicata = buscar_quase_duplicata(self.db, analise['impressao'])
+            analise_id = self.db.salvar_analise(trabalho['arquivo'], analise['resultados'],
+                                                analise['texto_normalizado'], analise['matches'],
+                                                analise['metricas'], analise['impressao'],
+                                                analise['arquivo_hash'])
+        falha = analise['metricas'].get('falha_extracao')
+        self._concluir(trabalho, analise_id=analise_id, paginas=analise['paginas'],
+                       segundos=round(analise['segundos'], 3), duplicata=duplicata,
+                       falha_extracao=str(falha) if falha else None,
+                       memorizada=analise.get('memorizada', False),
+                       resultados=analise['resultados'])
+
+    def _concluir(self, trabalho, erro=None, **dados):
+        with self.lock:
+            trabalho.update(dados)
+            trabalho['status'] = 'erro' if erro else 'concluida'
+            trabalho['erro'] = erro
+            trabalho['concluido_em'] = datetime.now().isoformat(timespec='seconds')
+            self.contadores['erros' if erro else 'concluidos'] += 1
+            # Descarta os trabalhos terminados mais antigos além do limite
+            terminados = [t for t in self.trabalhos.values() if t['status'] in ('concluida', 'erro')]
+            for antigo in terminados[:max(0, len(terminados) - self.MAX_CONCLUIDOS)]:
+                del self.trabalhos[antigo['id']]
+
+    def consultar(self, trabalho_id, resultados=True):
+        with self.lock:
+            trabalho = self.trabalhos.get(trabalho_id)
+            if trabalho is None:
+                return None
+            visivel = {chave: valor for chave, valor in trabalho.items() if chave != 'caminho'}
+            if trabalho['status'] == 'na_fila':
+                espera = [t['id'] for t in self.trabalhos.values() if t['status'] == 'na_fila']
+                visivel['posicao_fila'] = espera.index(trabalho_id) + 1
+        if not resultados:
+            visivel.pop('resultados', None)
+        return visivel
+
+    def listar(self):
+        with self.lock:
+            ids = list(self.trabalhos)
+        return [trabalho for trabalho in (self.consultar(i, resultados=False) for i in ids) if trabalho]
+
+    def situacao(self):
+        with self.lock:
+            processando = sum(1 for t in self.trabalhos.values() if t['status'] == 'processando')
+            return dict(self.contadores, na_fila=self.fila.qsize(), capacidade_fila=self.fila.maxsize,
+                        processando=processando, processos=self.processos,
+                        produtos_catalogo=self.pool.produtos, catalogo_versao=self.pool.versao)
+
+    def encerrar(self):
+        for _ in self.despachantes:
+            # Sem bloquear: com a fila cheia, as threads (daemon) terminam com o processo
+            try:
+                self.fila.put_nowait(None)
+            except queue.Full:
+                break
+        self.pool.encerrar()
+        shutil.rmtree(self.pasta, ignore_errors=True)
+
+
+class AnaliseHandler(BaseHTTPRequestHandler):
+    """Rotas HTTP do serviço (o ServicoAnalise fica em self.server.servico)"""
+
+    server_version = "AnalisaLicitacoes/1.0"
+
+    def _responder(self, status, dados, cabecalhos=None):
+        corpo = json.dumps(dados, ensure_ascii=False, default=str).encode('utf-8')
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json; charset=utf-8')
+        self.send_header('Content-Length', str(len(corpo)))
+        for nome, valor in (cabecalhos or {}).items():
+            self.send_header(nome, valor)
+        self.end_headers()
+        self.wfile.write(corpo)
+
+    def _autorizado(self):
+        token = self.server.token
+        if not token:
+            return True
+        enviado = self.headers.get('Authorization', '')
+        if hmac.compare_digest(enviado.encode('utf-8'), f"Bearer {token}".encode('utf-8')):
+            return True
+        self._responder(401, {'erro': "token inválido ou ausente"})
+        return False
+
+    def do_GET(self):
+        if not self._autorizado():
+            return
+        servico = self.server.servico
+        partes = urlparse(self.path).path.strip('/').split('/')
+        if partes == ['status']:
+            self._responder(200, servico.situacao())
+        elif partes == ['analises']:
+            self._responder(200, servico.listar())
+        elif len(partes) == 2 and partes[0] == 'analises' and partes[1].isdigit():
+            trabalho = servico.consultar(int(partes[1]))
+            if trabalho is None:
+                self._responder(404, {'erro': "análise não encontrada"})
+            else:
+                self._responder(200, trabalho)
+        else:
+            self._responder(404, {'erro': "rota não encontrada"})
+
+    def do_POST(self):
+        if not self._autorizado():
+            return
+        servico = self.server.servico
+        url = urlparse(self.path)
+        if url.path.rstrip('/') != '/analises':
+            self._responder(404, {'erro': "rota não encontrada"})
+            return
+
+        nome = os.path.basename(parse_qs(url.query).get('nome', [''])[0] or
+                                self.headers.get('X-Nome-Arquivo', ''))
+        if os.path.splitext(nome)[1].lower() not in cli.EXTENSOES:
+            self._responder(415, {'erro': f"informe ?nome= com uma destas extensões: {', '.join(cli.EXTENSOES)}"})
+            return
+        try:
+            tamanho = int(self.headers.get('Content-Length', ''))
+        except ValueError:
+            self._responder(411, {'erro': "Content-Length obrigatório"})
+            return
+        if tamanho > servico.max_upload:
+            self._responder(413, {'erro': f"arquivo maior que {servico.max_upload // (1024 * 1024)} MB"})
+            self.close_connection = True
+            return
+        # Fila cheia: recusa antes de receber o corpo
+        if servico.fila.full():
+            self._recusar(servico)
+            return
+
+        trabalho = servico.enviar(nome, self.rfile.read(tamanho))
+        if trabalho is None:
+            self._recusar(servico)
+            return
+        self._responder(202, servico.consultar(trabalho['id']),
+                        {'Location': f"/analises/{trabalho['id']}"})
+
+    def _recusar(self, servico):
+        with servico.lock:
+            servico.contadores['recusados'] += 1
+        self.close_connection = True
+        self._responder(503, {'erro': "fila cheia, tente novamente", **servico.situacao()},
+                        {'Retry-After': '30'})
+
+    def log_message(self, formato, *args):
+        print(f"{self.address_string()} - {formato % args}", file=sys.stderr)
+
+
+def servir(host='127.0.0.1', porta=8765, db_path='produtos.db', processos=None, max_fila=20,
+           max_upload_mb=100, token=None):
+    servico = ServicoAnalise(db_path, processos, max_fila, max_upload_mb)
+    if not servico.pool.produtos:
+        servico.encerrar()
+        print("Cadastre produtos primeiro!")
+        return 1
+
+    servidor = ThreadingHTTPServer((host, porta), AnaliseHandler)
+    servidor.daemon_threads = True
+    servidor.servico = servico
+    servidor.token = token
+    # SIGTERM (ex.: serviço do sistema) encerra como o Ctrl+C
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    print(f"Servindo em http://{host}:{servidor.server_port} com {servico.processos} processo(s), "
+          f"{servico.pool.produtos} produto(s) no catálogo (Ctrl+C para encerrar)")
+    try:
+        servidor.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        servidor.server_close()
+        servico.encerrar()
+    return 0
@@ -0,0 +1,188 @@
+# similaridade.py
+"""Impressões digitais de documentos para detectar editais quase duplicados
+
+A impressão tem duas partes: a assinatura MinHash do texto normalizado
+(sequências de TAMANHO_SHINGLE palavras), que estima a semelhança entre dois
+documentos, e o hash de cada página, que aponta quais páginas mudaram entre
+uma versão e outra (ex.: retificações). Os candidatos são encontrados pelas
+bandas da assinatura (LSH), sem comparar com todo o histórico.
+
+O NumPy só é importado quando a primeira impressão é montada: importar este
+módulo (como faz a interface ao abrir) não o carrega.
+"""
+import difflib
+import hashlib
+import zlib
+
+
+# Primo de Mersenne 2^31 - 1: (a * x + b) cabe em 64 bits para x de 32 bits
+PRIMO = (1 << 31) - 1
+
+
+# Coeficientes (a, b) das permutações, calculados no primeiro uso
+_coeficientes = None
+
+
+def _permutacoes(quantidade, seed=20250101):
+    """Coeficientes (a, b) das funções de hash, fixos para as assinaturas gravadas valerem sempre"""
+    import numpy as np
+    rnd = np.random.RandomState(seed)
+    return (rnd.randint(1, PRIMO, quantidade).astype(np.uint64),
+            rnd.randint(0, PRIMO, quantidade).astype(np.uint64))
+
+
+def _minhash(palavras, k, minimos, lote):
+    """Atualiza `minimos` com os shingles de k palavras (hashes crc32) de `palavras`"""
+    global _coeficientes
+    import numpy as np
+    if _coeficientes is None:
+        _coeficientes = _permutacoes(ImpressaoDigital.PERMUTACOES)
+    # Hash de cada sequência de k palavras (aritmética módulo 2^64, reduzida a 32 bits)
+    total = len(palavras) - k + 1
+    shingles = np.zeros(total, dtype=np.uint64)
+    for j in range(k):
+        shingles = shingles * np.uint64(1000003) + palavras[j:j + total]
+    shingles &= np.uint64(0xFFFFFFFF)
+    a, b = _coeficientes
+    for inicio in range(0, total, lote):
+        parte = shingles[inicio:inicio + lote]
+        valores = (a[:, None] * parte[None, :] + b[:, None]) % np.uint64(PRIMO)
+        np.minimum(minimos, valores.min(axis=1), out=minimos)
+
+
+class ImpressaoDigital:
+    """Assinatura MinHash e hashes das páginas, montados página a página"""
+
+    PERMUTACOES = 64
+    # 16 bandas de 4 linhas: documentos com semelhança acima de ~0,7 quase
+    # sempre coincidem em pelo menos uma banda
+    BANDAS = 16
+    TAMANHO_SHINGLE = 5
+    # Shingles processados por vez (limita a matriz permutações × shingles)
+    LOTE_SHINGLES = 50000
+
+    def __init__(self):
+        import numpy as np
+        self.paginas = []
+        self._minimos = np.full(self.PERMUTACOES, PRIMO, dtype=np.uint64)
+        # Últimas palavras da página anterior: shingles atravessam as páginas
+        self._anteriores = []
+        self._tem_shingle = False
+        # Preenchido por buscar_quase_duplicata
+        self.duplicata = None
+
+    @classmethod
+    def das_paginas(cls, paginas):
+        """Impressão de uma lista de páginas de texto bruto"""
+        from analyzer import DocumentAnalyzer
+        impressao = cls()
+        for pagina in paginas:
+            impressao.adicionar_pagina(DocumentAnalyzer.normalize_text(pagina))
+        return impressao
+
+    def adicionar_pagina(self, texto_normalizado):
+        import numpy as np
+        self.paginas.append(hashlib.blake2b(texto_normalizado.encode('utf-8'), digest_size=8).hexdigest())
+        palavras = self._anteriores + [zlib.crc32(p.encode('utf-8'))
+                                       for p in texto_normalizado.split(' ') if p]
+        k = self.TAMANHO_SHINGLE
+        if len(palavras) >= k:
+            self._tem_shingle = True
+            _minhash(np.array(palavras, dtype=np.uint64), k, self._minimos, self.LOTE_SHINGLES)
+        self._anteriores = palavras[-(k - 1):]
+
+    @property
+    def assinatura(self):
+        """Assinatura MinHash (uint32 por permutação)"""
+        import numpy as np
+        if self._tem_shingle or not self._anteriores:
+            return self._minimos.astype(np.uint32)
+        # Texto com menos de TAMANHO_SHINGLE palavras: um único shingle com todas
+        minimos = self._minimos.copy()
+        _minhash(np.array(self._anteriores, dtype=np.uint64), len(self._anteriores), minimos,
+                 self.LOTE_SHINGLES)
+        return minimos.astype(np.uint32)
+
+    def assinatura_bytes(self):
+        return self.assinatura.tobytes()
+
+    def bandas(self):
+        """Pares (banda, valor) usados no índice LSH do banco"""
+        linhas = self.PERMUTACOES // self.BANDAS
+        assinatura = self.assinatura
+        return [(banda, zlib.crc32(assinatura[banda * linhas:(banda + 1) * linhas].tobytes()))
+                for banda in range(self.BANDAS)]
+
+    def similaridade(self, assinatura_bytes):
+        """Semelhança estimada (0 a 1) com outra assinatura gravada"""
+        import numpy as np
+        outra = np.frombuffer(assinatura_bytes, dtype=np.uint32)
+        return float(np.mean(self.assinatura == outra))
+
+    def paginas_alteradas(self, paginas_anteriores):
+        """Compara com os hashes das páginas de outra versão do documento
+
+        Retorna (alteradas, removidas): os números (a partir de 1) das páginas
+        deste documento que são novas ou mudaram, e quantas páginas da versão
+        anterior deixaram de existir.
+        """
+        alteradas, removidas = [], 0
+        comparacao = difflib.SequenceMatcher(None, paginas_anteriores, self.paginas, autojunk=False)
+        for operacao, i1, i2, j1, j2 in comparacao.get_opcodes():
+            if operacao in ('replace', 'insert'):
+                alteradas.extend(range(j1 + 1, j2 + 1))
+            if operacao in ('replace', 'delete'):
+                removidas += max(0, (i2 - i1) - (j2 - j1))
+        return alteradas, removidas
+
+
+def buscar_quase_duplicata(db, impressao, limiar=None):
+    """Análise anterior mais parecida com `impressao`, se a semelhança passar do limiar
+
+    Retorna um dict (analise_id, arquivo_nome, data_analise, similaridade,
+    identico, paginas_alteradas, paginas_removidas) ou None; o resultado
+    também fica em `impressao.duplicata`, para ser gravado com a análise.
+    Sem `impressao` (análise memorizada) retorna None.
+    """
+    if impressao is None:
+        return None
+    if limiar is None:
+        limiar = float(db.get_config('limiar_quase_duplicata', db.LIMIAR_QUASE_DUPLICATA))
+    melhor = None
+    for analise_id, arquivo_nome, data, assinatura, paginas in db.get_impressoes_candidatas(impressao.bandas()):
+        semelhanca = impressao.similaridade(assinatura)
+        # Empate: vale a análise mais recente
+        if semelhanca >= limiar and (melhor is None or semelhanca >= melhor[0]):
+            melhor = (semelhanca, analise_id, arquivo_nome, data, paginas)
+
+    impressao.duplicata = None
+    if melhor is not None:
+        semelhanca, analise_id, arquivo_nome, data, paginas = melhor
+        alteradas, removidas = impressao.paginas_alteradas(paginas)
+        impressao.duplicata = {
+            'analise_id': analise_id,
+            'arquivo_nome': arquivo_nome,
+            'data_analise': data,
+            'similaridade': round(semelhanca, 4),
+            'identico': paginas == impressao.paginas,
+            'paginas_alteradas': alteradas,
+            'paginas_removidas': removidas,
+        }
+    return impressao.duplicata
+
+
+def descrever(duplicata, max_paginas=20):
+    """Texto curto sobre a quase duplicata (linha de comando e interface)"""
+    if duplicata['identico']:
+        return f"mesmo texto de {duplicata['arquivo_nome']} (analisado em {duplicata['data_analise']})"
+    texto = (f"quase duplicata de {duplicata['arquivo_nome']} (analisado em {duplicata['data_analise']}, "
+             f"{duplicata['similaridade'] * 100:.0f}% semelhante)")
+    alteradas = duplicata['paginas_alteradas']
+    if alteradas:
+        lista = ', '.join(map(str, alteradas[:max_paginas]))
+        if len(alteradas) > max_paginas:
+            lista += f" e mais {len(alteradas) - max_paginas}"
+        texto += f"; páginas alteradas: {lista}"
+    if duplicata['paginas_removidas']:
+        texto += f"; {duplicata['paginas_removidas']} página(s) removida(s)"
+    return texto
@@ -0,0 +1,107 @@
+# tests/test_busca.py
+"""A busca em uma passada (KeywordMatcher) dá os mesmos resultados da busca original por regex"""
+import re
+
+import pytest
+
+from analyzer import DocumentAnalyzer
+
+
+def _normalizar_original(text):
+    text = text.lower()
+    text = re.sub(r'[^\w\sáàâãéèêíìîóòôõúùûçÁÀÂÃÉÈÊÍÌÎÓÒÔÕÚÙÛÇ]', ' ', text)
+    text = re.sub(r'\s+', ' ', text)
+    return text.strip()
+
+
+def _padroes_original(palavra):
+    if ' ' not in palavra:
+        return [r'\b' + re.escape(palavra) + r'\b']
+    return [r'\b' + re.escape(palavra) + r'\b',
+            r'\b' + re.escape(palavra.replace(' ', '')) + r'\b',
+            r'\b' + re.escape(palavra.replace(' ', r'\s+')) + r'\b']
+
+
+def _contar_original(text, palavras):
+    return sum(max(len(re.findall(p, text)) for p in _padroes_original(palavra)) for palavra in palavras)
+
+
+def _buscar_original(text, produtos):
+    """find_products_in_text como era antes do KeywordMatcher (um re.findall por palavra)"""
+    resultados = []
+    text_normalized = _normalizar_original(text)
+    for produto_id, nome, _, positivas, negativas, _ in produtos:
+        nome_normalized = _normalizar_original(nome)
+        if not re.search(r'\b' + re.escape(nome_normalized) + r'\b', text_normalized):
+            continue
+        pos_list = [p.strip().lower() for p in positivas.split(',') if p.strip()]
+        neg_list = [p.strip().lower() for p in negativas.split(',') if p.strip()]
+        pos_count = _contar_original(text_normalized, pos_list)
+        neg_count = _contar_original(text_normalized, neg_list)
+        total = pos_count + neg_count
+        indice = max(round((pos_count - neg_count) / total * 100, 2), 0) if total else 0
+        encontradas = [f"{marca} {palavra}" for marca, lista in (("✓", pos_list), ("✗", neg_list))
+                       for palavra in lista
+                       if any(re.search(p, text_normalized) for p in _padroes_original(palavra))]
+        resultados.append((produto_id, indice, pos_count, neg_count, encontradas))
+    return sorted(resultados, key=lambda r: (-r[1], r[0]))
+
+
+def _buscar(text, produtos):
+    return sorted(((r['id'], r['indice'], r['positivas_encontradas'], r['negativas_encontradas'],
+                    r['palavras_encontradas_lista'])
+                   for r in DocumentAnalyzer.find_products_in_text(text, produtos)),
+                  key=lambda r: (-r[1], r[0]))
+
+
+def _produto(produto_id, nome, positivas, negativas=''):
+    return (produto_id, nome, None, positivas, negativas, '2025-01-01 00:00:00')
+
+
+TEXTOS = {
+    'hifens': "Fornecimento de luva-nitrílica tamanho M; luva nitrílica sem pó. Material anti-séptico "
+              "e antisséptico, não estéril. Luva  de  procedimento (não-cirúrgica).",
+    'frases': "Seringa descartável 10 ml com agulha. Seringa descartavel. Agulha hipodérmica 25x7; "
+              "agulhahipodérmica; agulha   hipodérmica; AGULHA\nHIPODÉRMICA. Seringa de vidro.",
+    'espacos': "Álcool   etílico 70%   líquido\t\tgel.  Álcool etílico  em gel,   álcool etílico "
+               "hidratado. Alcool etilico. Álcool-etílico.",
+    'pontuacao': "Item 1: cateter (tipo intravenoso); cateter/intravenoso; cateteres! "
+                 "Cateter... periférico? CATETER: PERIFÉRICO. Cateter_periférico.",
+}
+
+PRODUTOS = [
+    _produto(1, "Luva Nitrílica", "luva nitrílica, sem pó, luva de procedimento", "cirúrgica, estéril"),
+    _produto(2, "Seringa", "seringa descartável, 10 ml, agulha hipodérmica", "vidro, seringa de vidro"),
+    _produto(3, "Agulha Hipodérmica", "agulha hipodérmica, 25x7", "agulhahipodérmica"),
+    _produto(4, "Álcool Etílico", "álcool etílico, 70, gel, em gel", "hidratado, alcool etilico"),
+    _produto(5, "Cateter", "intravenoso, periférico, cateter periférico", "cateteres"),
+    _produto(6, "Anti-séptico", "anti séptico, antisséptico", "não estéril"),
+    _produto(7, "Produto Ausente", "luva", ""),
+]
+
+
+@pytest.mark.parametrize('nome', sorted(TEXTOS))
+def test_resultados_iguais_aos_da_busca_por_regex(nome):
+    assert _buscar(TEXTOS[nome], PRODUTOS) == _buscar_original(TEXTOS[nome], PRODUTOS)
+
+
+def test_texto_completo_com_todos_os_produtos():
+    texto = "\n".join(TEXTOS.values())
+    assert _buscar(texto, PRODUTOS) == _buscar_original(texto, PRODUTOS)
+
+
+@pytest.mark.parametrize('palavras', [
+    ["agulha hipodérmica"],
+    ["agulhahipodérmica"],
+    ["álcool etílico", "gel"],
+    ["luva nitrílica", "luva"],
+    ["cateter periférico", "periférico"],
+])
+def test_contagens_de_frases_e_palavras(palavras):
+    texto = _normalizar_original("\n".join(TEXTOS.values()))
+    assert DocumentAnalyzer.count_occurrences(texto, palavras) == _contar_original(texto, palavras)
+
+
+def test_normalizacao_igual_a_original():
+    for texto in TEXTOS.values():
+        assert DocumentAnalyzer.normalize_text(texto) == _normalizar_original(texto)
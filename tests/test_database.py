@@ -0,0 +1,185 @@
+# tests/test_database.py
+"""Migração de bancos antigos e recálculo retroativo de produtos (reavaliar_produto)"""
+import sqlite3
+
+import pytest
+
+from analyzer import CompiledCatalog, DocumentAnalyzer, NormalizedDocument
+from database import Database
+
+
+VERSAO_ATUAL = 6
+
+TEXTO = ("Pregão eletrônico para aquisição de luva nitrílica sem pó, tamanho M, e luva de "
+         "procedimento não estéril. Seringa descartável 10 ml com agulha hipodérmica 25x7. "
+         "Agulha hipodérmica em caixa com 100 unidades. Seringa de vidro não será aceita.")
+
+
+def _banco_original(caminho):
+    """Banco como o da primeira versão do programa: histórico com o repr dos resultados"""
+    conn = sqlite3.connect(caminho)
+    conn.executescript('''
+        CREATE TABLE produtos (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            nome TEXT NOT NULL,
+            descricao TEXT,
+            palavras_positivas TEXT,
+            palavras_negativas TEXT,
+            data_criacao DATETIME DEFAULT CURRENT_TIMESTAMP
+        );
+        CREATE TABLE analises (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            arquivo_nome TEXT,
+            data_analise DATETIME DEFAULT CURRENT_TIMESTAMP,
+            resultado TEXT
+        );
+    ''')
+    conn.execute("INSERT INTO produtos (nome, descricao, palavras_positivas, palavras_negativas) "
+                 "VALUES ('Luva Nitrílica', NULL, 'sem pó', 'estéril')")
+    resultado = [{'id': 1, 'nome': 'Luva Nitrílica', 'descricao': None, 'indice': 50.0,
+                  'positivas_encontradas': 1, 'negativas_encontradas': 1,
+                  'palavras_positivas': 'sem pó', 'palavras_negativas': 'estéril',
+                  'palavras_encontradas_lista': ['✓ sem pó', '✗ estéril']}]
+    conn.execute("INSERT INTO analises (arquivo_nome, resultado) VALUES (?, ?)",
+                 ('edital.pdf', str(resultado)))
+    conn.execute("INSERT INTO analises (arquivo_nome, resultado) VALUES ('ilegivel.pdf', 'não é um repr')")
+    conn.commit()
+    conn.close()
+
+
+def _analisar(db, nome, texto):
+    """Analisa `texto` com o catálogo do banco e grava como a interface (com o índice FTS5)"""
+    catalogo = CompiledCatalog(db.get_produtos())
+    documento = NormalizedDocument(texto)
+    matches = catalogo.scan(documento.text)
+    resultados = list(DocumentAnalyzer.iter_products_in_text(documento, catalogo, matches))
+    return db.salvar_analise(nome, resultados, documento.text, matches)
+
+
+def _sem_origem(resultados):
+    campos = ('id', 'nome', 'indice', 'positivas_encontradas', 'negativas_encontradas',
+              'palavras_encontradas_lista')
+    return [{campo: r[campo] for campo in campos} for r in resultados]
+
+
+@pytest.fixture
+def db(tmp_path):
+    banco = Database(str(tmp_path / 'produtos.db'))
+    if not banco.fts_disponivel:
+        pytest.skip("SQLite sem FTS5")
+    yield banco
+    banco.fechar()
+
+
+def test_migracao_do_banco_original(tmp_path):
+    caminho = str(tmp_path / 'antigo.db')
+    _banco_original(caminho)
+
+    db = Database(caminho)
+    assert db.conn.execute("PRAGMA user_version").fetchone()[0] == VERSAO_ATUAL
+    resultados = db.get_resultados_analise(1)
+    assert [(r['id'], r['indice'], r['positivas_encontradas'], r['negativas_encontradas'],
+             r['palavras_encontradas_lista'], r['retroativo']) for r in resultados] == [
+        (1, 50.0, 1, 1, ['✓ sem pó', '✗ estéril'], False)
+    ]
+    # O repr convertido sai de `analises`; o que não pôde ser lido fica como estava
+    assert db.conn.execute("SELECT resultado FROM analises ORDER BY id").fetchall() == [
+        (None,), ('não é um repr',)
+    ]
+    assert db.get_resultados_analise(2) == []
+    assert {'indexado', 'arquivo_hash'} <= db._colunas('analises')
+    assert 'tentativas' in db._colunas('ingestao_conteudos')
+    db.fechar()
+
+    # Reabrir não aplica as migrações de novo
+    db = Database(caminho)
+    assert len(db.get_resultados_analise(1)) == 1
+    db.fechar()
+
+
+def test_produto_novo_avaliado_nos_editais_anteriores(db):
+    db.add_produto('Luva Nitrílica', None, 'sem pó, luva de procedimento', 'estéril')
+    analise_id = _analisar(db, 'edital.pdf', TEXTO)
+
+    produto_id = db.add_produto('Agulha Hipodérmica', None, '25x7, caixa com 100, agulha hipodérmica',
+                                'vidro')
+    acertos = db.reavaliar_produto(produto_id)
+
+    esperado = DocumentAnalyzer.find_products_in_text(TEXTO, [db.get_produto(produto_id)])
+    assert [(a[0], a[1], a[2], a[3]) for a in acertos] == [
+        (analise_id, 'edital.pdf', esperado[0]['indice'], True)
+    ]
+    gravados = [r for r in db.get_resultados_analise(analise_id) if r['id'] == produto_id]
+    assert _sem_origem(gravados) == _sem_origem(esperado)
+    assert gravados[0]['retroativo']
+
+
+def test_produto_editado_recalculado_como_analise_nova(db):
+    produto_id = db.add_produto('Seringa', None, 'descartável', 'vidro')
+    analise_id = _analisar(db, 'edital.pdf', TEXTO)
+
+    db.update_produto(produto_id, 'Seringa', None, 'descartável, 10 ml, agulha hipodérmica', 'vidro')
+    acertos = db.reavaliar_produto(produto_id)
+
+    esperado = DocumentAnalyzer.find_products_in_text(TEXTO, [db.get_produto(produto_id)])
+    gravados = db.get_resultados_analise(analise_id)
+    assert _sem_origem(gravados) == _sem_origem(esperado)
+    # O resultado veio da análise original: continua não retroativo
+    assert [a[3] for a in acertos] == [False]
+    assert not gravados[0]['retroativo']
+
+
+def test_produto_que_nao_aparece_sai_do_historico(db):
+    produto_id = db.add_produto('Seringa', None, 'descartável', '')
+    analise_id = _analisar(db, 'edital.pdf', TEXTO)
+
+    db.update_produto(produto_id, 'Cateter', None, 'intravenoso', '')
+    assert db.reavaliar_produto(produto_id) == []
+    assert db.get_resultados_analise(analise_id) == []
+
+
+def test_analise_com_falha_na_gravacao_nao_deixa_linhas(db):
+    db.add_produto('Seringa', None, 'descartável', 'vidro')
+    catalogo = CompiledCatalog(db.get_produtos())
+    documento = NormalizedDocument(TEXTO)
+    matches = catalogo.scan(documento.text)
+    resultados = list(DocumentAnalyzer.iter_products_in_text(documento, catalogo, matches))
+
+    # A impressão é a última etapa; sem assinatura_bytes a gravação falha no meio
+    with pytest.raises(AttributeError):
+        db.salvar_analise('edital.pdf', resultados, documento.text, matches, impressao=object())
+    db.registrar_arquivo_ingerido('/pasta/outro.pdf', 1, 1, 'hash')
+
+    for tabela in ('analises', 'analise_produtos', 'documentos_fts', 'analise_termos'):
+        assert db.conn.execute(f"SELECT COUNT(*) FROM {tabela}").fetchone()[0] == 0, tabela
+
+
+@pytest.mark.parametrize('coluna', ['id', 'nome', 'palavras_positivas'])
+@pytest.mark.parametrize('decrescente', [False, True])
+@pytest.mark.parametrize('filtro', [None, 'LUVA', 'nitrílica', 'ÍLICA', '1'])
+def test_lotes_de_produtos_filtrados_e_ordenados_no_banco(tmp_path, coluna, decrescente, filtro):
+    db = Database(str(tmp_path / 'produtos.db'))
+    nomes = ['Luva Nitrílica', 'luva de látex', 'Seringa', 'Agulha', 'Álcool 70%', 'Cateter']
+    for i in range(60):
+        positivas = None if i % 7 == 0 else f'palavra {i % 5}, nitrílica' if i % 3 else f'item {i}'
+        db.add_produto(nomes[i % len(nomes)], None, positivas, '')
+
+    produtos = db.get_produtos()
+    if filtro:
+        produtos = [p for p in produtos if filtro.casefold() in str(p[0])
+                    or filtro.casefold() in p[1].casefold() or filtro.casefold() in (p[3] or '').casefold()]
+    posicao = {'id': 0, 'nome': 1, 'palavras_positivas': 3}[coluna]
+    chave = lambda p: (p[posicao] or '', p[0])
+    esperado = sorted(produtos, key=chave, reverse=decrescente)
+
+    carregados, apos = [], None
+    while True:
+        lote = db.get_produtos_lote(7, apos, filtro, coluna, decrescente)
+        if not lote:
+            break
+        carregados.extend(lote)
+        apos = chave(lote[-1])
+    assert carregados == esperado
+    assert db.contar_produtos(filtro) == len(esperado)
+    assert all(db.produto_no_filtro(p[0], filtro) for p in esperado)
+    db.fechar()
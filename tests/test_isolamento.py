@@ -0,0 +1,112 @@
+# tests/test_isolamento.py
+"""Processos isolados de extração: mensagens, prazo, limite de memória e falhas"""
+import os
+import sys
+import time
+
+import pytest
+
+import isolamento
+from analyzer import DocumentAnalyzer
+from isolamento import FalhaExtracao, ProcessoIsolado
+
+
+# Alvos dos processos: funções do módulo, para serem encontradas no processo filho
+
+def _enviar_paginas(conn, total):
+    for i in range(total):
+        conn.send(('pagina', i, f"texto {i}"))
+
+
+def _enviar_e_travar(conn):
+    conn.send(('pagina', 0, "texto 0"))
+    time.sleep(60)
+
+
+def _alocar(conn):
+    conn.send(('pagina', 0, "texto 0"))
+    blocos = []
+    for _ in range(64):
+        blocos.append(bytearray(32 * 1024 * 1024))
+        time.sleep(0.05)
+
+
+def _falhar(conn):
+    conn.send(('pagina', 0, "texto 0"))
+    raise ValueError("PDF malformado")
+
+
+def _morrer(conn):
+    os._exit(3)
+
+
+def _receber(alvo, args=(), limite_mb=None, prazo=30):
+    """Mensagens recebidas e a falha (ou None)"""
+    processo = ProcessoIsolado(alvo, args, limite_mb)
+    recebidas = []
+    try:
+        for _, mensagem in isolamento.mensagens([processo], time.monotonic() + prazo):
+            recebidas.append(mensagem)
+    except FalhaExtracao as falha:
+        return recebidas, falha
+    finally:
+        processo.encerrar()
+    return recebidas, None
+
+
+def test_mensagens_ate_o_fim():
+    recebidas, falha = _receber(_enviar_paginas, (3,))
+    assert falha is None
+    assert recebidas == [('pagina', i, f"texto {i}") for i in range(3)]
+
+
+def test_prazo_esgotado_preserva_o_que_chegou():
+    inicio = time.monotonic()
+    recebidas, falha = _receber(_enviar_e_travar, prazo=1)
+    assert falha.motivo == isolamento.TEMPO_ESGOTADO
+    assert recebidas == [('pagina', 0, "texto 0")]
+    assert time.monotonic() - inicio < 10
+
+
+@pytest.mark.skipif(not sys.platform.startswith('linux') and sys.platform != 'win32',
+                    reason="memória só é medida no Linux e no Windows")
+def test_limite_de_memoria():
+    recebidas, falha = _receber(_alocar, limite_mb=128)
+    assert falha.motivo == isolamento.MEMORIA
+    assert recebidas == [('pagina', 0, "texto 0")]
+
+
+def test_excecao_no_processo_vira_falha_de_leitura():
+    recebidas, falha = _receber(_falhar)
+    assert falha.motivo == isolamento.LEITURA
+    assert falha.detalhe == "ValueError: PDF malformado"
+    assert recebidas == [('pagina', 0, "texto 0")]
+
+
+def test_processo_que_termina_sem_avisar():
+    recebidas, falha = _receber(_morrer)
+    assert recebidas == []
+    assert falha.motivo == isolamento.LEITURA
+    assert "código 3" in falha.detalhe
+
+
+def test_descricao_da_falha():
+    falha = FalhaExtracao(isolamento.MEMORIA, "mais de 128 MB")
+    falha.paginas, falha.total = 10, 300
+    assert str(falha) == "limite de memória excedido: mais de 128 MB (extraídas 10 de 300 páginas)"
+
+
+def test_pdf_com_prazo_esgotado(tmp_path, monkeypatch):
+    PyPDF2 = pytest.importorskip('PyPDF2')
+    writer = PyPDF2.PdfWriter()
+    for _ in range(3):
+        writer.add_blank_page(width=200, height=200)
+    arquivo = tmp_path / 'edital.pdf'
+    with open(arquivo, 'wb') as f:
+        writer.write(f)
+
+    assert list(DocumentAnalyzer.extract_pages_from_file(str(arquivo))) == ['', '', '']
+    monkeypatch.setattr(DocumentAnalyzer, 'TEMPO_LIMITE_EXTRACAO', 0)
+    paginas = DocumentAnalyzer.extract_pages_from_file(str(arquivo))
+    assert paginas.falha.motivo == isolamento.TEMPO_ESGOTADO
+    assert list(paginas) == []
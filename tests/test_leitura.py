@@ -0,0 +1,103 @@
+# tests/test_leitura.py
+"""Leitura nativa de DOCX (XML incremental) e de arquivos de texto (mmap)"""
+import codecs
+import zipfile
+
+import isolamento
+from analyzer import DocumentAnalyzer
+
+
+NAMESPACES = ('xmlns:w="http://schemas.openxmlformats.org/wordprocessingml/2006/main" '
+              'xmlns:mc="http://schemas.openxmlformats.org/markup-compatibility/2006"')
+
+
+def _parte(corpo):
+    return f'<?xml version="1.0" encoding="UTF-8" standalone="yes"?><w:document {NAMESPACES}><w:body>{corpo}</w:body></w:document>'
+
+
+def _paragrafo(*trechos):
+    return "<w:p>" + "".join(f"<w:r>{t}</w:r>" for t in trechos) + "</w:p>"
+
+
+def _texto(texto):
+    return f'<w:t xml:space="preserve">{texto}</w:t>'
+
+
+def _docx(caminho, corpo, cabecalhos=(), rodapes=()):
+    with zipfile.ZipFile(caminho, 'w') as arquivo:
+        arquivo.writestr('word/document.xml', _parte(corpo))
+        for i, corpo_parte in enumerate(cabecalhos, 1):
+            arquivo.writestr(f'word/header{i}.xml', _parte(corpo_parte))
+        for i, corpo_parte in enumerate(rodapes, 1):
+            arquivo.writestr(f'word/footer{i}.xml', _parte(corpo_parte))
+    return str(caminho)
+
+
+def test_docx_com_tabela_quebras_e_tabulacoes(tmp_path):
+    corpo = (
+        _paragrafo(_texto("Pregão eletrônico"), "<w:tab/>", _texto("nº 01/2025"))
+        + "<w:tbl><w:tr>"
+        + "<w:tc>" + _paragrafo(_texto("Item")) + "</w:tc>"
+        + "<w:tc>" + _paragrafo(_texto("Luva nitrílica"), "<w:br/>", _texto("sem pó")) + "</w:tc>"
+        + "</w:tr></w:tbl>"
+        + _paragrafo(_texto("Fim da página 1"), '<w:br w:type="page"/>', _texto("Página 2"))
+        # Parada de tabulação (com w:val) não é texto
+        + '<w:p><w:pPr><w:tabs><w:tab w:val="left"/></w:tabs></w:pPr><w:r>' + _texto("Seringa") + "</w:r></w:p>"
+    )
+    paginas = DocumentAnalyzer.extract_pages_from_file(_docx(tmp_path / 'edital.docx', corpo))
+    assert paginas.falha is None
+    assert list(paginas) == [
+        "Pregão eletrônico\tnº 01/2025\nItem\n\tLuva nitrílica\nsem pó\n\tFim da página 1",
+        "Página 2\nSeringa\n",
+    ]
+
+
+def test_docx_conteudo_alternativo_lido_uma_vez(tmp_path):
+    caixa = ("<mc:AlternateContent><mc:Choice>" + _paragrafo(_texto("Caixa de texto"))
+             + "</mc:Choice><mc:Fallback>" + _paragrafo(_texto("Caixa de texto")) + "</mc:Fallback>"
+             + "</mc:AlternateContent>")
+    paginas = DocumentAnalyzer.extract_pages_from_file(
+        _docx(tmp_path / 'edital.docx', _paragrafo(_texto("Antes")) + caixa + _paragrafo(_texto("Depois")))
+    )
+    assert list(paginas) == ["Antes\nCaixa de texto\nDepois\n"]
+
+
+def test_docx_cabecalhos_e_rodapes_uma_vez(tmp_path):
+    corpo = _paragrafo(_texto("Página 1"), '<w:br w:type="page"/>', _texto("Página 2"))
+    cabecalho = _paragrafo(_texto("Prefeitura Municipal"))
+    rodape = _paragrafo(_texto("Rua Principal, 100"))
+    paginas = DocumentAnalyzer.extract_pages_from_file(
+        _docx(tmp_path / 'edital.docx', corpo, [cabecalho, cabecalho], [rodape, ""])
+    )
+    assert list(paginas) == ["Prefeitura Municipal\nPágina 1", "Página 2\nRua Principal, 100\n"]
+
+
+def test_docx_invalido_vira_falha_de_leitura(tmp_path):
+    caminho = tmp_path / 'edital.docx'
+    caminho.write_bytes(b'nao e um zip')
+    paginas = DocumentAnalyzer.extract_pages_from_file(str(caminho))
+    assert list(paginas) == []
+    assert paginas.falha.motivo == isolamento.LEITURA
+
+
+def test_texto_nas_codificacoes_comuns(tmp_path):
+    texto = "Licitação de luvas\r\ncom ÇÃÕ, “aspas” e – travessão\rfim"
+    esperado = texto.replace("\r\n", "\n").replace("\r", "\n")
+    casos = {
+        'utf8.txt': texto.encode('utf-8'),
+        'bom.txt': codecs.BOM_UTF8 + texto.encode('utf-8'),
+        'utf16.txt': texto.encode('utf-16'),
+        'cp1252.txt': texto.encode('cp1252'),
+    }
+    for nome, dados in casos.items():
+        (tmp_path / nome).write_bytes(dados)
+        assert list(DocumentAnalyzer.extract_pages_from_file(str(tmp_path / nome))) == [esperado], nome
+
+    # Byte fora da Windows-1252 (0x81): lido como Latin-1
+    (tmp_path / 'latin1.txt').write_bytes(b'edital \x81 item')
+    assert list(DocumentAnalyzer.extract_pages_from_file(str(tmp_path / 'latin1.txt'))) == ['edital \x81 item']
+
+
+def test_texto_vazio(tmp_path):
+    (tmp_path / 'vazio.txt').write_bytes(b'')
+    assert list(DocumentAnalyzer.extract_pages_from_file(str(tmp_path / 'vazio.txt'))) == [""]
@@ -0,0 +1,97 @@
+# tests/test_memo.py
+"""Análises memorizadas por conteúdo: reaproveitadas e recalculadas só nos produtos alterados"""
+import pytest
+
+from analyzer import CompiledCatalog, DocumentAnalyzer, NormalizedDocument
+from database import Database
+
+
+PAGINAS = [
+    "Pregão eletrônico para aquisição de luva nitrílica sem pó, tamanho M,",
+    "e luva de procedimento não estéril. Seringa descartável 10 ml com agulha hipodérmica 25x7.",
+    "Agulha hipodérmica em caixa com 100 unidades. Seringa de vidro não será aceita. Cateter intravenoso.",
+]
+HASH = 'conteudo'
+
+
+@pytest.fixture
+def db(tmp_path):
+    banco = Database(str(tmp_path / 'produtos.db'))
+    banco.add_produto('Luva Nitrílica', None, 'sem pó, tamanho M', 'estéril')
+    banco.add_produto('Seringa', None, 'descartável', 'vidro')
+    banco.add_produto('Agulha Hipodérmica', None, '25x7', '')
+    yield banco
+    banco.fechar()
+
+
+def _catalogo(db):
+    return CompiledCatalog(*db.get_catalogo_versionado())
+
+
+def _analisar_e_memorizar(db, com_cache=True):
+    """Análise do zero, memorizada como no cli (com o texto no cache, se pedido)"""
+    catalogo = _catalogo(db)
+    documento = NormalizedDocument.from_pages(PAGINAS)
+    matches = catalogo.scan(documento.text)
+    resultados = list(DocumentAnalyzer.iter_products_in_text(documento, catalogo, matches))
+    resultados.sort(key=lambda x: x['indice'], reverse=True)
+    if com_cache:
+        db.salvar_texto_cache(HASH, DocumentAnalyzer.EXTRATOR_VERSAO, PAGINAS)
+    DocumentAnalyzer.memoize_results(HASH, catalogo, db, resultados, matches, len(PAGINAS),
+                                     len("\n".join(PAGINAS)))
+    return resultados
+
+
+def _do_zero(db):
+    return DocumentAnalyzer.find_products_in_text("\n".join(PAGINAS), db.get_produtos())
+
+
+def test_mesmo_catalogo_devolve_a_analise_memorizada(db):
+    resultados = _analisar_e_memorizar(db)
+    assert DocumentAnalyzer.find_products_memoized(HASH, _catalogo(db), db) == (
+        resultados, len(PAGINAS), len("\n".join(PAGINAS))
+    )
+    assert DocumentAnalyzer.find_products_memoized('outro', _catalogo(db), db) is None
+
+
+def test_produtos_alterados_recalculados_com_termos_novos(db):
+    _analisar_e_memorizar(db)
+    luva, seringa, agulha = (p[0] for p in db.get_produtos())
+    # Termos que a análise memorizada nunca buscou: contados no texto do cache
+    db.update_produto(seringa, 'Seringa', None, 'descartável, 10 ml, agulha hipodérmica', 'vidro')
+    db.delete_produto(agulha)
+    db.add_produto('Cateter', None, 'intravenoso', 'descartável')
+
+    resultados, paginas, caracteres = DocumentAnalyzer.find_products_memoized(HASH, _catalogo(db), db)
+    assert resultados == _do_zero(db)
+    # O recálculo é memorizado com a versão atual
+    assert db.get_memo_analise(HASH, DocumentAnalyzer.EXTRATOR_VERSAO)['catalogo_versao'] == \
+        db.get_catalogo_versao()
+    assert DocumentAnalyzer.find_products_memoized(HASH, _catalogo(db), db)[0] == resultados
+
+
+def test_termos_novos_sem_texto_no_cache_pedem_nova_analise(db):
+    _analisar_e_memorizar(db, com_cache=False)
+    db.add_produto('Cateter', None, 'intravenoso', '')
+    assert DocumentAnalyzer.find_products_memoized(HASH, _catalogo(db), db) is None
+
+
+def test_termos_ja_contados_dispensam_o_cache(db):
+    _analisar_e_memorizar(db, com_cache=False)
+    # 'seringa', 'vidro' e 'descartável' já foram contados: basta a contagem memorizada
+    db.add_produto('Seringa', None, 'vidro', 'descartável')
+    resultados, _, _ = DocumentAnalyzer.find_products_memoized(HASH, _catalogo(db), db)
+    assert resultados == _do_zero(db)
+
+
+def test_memorizada_com_catalogo_mais_novo_nao_serve(db):
+    antigo = _catalogo(db)
+    db.add_produto('Cateter', None, 'intravenoso', '')
+    _analisar_e_memorizar(db)
+    assert DocumentAnalyzer.find_products_memoized(HASH, antigo, db) is None
+
+
+def test_catalogo_sem_versao_nao_memoriza(db):
+    catalogo = CompiledCatalog(db.get_produtos())
+    DocumentAnalyzer.memoize_results(HASH, catalogo, db, [], catalogo.scan("seringa"), 1, 7)
+    assert db.get_memo_analise(HASH, DocumentAnalyzer.EXTRATOR_VERSAO) is None
@@ -0,0 +1,119 @@
+# tests/test_planilhas.py
+"""Importação e exportação do catálogo: validação das linhas e upsert pelo nome"""
+import pytest
+
+import planilhas
+from database import Database
+
+
+def _linha(nome, descricao='', positivas='', negativas=''):
+    return {'nome': nome, 'descricao': descricao, 'palavras_positivas': positivas,
+            'palavras_negativas': negativas}
+
+
+@pytest.fixture
+def db(tmp_path):
+    banco = Database(str(tmp_path / 'produtos.db'))
+    yield banco
+    banco.fechar()
+
+
+def test_validar_linhas():
+    produtos, erros, avisos, duplicados = planilhas.validar([
+        _linha('  Luva   Nitrílica ', ' Caixa com 100 ', ' sem pó ,, tamanho M,', 'estéril'),
+        _linha('   ', positivas='x'),
+        _linha('Seringa', positivas='', negativas='vidro'),
+        _linha('Agulha', positivas='25x7, ***'),
+        _linha('luva nitrílica', positivas='procedimento'),
+    ])
+    assert produtos == [
+        # Nome repetido (sem diferenciar maiúsculas e espaços): vale a última linha
+        ('luva nitrílica', None, 'procedimento', ''),
+        ('Seringa', None, '', 'vidro'),
+        ('Agulha', None, '25x7, ***', ''),
+    ]
+    assert erros == [(3, "nome vazio")]
+    assert [numero for numero, _ in avisos] == [4, 5]
+    assert "'***'" in avisos[1][1]
+    assert duplicados == {'luva nitrílica': [2, 6]}
+
+
+def test_importar_insere_atualiza_e_ignora_os_inalterados(db):
+    db.add_produto('Luva Nitrílica', None, 'sem pó, tamanho M', 'estéril')
+    db.add_produto('Seringa', 'Descartável', 'descartável', 'vidro')
+    versao = db.get_catalogo_versao()
+
+    produtos, _, _, _ = planilhas.validar([
+        # Só a formatação muda: inalterado
+        _linha('Luva  Nitrílica ', '', 'sem pó,tamanho M', 'estéril'),
+        _linha('Seringa', 'Descartável', 'descartável, 10 ml', 'vidro'),
+        _linha('Cateter', '', 'intravenoso', ''),
+    ])
+    simulacao = db.importar_produtos(produtos, dry_run=True)
+    assert (simulacao['inseridos'], simulacao['atualizados'], simulacao['inalterados']) == (1, 1, 1)
+    assert db.contar_produtos() == 2 and db.get_catalogo_versao() == versao
+
+    relatorio = db.importar_produtos(produtos)
+    assert (relatorio['inseridos'], relatorio['atualizados'], relatorio['inalterados']) == (1, 1, 1)
+    assert [p[1:5] for p in db.get_produtos()] == [
+        ('Cateter', None, 'intravenoso', ''),
+        ('Luva Nitrílica', None, 'sem pó, tamanho M', 'estéril'),
+        ('Seringa', 'Descartável', 'descartável, 10 ml', 'vidro'),
+    ]
+    assert db.get_catalogo_versao() > versao
+    # O catálogo compilado é remontado com os produtos importados
+    assert len(db.get_catalogo()) == 3
+
+    versao = db.get_catalogo_versao()
+    relatorio = db.importar_produtos(produtos)
+    assert (relatorio['inseridos'], relatorio['atualizados'], relatorio['inalterados']) == (0, 0, 3)
+    assert db.get_catalogo_versao() == versao
+
+
+def test_nome_repetido_no_banco_atualiza_o_mais_antigo(db):
+    primeiro = db.add_produto('Seringa', None, 'descartável', '')
+    db.add_produto('SERINGA', None, 'vidro', '')
+    relatorio = db.importar_produtos([('Seringa', None, '10 ml', '')])
+    assert len(relatorio['duplicados_banco']) == 1
+    assert db.get_produto(primeiro)[3] == '10 ml'
+
+
+def test_relatorio():
+    relatorio = {'arquivo': 'catalogo.csv', 'dry_run': True, 'inseridos': 1, 'atualizados': 0,
+                 'inalterados': 2, 'segundos': 0.5, 'duplicados': {'Luva': [2, 5]},
+                 'duplicados_banco': [], 'erros': [(3, "nome vazio")], 'avisos': []}
+    texto = planilhas.formatar_relatorio(relatorio)
+    assert texto.splitlines() == [
+        "Simulação (nada foi gravado): catalogo.csv",
+        "Inseridos: 1, atualizados: 0, inalterados: 2 (0.50 s)",
+        "Nomes repetidos na planilha (vale a última linha): 1",
+        "  Luva: linhas 2, 5",
+        "Erros (linhas ignoradas): 1",
+        "  linha 3: nome vazio",
+    ]
+
+
+@pytest.mark.parametrize('extensao', ['.csv', '.xlsx'])
+def test_exportar_e_reimportar_nao_altera_nada(db, tmp_path, extensao):
+    pytest.importorskip('pandas')
+    if extensao == '.xlsx':
+        pytest.importorskip('openpyxl')
+    db.add_produto('Luva Nitrílica', None, 'sem pó, tamanho M', 'estéril')
+    db.add_produto('Seringa', 'Descartável, 10 ml', 'descartável', '')
+    caminho = str(tmp_path / f'catalogo{extensao}')
+    assert planilhas.exportar(db, caminho) == 2
+
+    versao = db.get_catalogo_versao()
+    relatorio = planilhas.importar(db, caminho)
+    assert (relatorio['inseridos'], relatorio['atualizados'], relatorio['inalterados']) == (0, 0, 2)
+    assert relatorio['erros'] == [] and db.get_catalogo_versao() == versao
+
+
+def test_csv_do_excel_em_portugues(db, tmp_path):
+    pytest.importorskip('pandas')
+    caminho = tmp_path / 'catalogo.csv'
+    caminho.write_bytes("Nome;Descrição;Palavras Positivas\nLuva Nitrílica;;sem pó, tamanho M\n"
+                        .encode('cp1252'))
+    relatorio = planilhas.importar(db, str(caminho))
+    assert relatorio['inseridos'] == 1
+    assert db.get_produtos()[0][1:5] == ('Luva Nitrílica', None, 'sem pó, tamanho M', '')
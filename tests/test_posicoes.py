@@ -0,0 +1,89 @@
+# tests/test_posicoes.py
+"""Índice de posições (IndicePosicoes) e as páginas exibidas no visualizador"""
+from array import array
+
+import pytest
+
+from analyzer import CompiledCatalog, DocumentAnalyzer, IndicePosicoes, NormalizedDocument
+from database import Database
+
+
+# Como as linhas de `produtos` (a última coluna é data_criacao)
+PRODUTOS = [
+    (1, 'Luva Nitrílica', None, 'sem pó, tamanho M', 'estéril', None),
+    (2, 'Seringa', None, 'descartável, 10 ml', 'vidro', None),
+    (3, 'Agulha Hipodérmica', None, '25x7', '', None),
+]
+
+PAGINAS = [
+    "EDITAL DE PREGÃO ELETRÔNICO Nº 01/2025\nAquisição de Luva Nitrílica, SEM PÓ.",
+    "",
+    "Seringa descartável 10 ml; seringa de vidro não.\nAgulha hipodérmica 25x7",
+    "  luva nitrílica tamanho M (não estéril) e seringa descartável 10ml  ",
+]
+
+
+def _indice_completo(paginas):
+    """Como a análise com o documento inteiro em memória"""
+    documento = NormalizedDocument.from_pages(paginas)
+    matches = CompiledCatalog(PRODUTOS).scan(documento.text)
+    return IndicePosicoes.das_ocorrencias(matches.offsets, documento.page_starts)
+
+
+def test_posicoes_apontam_para_o_termo_no_texto_da_pagina():
+    indice = _indice_completo(PAGINAS)
+    assert len(indice) == sum(len(indice.ocorrencias(termo)) for termo in indice.termos)
+    assert len(indice.ocorrencias('seringa')) == 3
+    for termo in indice.termos:
+        for pagina, inicio, fim in indice.ocorrencias(termo):
+            # O visualizador normaliza só a página exibida
+            assert NormalizedDocument(PAGINAS[pagina]).text[inicio:fim] == termo
+
+
+def test_posicoes_da_analise_em_fluxo_iguais_as_da_completa():
+    posicoes = IndicePosicoes()
+    DocumentAnalyzer.analyze_pages(iter(PAGINAS), PRODUTOS, posicoes=posicoes)
+    completo = _indice_completo(PAGINAS)
+    assert {t: posicoes.ocorrencias(t) for t in posicoes.termos} == \
+        {t: completo.ocorrencias(t) for t in completo.termos}
+
+
+def test_atualizar_substitui_os_trios_do_termo():
+    indice = IndicePosicoes()
+    indice.atualizar(IndicePosicoes({'a': (0, 2), 'b': (2, 1)}, array('i', [0, 0, 1, 1, 5, 6, 2, 3, 4])))
+    indice.atualizar(IndicePosicoes({'b': (0, 1), 'c': (1, 1)}, array('i', [7, 1, 2, 8, 3, 4])))
+    assert indice.ocorrencias('a') == [(0, 0, 1), (1, 5, 6)]
+    assert indice.ocorrencias('b') == [(7, 1, 2)]
+    assert indice.ocorrencias('c') == [(8, 3, 4)]
+    # Os trios antigos de 'b' não ficam no array
+    assert len(indice.valores) == 3 * len(indice)
+
+
+def test_posicoes_gravadas_e_lidas_do_banco(tmp_path):
+    db = Database(str(tmp_path / 'produtos.db'))
+    indice = _indice_completo(PAGINAS)
+    db.salvar_posicoes('hash', DocumentAnalyzer.EXTRATOR_VERSAO, indice)
+    lido = db.get_posicoes('hash', DocumentAnalyzer.EXTRATOR_VERSAO)
+    assert {t: lido.ocorrencias(t) for t in lido.termos} == {t: indice.ocorrencias(t) for t in indice.termos}
+    assert db.get_posicoes('hash', DocumentAnalyzer.EXTRATOR_VERSAO + 1) is None
+    db.fechar()
+
+
+def test_paginas_extraidas_sob_demanda(tmp_path):
+    arquivo = tmp_path / 'edital.txt'
+    arquivo.write_text("\n".join(PAGINAS), encoding='utf-8')
+    # Formatos sem páginas têm uma só; números fora do documento ficam de fora
+    assert DocumentAnalyzer.extract_selected_pages(str(arquivo), [0, 1, 5]) == {0: "\n".join(PAGINAS)}
+    assert DocumentAnalyzer.extract_page(str(arquivo), 3) is None
+
+
+def test_paginas_de_pdf_extraidas_em_bloco(tmp_path):
+    PyPDF2 = pytest.importorskip('PyPDF2')
+    writer = PyPDF2.PdfWriter()
+    for _ in range(3):
+        writer.add_blank_page(width=200, height=200)
+    arquivo = tmp_path / 'edital.pdf'
+    with open(arquivo, 'wb') as f:
+        writer.write(f)
+    # A página 7 não existe: as anteriores são entregues mesmo assim
+    assert DocumentAnalyzer.extract_selected_pages(str(arquivo), [1, 2, 7]) == {1: '', 2: ''}
@@ -0,0 +1,85 @@
+# tests/test_ranking.py
+"""Ranking com matrizes (MatrizIndices) igual ao calculate_index de cada par documento × produto"""
+import pytest
+
+import ranking
+from analyzer import CompiledCatalog, DocumentAnalyzer, NormalizedDocument
+from database import Database
+
+
+PRODUTOS = [
+    ('Luva Nitrílica', 'sem pó, luva de procedimento, tamanho M', 'estéril, vinil'),
+    ('Seringa', 'descartável, 10 ml, 10ml', 'vidro, vidro'),
+    ('Agulha Hipodérmica', '25x7, caixa com 100', ''),
+    ('Cateter', 'intravenoso', 'descartável'),
+    ('', 'descartável', 'vidro'),
+]
+
+TEXTOS = [
+    ("edital1.pdf", "Aquisição de luva nitrílica sem pó, tamanho M. Seringa descartável 10 ml."),
+    ("edital2.pdf", "Seringa de vidro não será aceita. Seringa descartável 10ml e agulha hipodérmica 25x7."),
+    ("edital3.pdf", "Agulha hipodérmica em caixa com 100 unidades; luva nitrílica estéril de vinil."),
+    ("edital4.pdf", "Cateter intravenoso descartável. Nenhum outro item."),
+]
+
+
+@pytest.fixture
+def db(tmp_path):
+    banco = Database(str(tmp_path / 'produtos.db'))
+    if not banco.fts_disponivel:
+        pytest.skip("SQLite sem FTS5")
+    for nome, positivas, negativas in PRODUTOS:
+        banco.add_produto(nome, None, positivas, negativas)
+    catalogo = CompiledCatalog(banco.get_produtos())
+    for nome, texto in TEXTOS:
+        documento = NormalizedDocument(texto)
+        matches = catalogo.scan(documento.text)
+        resultados = list(DocumentAnalyzer.iter_products_in_text(documento, catalogo, matches))
+        banco.salvar_analise(nome, resultados, documento.text, matches)
+    yield banco
+    banco.fechar()
+
+
+def _esperado(db, limite):
+    """Melhores editais de cada produto com find_products_in_text, documento a documento"""
+    documentos = db.get_documentos_indexados()
+    linhas = []
+    for produto in db.get_produtos():
+        acertos = []
+        for posicao, (analise_id, nome, data) in enumerate(documentos):
+            for r in DocumentAnalyzer.find_products_in_text(TEXTOS[posicao][1], [produto]):
+                acertos.append((r['indice'], r['positivas_encontradas'], posicao,
+                                r['negativas_encontradas']))
+        acertos.sort(key=lambda a: (a[0], a[1], a[2]), reverse=True)
+        for indice, pos, posicao, neg in acertos[:limite]:
+            analise_id, nome, data = documentos[posicao]
+            linhas.append((produto[0], produto[1], analise_id, nome, data, indice, pos, neg))
+    return linhas
+
+
+@pytest.mark.parametrize('limite', [1, 10])
+def test_melhores_editais_iguais_ao_calculo_por_documento(db, limite):
+    assert ranking.melhores_editais(db, limite) == _esperado(db, limite)
+
+
+def test_melhores_editais_sem_scipy(db, monkeypatch):
+    monkeypatch.setattr(ranking, 'sparse', None)
+    assert ranking.melhores_editais(db, 10) == _esperado(db, 10)
+
+
+def test_melhores_editais_de_alguns_produtos(db):
+    produto_ids = [db.get_produtos()[1][0]]
+    linhas = ranking.melhores_editais(db, 10, produto_ids)
+    assert linhas == [linha for linha in _esperado(db, 10) if linha[0] in produto_ids]
+
+
+def test_lote_de_documentos_menor_que_o_arquivo(db, monkeypatch):
+    monkeypatch.setattr(ranking.MatrizIndices, 'LOTE_DOCUMENTOS', 3)
+    assert ranking.melhores_editais(db, 10) == _esperado(db, 10)
+
+
+def test_contagens_so_dos_termos_pedidos(db):
+    # Mais termos que um lote de parâmetros do SQLite, a maioria sem ocorrências
+    termos = ['seringa', 'vidro'] + [f'termo{i}' for i in range(1200)]
+    contagens = db.get_contagens_termos(termos)
+    assert sorted(contagens) == [(1, 'seringa', 1), (2, 'seringa', 2), (2, 'vidro', 1)]
@@ -0,0 +1,113 @@
+# tests/test_servidor.py
+"""Serviço HTTP: recusa com 503 e Retry-After quando a fila está cheia, e uma análise completa"""
+import http.client
+import json
+import os
+import threading
+import time
+from http.server import ThreadingHTTPServer
+
+import pytest
+
+from database import Database
+from servidor import AnaliseHandler, ServicoAnalise
+
+
+TEXTO = "Pregão eletrônico para aquisição de seringa descartável 10 ml e agulha hipodérmica 25x7."
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    caminho = str(tmp_path / 'produtos.db')
+    db = Database(caminho)
+    db.add_produto('Seringa', None, 'descartável, 10 ml', 'vidro')
+    db.fechar()
+    return caminho
+
+
+def _servir(servico):
+    servidor = ThreadingHTTPServer(('127.0.0.1', 0), AnaliseHandler)
+    servidor.daemon_threads = True
+    servidor.servico = servico
+    servidor.token = None
+    threading.Thread(target=servidor.serve_forever, daemon=True).start()
+    return servidor
+
+
+@pytest.fixture
+def servico_parado(db_path, monkeypatch):
+    """Serviço cujo despachante nunca tira trabalhos da fila (sempre ocupado)"""
+    monkeypatch.setattr(ServicoAnalise, '_despachar', lambda self: None)
+    servico = ServicoAnalise(db_path, processos=1, max_fila=1)
+    servidor = _servir(servico)
+    yield servico, servidor.server_port
+    servidor.shutdown()
+    servidor.server_close()
+    servico.encerrar()
+    servico.db.fechar()
+
+
+def _requisicao(porta, metodo, caminho, corpo=None):
+    conexao = http.client.HTTPConnection('127.0.0.1', porta, timeout=10)
+    try:
+        conexao.request(metodo, caminho, body=corpo)
+        resposta = conexao.getresponse()
+        return resposta.status, dict(resposta.getheaders()), json.loads(resposta.read())
+    finally:
+        conexao.close()
+
+
+def test_fila_cheia_recusa_com_503(servico_parado):
+    servico, porta = servico_parado
+    corpo = TEXTO.encode('utf-8')
+
+    status, cabecalhos, trabalho = _requisicao(porta, 'POST', '/analises?nome=a.txt', corpo)
+    assert status == 202
+    assert cabecalhos['Location'] == f"/analises/{trabalho['id']}"
+    assert trabalho['status'] == 'na_fila' and trabalho['posicao_fila'] == 1
+
+    status, cabecalhos, dados = _requisicao(porta, 'POST', '/analises?nome=b.txt', corpo)
+    assert status == 503
+    assert cabecalhos['Retry-After'] == '30'
+    assert dados['na_fila'] == dados['capacidade_fila'] == 1
+    assert dados['recusados'] == 1 and dados['recebidos'] == 1
+    # O recusado não chega a ser gravado na pasta temporária
+    assert os.listdir(servico.pasta) == [f"{trabalho['id']}_a.txt"]
+
+    status, _, situacao = _requisicao(porta, 'GET', '/status')
+    assert status == 200 and situacao['recusados'] == 1
+
+
+def test_enviar_com_a_fila_cheia(servico_parado):
+    servico, _ = servico_parado
+    assert servico.enviar('a.txt', b'primeiro') is not None
+    assert servico.enviar('b.txt', b'segundo') is None
+    assert len(os.listdir(servico.pasta)) == 1
+    assert servico.situacao()['recebidos'] == 1
+
+
+def test_analise_pelo_servico(db_path):
+    servico = ServicoAnalise(db_path, processos=1, max_fila=2)
+    servidor = _servir(servico)
+    porta = servidor.server_port
+    try:
+        status, _, trabalho = _requisicao(porta, 'POST', '/analises?nome=edital.txt',
+                                          TEXTO.encode('utf-8'))
+        assert status == 202
+
+        limite = time.monotonic() + 60
+        while trabalho['status'] in ('na_fila', 'processando') and time.monotonic() < limite:
+            time.sleep(0.05)
+            _, _, trabalho = _requisicao(porta, 'GET', f"/analises/{trabalho['id']}")
+        assert trabalho['status'] == 'concluida', trabalho.get('erro')
+        assert [r['nome'] for r in trabalho['resultados']] == ['Seringa']
+        assert trabalho['analise_id'] is not None
+
+        status, _, lista = _requisicao(porta, 'GET', '/analises')
+        assert status == 200 and 'resultados' not in lista[0]
+        assert _requisicao(porta, 'GET', '/analises/999')[0] == 404
+    finally:
+        servidor.shutdown()
+        servidor.server_close()
+        servico.encerrar()
+        servico.db.fechar()
@@ -0,0 +1,108 @@
+# tests/test_similaridade.py
+"""Quase duplicatas: assinatura MinHash, busca pelas bandas (LSH) e páginas alteradas"""
+import random
+
+import pytest
+
+from database import Database
+from similaridade import ImpressaoDigital, buscar_quase_duplicata, descrever
+
+
+def _paginas(quantidade, seed, palavras_por_pagina=300):
+    """Páginas de texto com um vocabulário grande o bastante para os shingles não se repetirem"""
+    rnd = random.Random(seed)
+    vocabulario = [f"termo{i}" for i in range(2000)]
+    return [' '.join(rnd.choice(vocabulario) for _ in range(palavras_por_pagina))
+            for _ in range(quantidade)]
+
+
+@pytest.fixture
+def db(tmp_path):
+    banco = Database(str(tmp_path / 'produtos.db'))
+    yield banco
+    banco.fechar()
+
+
+def test_assinatura_nao_depende_da_divisao_em_paginas():
+    paginas = _paginas(3, seed=1)
+    inteira = ImpressaoDigital.das_paginas([' '.join(paginas)])
+    dividida = ImpressaoDigital.das_paginas(paginas)
+    # Os shingles atravessam as páginas: mesma assinatura, hashes de página diferentes
+    assert inteira.assinatura_bytes() == dividida.assinatura_bytes()
+    assert dividida.similaridade(inteira.assinatura_bytes()) == 1.0
+    assert len(dividida.paginas) == 3 and len(inteira.paginas) == 1
+
+
+def test_similaridade_estimada():
+    original = ImpressaoDigital.das_paginas(_paginas(5, seed=1))
+    revisada = _paginas(5, seed=1)
+    revisada[2] = _paginas(1, seed=2)[0]
+    outro = ImpressaoDigital.das_paginas(_paginas(5, seed=3))
+
+    # Uma página trocada em cinco: cerca de 4/6 dos shingles em comum
+    semelhanca = ImpressaoDigital.das_paginas(revisada).similaridade(original.assinatura_bytes())
+    assert 0.45 < semelhanca < 0.9
+    assert outro.similaridade(original.assinatura_bytes()) < 0.1
+
+
+def test_texto_curto_tem_assinatura():
+    curto = ImpressaoDigital.das_paginas(["Pregão eletrônico"])
+    assert curto.similaridade(ImpressaoDigital.das_paginas(["pregão  ELETRÔNICO"]).assinatura_bytes()) == 1.0
+    assert curto.similaridade(ImpressaoDigital.das_paginas(["Tomada de preços"]).assinatura_bytes()) < 0.1
+
+
+def test_paginas_alteradas():
+    paginas = _paginas(5, seed=1, palavras_por_pagina=20)
+    anterior = ImpressaoDigital.das_paginas(paginas).paginas
+    nova = _paginas(1, seed=2, palavras_por_pagina=20)[0]
+
+    assert ImpressaoDigital.das_paginas(paginas).paginas_alteradas(anterior) == ([], 0)
+    # Página 2 reescrita
+    editada = paginas[:1] + [nova] + paginas[2:]
+    assert ImpressaoDigital.das_paginas(editada).paginas_alteradas(anterior) == ([2], 0)
+    # Página inserida antes da terceira: as seguintes só mudam de número
+    inserida = paginas[:2] + [nova] + paginas[2:]
+    assert ImpressaoDigital.das_paginas(inserida).paginas_alteradas(anterior) == ([3], 0)
+    # Quarta página removida
+    removida = paginas[:3] + paginas[4:]
+    assert ImpressaoDigital.das_paginas(removida).paginas_alteradas(anterior) == ([], 1)
+
+
+def test_busca_quase_duplicata_no_historico(db):
+    paginas = _paginas(20, seed=1)
+    db.salvar_analise('outro.pdf', [], impressao=ImpressaoDigital.das_paginas(_paginas(20, seed=3)))
+    original_id = db.salvar_analise('edital.pdf', [], impressao=ImpressaoDigital.das_paginas(paginas))
+
+    # Retificação: algumas palavras da página 7 mudaram
+    retificada = list(paginas)
+    palavras = retificada[6].split()
+    palavras[100:110] = ['retificado'] * 10
+    retificada[6] = ' '.join(palavras)
+    impressao = ImpressaoDigital.das_paginas(retificada)
+    duplicata = buscar_quase_duplicata(db, impressao)
+    assert duplicata['analise_id'] == original_id
+    assert duplicata['arquivo_nome'] == 'edital.pdf'
+    assert not duplicata['identico'] and duplicata['similaridade'] >= db.LIMIAR_QUASE_DUPLICATA
+    assert duplicata['paginas_alteradas'] == [7] and duplicata['paginas_removidas'] == 0
+    assert impressao.duplicata is duplicata
+    assert "páginas alteradas: 7" in descrever(duplicata)
+
+    # Gravada com a análise, a retificação passa a ser o par mais recente
+    retificada_id = db.salvar_analise('retificacao.pdf', [], impressao=impressao)
+    copia = buscar_quase_duplicata(db, ImpressaoDigital.das_paginas(retificada))
+    assert copia['analise_id'] == retificada_id and copia['identico']
+
+    assert buscar_quase_duplicata(db, ImpressaoDigital.das_paginas(_paginas(20, seed=4))) is None
+    assert buscar_quase_duplicata(db, None) is None
+
+
+def test_limiar_da_configuracao(db):
+    paginas = _paginas(5, seed=1)
+    db.salvar_analise('edital.pdf', [], impressao=ImpressaoDigital.das_paginas(paginas))
+    impressao = ImpressaoDigital.das_paginas(paginas[:4] + _paginas(1, seed=2))
+
+    db.set_config('limiar_quase_duplicata', '1.0')
+    assert buscar_quase_duplicata(db, impressao) is None
+    db.set_config('limiar_quase_duplicata', '0.5')
+    duplicata = buscar_quase_duplicata(db, impressao)
+    assert duplicata['paginas_alteradas'] == [5] and duplicata['similaridade'] < 1.0
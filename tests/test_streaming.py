@@ -0,0 +1,57 @@
+# tests/test_streaming.py
+"""Análise em fluxo (página a página) igual à análise do documento inteiro"""
+import pytest
+
+import cli
+from analyzer import CompiledCatalog, DocumentAnalyzer, NormalizedDocument
+
+
+# Como as linhas de `produtos` (a última coluna é data_criacao)
+PRODUTOS = [
+    (1, 'Luva Nitrílica', None, 'sem pó, tamanho M', 'estéril', None),
+    (2, 'Seringa', None, 'descartável, 10 ml', 'vidro', None),
+    (3, 'Agulha Hipodérmica', None, '25x7, caixa com 100', '', None),
+    (4, 'Cateter', None, 'intravenoso', 'descartável', None),
+    (5, '', None, 'edital', '', None),
+]
+
+PAGINAS = [
+    "EDITAL DE PREGÃO ELETRÔNICO Nº 01/2025 - aquisição de luva",
+    # Nome e frases que atravessam a quebra de página
+    "nitrílica sem pó, tamanho M; seringa descartável 10",
+    "ml, agulha hipodérmica 25x7 em caixa com",
+    "",
+    "   ",
+    "100 unidades. Seringa de vidro não será aceita. Cateter intravenoso.",
+]
+
+
+@pytest.mark.parametrize('paginas', [PAGINAS, PAGINAS[:1], [""], ["", "seringa descartável"], []])
+def test_resultados_iguais_aos_do_texto_inteiro(paginas):
+    tempos = {}
+    normalizadas = []
+    resultados, matches, total, caracteres = DocumentAnalyzer.analyze_pages(
+        iter(paginas), PRODUTOS, tempos, normalizadas=normalizadas
+    )
+    texto = "\n".join(paginas)
+    assert resultados == DocumentAnalyzer.find_products_in_text(texto, PRODUTOS)
+    assert matches.counts == CompiledCatalog(PRODUTOS).scan(DocumentAnalyzer.normalize_text(texto)).counts
+    assert (total, caracteres) == (len(paginas), len(texto))
+    assert " ".join(normalizadas) == NormalizedDocument.from_pages(paginas).text
+    assert set(tempos) == {'normalizacao', 'busca'}
+
+
+def test_arquivo_analisado_em_fluxo_e_inteiro(tmp_path):
+    arquivo = tmp_path / 'edital.txt'
+    arquivo.write_text("\n".join(PAGINAS), encoding='utf-8')
+    # Sem versões do catálogo as análises não são memorizadas: as duas leem o arquivo
+    cli._iniciar_processo(PRODUTOS, str(tmp_path / 'produtos.db'))
+    inteiro = cli.analisar_arquivo(str(arquivo), streaming=False)
+    fluxo = cli.analisar_arquivo(str(arquivo), streaming=True)
+    cli._db.fechar()
+
+    assert inteiro['erro'] is None and fluxo['erro'] is None
+    for chave in ('resultados', 'paginas', 'caracteres', 'texto_normalizado'):
+        assert fluxo[chave] == inteiro[chave], chave
+    assert fluxo['matches'].counts == inteiro['matches'].counts
+    assert fluxo['impressao'].assinatura_bytes() == inteiro['impressao'].assinatura_bytes()
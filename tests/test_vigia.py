@@ -0,0 +1,96 @@
+# tests/test_vigia.py
+"""Pasta vigiada: retomada depois de reiniciar e repetição das análises com erro"""
+import os
+
+import pytest
+
+from analyzer import DocumentAnalyzer
+from database import Database
+from vigia import Vigia
+
+
+TEXTO = "Pregão eletrônico para aquisição de seringa descartável 10 ml e agulha hipodérmica 25x7."
+
+
+@pytest.fixture
+def pasta(tmp_path):
+    caminho = tmp_path / 'entrada'
+    caminho.mkdir()
+    return caminho
+
+
+@pytest.fixture
+def db_path(tmp_path):
+    caminho = str(tmp_path / 'produtos.db')
+    db = Database(caminho)
+    db.add_produto('Seringa', None, 'descartável, 10 ml', 'vidro')
+    db.fechar()
+    return caminho
+
+
+def _vigiar(pasta, db_path):
+    """Uma execução com --once, sem espera pela cópia; retorna os contadores"""
+    vigia = Vigia([str(pasta)], db_path, processos=1, intervalo=0.05, espera=0)
+    assert vigia.executar(uma_vez=True) == 0
+    vigia.db.fechar()
+    return vigia.contadores
+
+
+def _analises(db_path):
+    db = Database(db_path)
+    nomes = sorted(row[0] for row in db.conn.execute("SELECT arquivo_nome FROM analises"))
+    db.fechar()
+    return nomes
+
+
+def test_reinicio_retoma_sem_repetir_analises(pasta, db_path):
+    (pasta / 'a.txt').write_text(TEXTO, encoding='utf-8')
+    (pasta / 'b.txt').write_text(TEXTO + " Segundo lote.", encoding='utf-8')
+    assert _vigiar(pasta, db_path)['analisados'] == 2
+
+    # Reiniciado: nada a fazer
+    assert _vigiar(pasta, db_path) == {'analisados': 0, 'repetidos': 0, 'ignorados': 0, 'erros': 0}
+
+    # Uma cópia de conteúdo já analisado e um arquivo novo
+    (pasta / 'copia.txt').write_text(TEXTO, encoding='utf-8')
+    (pasta / 'c.txt').write_text(TEXTO + " Terceiro lote.", encoding='utf-8')
+    (pasta / 'vazio.txt').write_text('', encoding='utf-8')
+    assert _vigiar(pasta, db_path) == {'analisados': 1, 'repetidos': 1, 'ignorados': 1, 'erros': 0}
+    assert _analises(db_path) == ['a.txt', 'b.txt', 'c.txt']
+
+
+def test_erro_repetido_ate_o_limite_e_quando_o_arquivo_muda(pasta, db_path):
+    corrompido = pasta / 'corrompido.pdf'
+    corrompido.write_bytes(b'%PDF-1.4\nnao e um pdf')
+    arquivo_hash = DocumentAnalyzer.file_hash(str(corrompido))
+
+    assert _vigiar(pasta, db_path)['erros'] == Vigia.MAX_TENTATIVAS
+    # Esgotadas as tentativas, reiniciar não tenta de novo
+    assert _vigiar(pasta, db_path)['erros'] == 0
+
+    # Só uma nova tentativa quando o arquivo muda (aqui, só a data)
+    info = os.stat(corrompido)
+    os.utime(corrompido, ns=(info.st_atime_ns, info.st_mtime_ns + 10**9))
+    assert _vigiar(pasta, db_path)['erros'] == 1
+
+    db = Database(db_path)
+    assert db.conn.execute("SELECT tentativas, erro IS NOT NULL FROM ingestao_conteudos WHERE hash = ?",
+                           (arquivo_hash,)).fetchone() == (Vigia.MAX_TENTATIVAS + 1, 1)
+    assert arquivo_hash not in db.get_conteudos_ingeridos()
+    db.fechar()
+    assert _analises(db_path) == []
+
+
+def test_tentativas_continuam_depois_de_reiniciar(pasta, db_path):
+    (pasta / 'a.txt').write_text(TEXTO, encoding='utf-8')
+    arquivo_hash = DocumentAnalyzer.file_hash(str(pasta / 'a.txt'))
+    # Interrompido depois de uma tentativa com erro (ex.: tempo esgotado)
+    db = Database(db_path)
+    assert db.registrar_conteudo_ingerido(arquivo_hash, 'a.txt', erro="tempo esgotado") == 1
+    db.fechar()
+
+    assert _vigiar(pasta, db_path)['analisados'] == 1
+    db = Database(db_path)
+    assert db.get_conteudos_ingeridos() == {arquivo_hash}
+    assert db.conn.execute("SELECT tentativas FROM ingestao_conteudos").fetchone() == (2,)
+    db.fechar()
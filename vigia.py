@@ -0,0 +1,238 @@
+# vigia.py
+"""Pasta vigiada: analisa os editais que chegam a uma ou mais pastas
+
+As pastas são varridas a cada `intervalo` segundos (funciona em
+compartilhamentos de rede, onde as notificações do sistema de arquivos não são
+confiáveis). Um arquivo só é analisado depois de passar `espera` segundos sem
+mudar de tamanho nem de data, ou seja, com a cópia concluída. O hash do
+conteúdo decide se ele já foi analisado; o registro fica no banco
+(ingestao_arquivos e ingestao_conteudos), então reiniciar retoma de onde parou.
+Análises com erro são repetidas até MAX_TENTATIVAS vezes e, depois disso, só
+quando o arquivo mudar. Alterações no catálogo valem para os arquivos enviados
+à análise depois delas.
+"""
+import os
+import signal
+import time
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, wait
+
+import cli
+from analyzer import DocumentAnalyzer
+from database import Database
+from similaridade import buscar_quase_duplicata, descrever
+
+
+class Vigia:
+    """Varredura das pastas, fila de arquivos novos e pool de processos de análise"""
+
+    # Análises de um mesmo conteúdo que terminam em erro antes de desistir dele
+    MAX_TENTATIVAS = 3
+
+    def __init__(self, pastas, db_path='produtos.db', processos=None, intervalo=5.0, espera=10.0,
+                 recursivo=False):
+        self.pastas = [os.path.abspath(pasta) for pasta in pastas]
+        self.db = Database(db_path)
+        self.processos = processos or os.cpu_count() or 1
+        self.intervalo = intervalo
+        self.espera = espera
+        self.recursivo = recursivo
+        # Análises enviadas ao pool de uma vez; as demais aguardam em `pendentes`
+        self.limite_em_andamento = self.processos * 2
+
+        # Registro persistido: caminho -> (tamanho, mtime_ns, hash) e hashes já analisados
+        self.vistos = self.db.get_arquivos_ingeridos()
+        self.processados = self.db.get_conteudos_ingeridos()
+        # Arquivos novos ou alterados aguardando a cópia terminar: caminho -> (tamanho, mtime_ns, desde)
+        self.observando = {}
+        self.pendentes = deque()
+        self.em_andamento = {}
+        self.hashes_na_fila = set()
+        # Caminhos na fila ou em análise: só entram no registro quando a análise termina
+        self.caminhos_na_fila = set()
+        self.contadores = {'analisados': 0, 'repetidos': 0, 'ignorados': 0, 'erros': 0}
+
+    def listar(self):
+        arquivos = []
+        for pasta in self.pastas:
+            try:
+                arquivos.extend(cli.listar_documentos(pasta, self.recursivo))
+            except OSError as e:
+                # Compartilhamento fora do ar: tenta de novo na próxima varredura
+                print(f"Erro ao ler {pasta}: {e}")
+        return arquivos
+
+    def varrer(self):
+        """Coloca na fila os arquivos novos ou alterados que pararam de mudar"""
+        agora = time.time()
+        atuais = set()
+        for caminho in self.listar():
+            try:
+                info = os.stat(caminho)
+            except OSError:
+                continue
+            atuais.add(caminho)
+            if caminho in self.caminhos_na_fila:
+                continue
+            estado = (info.st_size, info.st_mtime_ns)
+            visto = self.vistos.get(caminho)
+            if visto is not None and visto[:2] == estado:
+                continue
+
+            anterior = self.observando.get(caminho)
+            if anterior is None or anterior[:2] != estado:
+                # O prazo conta de quando o estado atual foi visto pela primeira vez:
+                # cópias que preservam a data (cp -p, rsync, Explorer) têm mtime antigo
+                anterior = self.observando[caminho] = (*estado, agora)
+            if agora - anterior[2] < self.espera:
+                continue
+            del self.observando[caminho]
+            if info.st_size == 0:
+                self._ignorar(caminho, *estado, "arquivo vazio")
+                continue
+            self._enfileirar(caminho, *estado)
+
+        # Arquivos apagados ou movidos antes de a cópia terminar
+        for caminho in set(self.observando) - atuais:
+            del self.observando[caminho]
+
+    def _ignorar(self, caminho, tamanho, mtime_ns, motivo):
+        """Registra um arquivo que não será analisado enquanto não mudar (vazio ou ilegível)
+
+        Fica no registro sem hash de conteúdo; se o tamanho ou a data mudarem,
+        volta a ser observado como um arquivo novo.
+        """
+        self.vistos[caminho] = (tamanho, mtime_ns, '')
+        self.db.registrar_arquivo_ingerido(caminho, tamanho, mtime_ns, '')
+        self.contadores['ignorados'] += 1
+        print(f"{os.path.basename(caminho)}: {motivo}, ignorado")
+
+    def _enfileirar(self, caminho, tamanho, mtime_ns):
+        try:
+            arquivo_hash = DocumentAnalyzer.file_hash(caminho)
+        except OSError as e:
+            self._ignorar(caminho, tamanho, mtime_ns, f"erro de leitura ({e.strerror or e})")
+            return
+        if arquivo_hash in self.processados or arquivo_hash in self.hashes_na_fila:
+            # Mesmo conteúdo de um arquivo já analisado (ou na fila): só registra o caminho
+            self.vistos[caminho] = (tamanho, mtime_ns, arquivo_hash)
+            self.db.registrar_arquivo_ingerido(caminho, tamanho, mtime_ns, arquivo_hash)
+            self.contadores['repetidos'] += 1
+            print(f"{os.path.basename(caminho)}: conteúdo já analisado, ignorado")
+            return
+        self.hashes_na_fila.add(arquivo_hash)
+        self.caminhos_na_fila.add(caminho)
+        self.pendentes.append((caminho, tamanho, mtime_ns, arquivo_hash))
+
+    def enviar(self, pool):
+        while self.pendentes and len(self.em_andamento) < self.limite_em_andamento:
+            caminho, tamanho, mtime_ns, arquivo_hash = self.pendentes.popleft()
+            versao = pool.versao
+            # Fluxo ou extração completa é decidido no processo do pool: um PDF
+            # malformado não trava a varredura das pastas
+            futuro, catalogo_versao = pool.enviar(cli.analisar_arquivo, caminho, None)
+            if catalogo_versao != versao:
+                print(f"Catálogo alterado (versão {catalogo_versao}, {pool.produtos} produto(s)): "
+                      f"processos reiniciados")
+            self.em_andamento[futuro] = (caminho, tamanho, mtime_ns, arquivo_hash)
+
+    def coletar(self, timeout):
+        """Grava as análises que terminarem em até `timeout` segundos"""
+        if not self.em_andamento:
+            time.sleep(timeout)
+            return
+        prontos, _ = wait(self.em_andamento, timeout=timeout, return_when=FIRST_COMPLETED)
+        for futuro in prontos:
+            caminho, tamanho, mtime_ns, arquivo_hash = self.em_andamento.pop(futuro)
+            self.hashes_na_fila.discard(arquivo_hash)
+            self.caminhos_na_fila.discard(caminho)
+            try:
+                analise = futuro.result()
+            except Exception as e:
+                analise = {'erro': str(e)}
+            self._gravar(caminho, tamanho, mtime_ns, arquivo_hash, analise)
+
+    def _gravar(self, caminho, tamanho, mtime_ns, arquivo_hash, analise):
+        nome = os.path.basename(caminho)
+        duplicata = None
+        tentativas = 0
+        # Análise e registro no mesmo commit: uma interrupção não perde nem repete a análise
+        with self.db.transacao():
+            if analise['erro']:
+                tentativas = self.db.registrar_conteudo_ingerido(arquivo_hash, nome, erro=analise['erro'])
+            else:
+                duplicata = buscar_quase_duplicata(self.db, analise['impressao'])
+                analise_id = self.db.salvar_analise(nome, analise['resultados'], analise['texto_normalizado'],
+                                                    analise['matches'], analise['metricas'],
+                                                    analise['impressao'], arquivo_hash)
+                self.db.registrar_conteudo_ingerido(arquivo_hash, nome, analise_id)
+            # Com erro, o caminho só entra no registro quando as tentativas se esgotam:
+            # até lá um reinício também tenta de novo
+            repetir = bool(analise['erro']) and tentativas < self.MAX_TENTATIVAS
+            if not repetir:
+                self.db.registrar_arquivo_ingerido(caminho, tamanho, mtime_ns, arquivo_hash)
+
+        if analise['erro']:
+            self.contadores['erros'] += 1
+            if repetir:
+                # Volta a ser observado: nova tentativa depois de `espera` segundos
+                self.observando[caminho] = (tamanho, mtime_ns, time.time())
+                print(f"{nome}: erro - {analise['erro']} (tentativa {tentativas} de "
+                      f"{self.MAX_TENTATIVAS}, será repetida)")
+            else:
+                self.vistos[caminho] = (tamanho, mtime_ns, arquivo_hash)
+                print(f"{nome}: erro - {analise['erro']} ({tentativas} tentativa(s), "
+                      f"repetida só se o arquivo mudar)")
+            return
+        self.processados.add(arquivo_hash)
+        self.vistos[caminho] = (tamanho, mtime_ns, arquivo_hash)
+        self.contadores['analisados'] += 1
+        melhor = analise['resultados'][0] if analise['resultados'] else None
+        resumo = f"{melhor['nome']} ({melhor['indice']})" if melhor else "nenhum produto"
+        print(f"{nome}: {len(analise['resultados'])} produto(s), melhor: {resumo}, "
+              f"{analise['segundos']:.2f} s ({len(self.pendentes)} na fila)")
+        if analise['metricas'].get('falha_extracao'):
+            print(f"    extração interrompida: {analise['metricas']['falha_extracao']}")
+        if duplicata:
+            print(f"    {descrever(duplicata)}")
+
+    def executar(self, uma_vez=False):
+        """Vigia as pastas até Ctrl+C; com `uma_vez`, para quando não houver mais o que analisar"""
+        # O catálogo é relido quando muda (ver cli.PoolCatalogo)
+        pool = cli.PoolCatalogo(self.db, self.processos)
+        if not pool.produtos:
+            pool.encerrar()
+            print("Cadastre produtos primeiro!")
+            return 1
+
+        print(f"Vigiando {', '.join(self.pastas)} com {self.processos} processo(s) (Ctrl+C para encerrar)")
+        ultima_varredura = 0
+        try:
+            while True:
+                # Durante uma rajada as análises terminam a todo momento; a varredura segue o intervalo
+                if time.monotonic() - ultima_varredura >= self.intervalo:
+                    self.varrer()
+                    ultima_varredura = time.monotonic()
+                self.enviar(pool)
+                if uma_vez and not (self.pendentes or self.em_andamento or self.observando):
+                    break
+                self.coletar(max(0.05, ultima_varredura + self.intervalo - time.monotonic()))
+        except KeyboardInterrupt:
+            print("Encerrando...")
+        finally:
+            pool.encerrar()
+
+        print(f"Analisados: {self.contadores['analisados']}, repetidos: {self.contadores['repetidos']}, "
+              f"ignorados: {self.contadores['ignorados']}, erros: {self.contadores['erros']}")
+        return 0
+
+
+def vigiar(pastas, db_path='produtos.db', processos=None, intervalo=5.0, espera=10.0, recursivo=False,
+           uma_vez=False):
+    pastas_inexistentes = [pasta for pasta in pastas if not os.path.isdir(pasta)]
+    if pastas_inexistentes:
+        print(f"Pasta não encontrada: {', '.join(pastas_inexistentes)}")
+        return 1
+    # SIGTERM (ex.: serviço do sistema) encerra como o Ctrl+C
+    signal.signal(signal.SIGTERM, signal.default_int_handler)
+    return Vigia(pastas, db_path, processos, intervalo, espera, recursivo).executar(uma_vez)